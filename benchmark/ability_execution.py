@@ -0,0 +1,53 @@
+import asyncio
+import os
+import time
+
+from ceo import Ability, ExecutionPolicy
+from ceo.ability import shutdown_executors
+
+CALLS = 8
+LIMIT = 300000
+
+
+def count_primes(limit: int) -> int:
+    """
+    Counts the primes below a limit, a stand-in for a CPU-heavy ability such as a symbolic solver.
+    """
+    count = 0
+    for n in range(2, limit):
+        if all(n % d for d in range(2, int(n ** 0.5) + 1)):
+            count += 1
+    return count
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    # the longest the event loop, and so the agent loop, was kept from running
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+async def bench(execution: ExecutionPolicy) -> tuple[float, float]:
+    ability = Ability(count_primes, execution=execution)
+    if execution == ExecutionPolicy.PROCESS:
+        # start the workers outside of the measurement
+        await asyncio.gather(*(ability.acall(limit=10) for _ in range(os.cpu_count() or 1)))
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(ability.acall(limit=LIMIT) for _ in range(CALLS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await beat
+
+
+if __name__ == '__main__':
+    print(f'{CALLS} concurrent calls of a CPU-bound ability, {os.cpu_count()} cores')
+    print(f'{"execution":>10} {"wall time (s)":>14} {"worst loop lag (ms)":>20}')
+    for policy in (ExecutionPolicy.INLINE, ExecutionPolicy.THREAD, ExecutionPolicy.PROCESS):
+        elapsed, lag = asyncio.run(bench(policy))
+        print(f'{policy.value:>10} {elapsed:>14.2f} {lag * 1000:>20.1f}')
+    shutdown_executors()
@@ -0,0 +1,59 @@
+import importlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+from ceo import Ability
+from ceo.ability import AbilityIndex
+from ceo.prompt import NextMovePrompt
+
+ABILITIES = 1000
+TOP_K = 8
+QUERIES = 200
+VERBS = ['fetch', 'send', 'convert', 'delete', 'summarize', 'translate', 'schedule', 'resize', 'compress', 'search']
+NOUNS = ['weather', 'email', 'invoice', 'image', 'calendar', 'stock', 'playlist', 'contract', 'ticket', 'recipe']
+PLACES = ['cloud', 'disk', 'database', 'inbox', 'spreadsheet', 'browser', 'server', 'phone', 'printer', 'archive']
+
+
+def make_module(size: int) -> list:
+    # abilities need real source files, inspect.getsource can not read exec'd functions
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, 'bench_index_abilities.py'), 'w', encoding='utf-8') as f:
+        for i in range(size):
+            verb, noun, place = VERBS[i % 10], NOUNS[i // 10 % 10], PLACES[i // 100 % 10]
+            f.write(f'def {verb}_{noun}_{place}_{i}(target: str) -> str:\n'
+                    f'    """\n'
+                    f'    What does this ability do: {verb.capitalize()} the {noun} kept in the {place}.\n'
+                    f'    :param target: Which {noun} to {verb}.\n'
+                    f'    :return: The {noun} after it was {verb}ed.\n'
+                    f'    """\n'
+                    f'    return target\n\n\n')
+    sys.path.insert(0, directory)
+    module = importlib.import_module('bench_index_abilities')
+    return [getattr(module, name) for name in dir(module) if not name.startswith('_')]
+
+
+if __name__ == '__main__':
+    abilities = [Ability(function) for function in make_module(ABILITIES)]
+    start = time.perf_counter()
+    index = AbilityIndex(abilities)
+    build_ms = (time.perf_counter() - start) * 1000
+    rand = random.Random(0)
+    requests = list()
+    for _ in range(QUERIES):
+        verb, noun, place = rand.choice(VERBS), rand.choice(NOUNS), rand.choice(PLACES)
+        requests.append((f'please {verb} my {noun}, it is in the {place}', f'{verb}_{noun}_{place}_'))
+    hits, start = 0, time.perf_counter()
+    for request, expected in requests:
+        if any(ability.name.startswith(expected) for ability in index.search(request, TOP_K)):
+            hits += 1
+    query_ms = (time.perf_counter() - start) * 1000 / QUERIES
+    request = requests[0][0]
+    full = len(NextMovePrompt(request=request, abilities=abilities).prompt)
+    top_k = len(NextMovePrompt(request=request, abilities=index.search(request, TOP_K)).prompt)
+    print(f'build index over {ABILITIES} abilities: {build_ms:.1f} ms')
+    print(f'query latency: {query_ms:.3f} ms, recall@{TOP_K}: {hits / QUERIES:.1%}')
+    print(f'next move prompt, all abilities: {full} chars')
+    print(f'next move prompt, top {TOP_K}:      {top_k} chars ({top_k / full:.1%})')
@@ -0,0 +1,87 @@
+import os
+import re
+import tempfile
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Agent
+from ceo.ability.ability import MEMOIZE_ATTR
+from ceo.cache import AbilityCache, get_ability_cache, set_ability_cache
+
+REQUESTS = 200
+CURRENCIES = ('usd', 'eur', 'gbp', 'jpy', 'cny', 'chf', 'aud', 'cad')
+LOOKUP_LATENCY = 0.02
+REQUEST = re.compile(r'convert (\d+) (\w+)')
+lookups = 0
+
+
+def exchange_rate(currency: str) -> float:
+    """
+    Looks up the exchange rate of a currency against usd.
+    :param currency: The currency code.
+    :return: How many usd one unit of the currency is worth.
+    """
+    global lookups
+    lookups += 1
+    time.sleep(LOOKUP_LATENCY)
+    return round(1.0 + CURRENCIES.index(currency) / 10, 2)
+
+
+class ScriptedModel(BaseChatModel):
+    # looks up a rate once per request, then completes the mission
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        if 'Introduce yourself' in prompt:
+            return 'I convert currencies.'
+        if 'plan your workflow' in prompt:
+            return 'schedule:[exchange_rate]\n--END--'
+        if 'THOUGHT-PROCESS' in prompt:
+            return '--THOUGHT-PROCESS--\n(Start) [rate]: ok (--SUCCESS--)\n--CONCLUSION--\nConverted.\n--END--'
+        if 'action_taken_by' in prompt:
+            return 'done\n--SEP--\nargs:{}\nability:[-mission-complete-]\n--END--'
+        currency = REQUEST.search(prompt).group(2)
+        return f'look up\n--SEP--\nargs:{{"currency": "{currency}"}}\nability:[exchange_rate]\n--END--'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages[-1].content)))])
+
+
+def run_all(agents: list[Agent]) -> float:
+    start = time.perf_counter()
+    for i in range(REQUESTS):
+        # two agents take turns, as a parent and a sub-agent repeating its lookups would
+        request = f'convert {i} {CURRENCIES[i % len(CURRENCIES)]}'
+        agents[i % len(agents)].session().relay(request, request).just_do_it()
+    return time.perf_counter() - start
+
+
+def agents() -> list[Agent]:
+    return [Agent(abilities=[exchange_rate], brain=ScriptedModel(), name=name, summarize_actions=False)
+            for name in ('Teller', 'Clerk')]
+
+
+if __name__ == '__main__':
+    plain_s = run_all(agents())
+    print(f'{REQUESTS} requests without memoization: {plain_s:.2f} s, {lookups} lookups')
+    setattr(exchange_rate, MEMOIZE_ATTR, (60.0, 256))
+    lookups = 0
+    memo_s = run_all(agents())
+    print(f'{REQUESTS} requests with a shared in-memory cache: {memo_s:.2f} s, {lookups} lookups, '
+          f'hit ratio {get_ability_cache().hit_ratio():.2%}')
+    path = os.path.join(tempfile.mkdtemp(), 'ability_results.db')
+    set_ability_cache(AbilityCache(path))
+    run_all(agents())
+    # a fresh process would start here, only the disk tier is left
+    set_ability_cache(AbilityCache(path))
+    lookups = 0
+    disk_s = run_all(agents())
+    stats = get_ability_cache().stats('exchange_rate')
+    print(f'{REQUESTS} requests served from the disk tier: {disk_s:.2f} s, {lookups} lookups, '
+          f'{stats["disk_hits"]} disk hits, {stats["hits"] - stats["disk_hits"]} memory hits')
@@ -0,0 +1,65 @@
+import importlib
+import inspect
+import os
+import sys
+import tempfile
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from ceo import Ability, Agent
+from ceo.ability import AbilityRegistry
+from ceo.profile import RunProfile, profiling
+
+ABILITIES = 500
+
+
+def make_module(size: int):
+    # abilities need real source files, inspect.getsource can not read exec'd functions
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, 'bench_abilities.py'), 'w', encoding='utf-8') as f:
+        for i in range(size):
+            f.write(f'def ability_{i}(x: int) -> int:\n'
+                    f'    """\n    Adds {i} to x.\n    """\n'
+                    f'    return x + {i}\n\n\n')
+    sys.path.insert(0, directory)
+    module = importlib.import_module('bench_abilities')
+    return [getattr(module, f'ability_{i}') for i in range(size)]
+
+
+def legacy_grant(abilities: list[Ability], function) -> bool:
+    # what grant_ability used to do: compare source against every granted ability
+    for _ability in abilities:
+        if inspect.getsource(function) == inspect.getsource(_ability.function):
+            return False
+    abilities.append(Ability(function))
+    return True
+
+
+if __name__ == '__main__':
+    functions = make_module(ABILITIES)
+    start = time.perf_counter()
+    legacy = list()
+    for function in functions:
+        legacy_grant(legacy, function)
+    for function in functions:
+        legacy_grant(legacy, function)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    registry = AbilityRegistry()
+    for function in functions:
+        registry.add(function)
+    for function in functions:
+        registry.add(function)
+    registry_ms = (time.perf_counter() - start) * 1000
+    print(f'grant {ABILITIES} abilities twice, pairwise getsource: {legacy_ms:.1f} ms')
+    print(f'grant {ABILITIES} abilities twice, AbilityRegistry:    {registry_ms:.1f} ms')
+    agent = Agent(abilities=[], brain=FakeListChatModel(responses=['I can add numbers.']), name='CEO')
+    with profiling(RunProfile(agent.name)) as profile:
+        start = time.perf_counter()
+        for function in functions:
+            agent.grant_ability(function)
+        agent.introduction
+        agent_ms = (time.perf_counter() - start) * 1000
+    print(f'Agent.grant_ability x{ABILITIES} then introduction: {agent_ms:.1f} ms, '
+          f'{len(profile.llm_calls())} LLM call(s) (was {ABILITIES})')
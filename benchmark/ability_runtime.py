@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import time
+
+from ceo import Ability
+from ceo.ability import shutdown_runtime
+
+CALLS = 2000
+
+
+async def echo(msg: str) -> str:
+    await asyncio.sleep(0)
+    return msg
+
+
+def legacy_call(function, *args, **kwargs):
+    # the thread-plus-new-loop path Ability.__call__ used before AbilityRuntime
+    __res = None
+
+    def __func(loop: asyncio.AbstractEventLoop):
+        nonlocal __res
+        __res = loop.run_until_complete(function(*args, **kwargs))
+
+    __thread = threading.Thread(target=__func, args=(asyncio.new_event_loop(),))
+    __thread.start()
+    __thread.join(timeout=None)
+    return __res
+
+
+def bench(name: str, call) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        call(f'msg{i}')
+    elapsed = time.perf_counter() - start
+    print(f'{name:<16} {CALLS / elapsed:>10.1f} calls/sec')
+    return elapsed
+
+
+if __name__ == '__main__':
+    ability = Ability(echo)
+    legacy = bench('thread+new loop', lambda msg: legacy_call(echo, msg))
+    runtime = bench('AbilityRuntime', lambda msg: ability(msg))
+    print(f'speedup: {legacy / runtime:.1f}x')
+    shutdown_runtime()
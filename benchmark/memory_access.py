@@ -0,0 +1,53 @@
+import copy
+import datetime
+import time
+from collections import OrderedDict
+
+from ceo.memory import MemoryStore
+
+SIZES = (10, 100, 1000, 5000)
+STEPS = 50
+
+
+def make_entry(i: int) -> dict:
+    return {
+        'timestamp': datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f'),
+        'agent_name': 'CEO',
+        'message_from_CEO': f'I used the calculator ability, the result is {i}.',
+        'action_taken_by_CEO': {'ability': 'calculator', 'choice': {'expr': f'{i} * 2'}, 'returns': str(i * 2)}
+    }
+
+
+def deepcopy_step(memory: OrderedDict, i: int):
+    # what a step used to cost: memorize deep-copies the action, NextMovePrompt,
+    # IntrospectionPrompt and delegation each deep-copy the whole history
+    memory[f'key{i}'] = copy.deepcopy(make_entry(i))
+    for _ in range(3):
+        history = copy.deepcopy(memory)
+        history[list(history.keys())[-1]]
+
+
+def view_step(memory: MemoryStore, i: int):
+    memory.put(f'key{i}', make_entry(i))
+    for _ in range(3):
+        history = memory.view()
+        history[next(reversed(history))]
+
+
+if __name__ == '__main__':
+    print(f'{"history size":>12} {"deepcopy (ms/step)":>20} {"view (ms/step)":>16}')
+    for size in SIZES:
+        legacy = OrderedDict()
+        store = MemoryStore()
+        for i in range(size):
+            legacy[f'key{i}'] = make_entry(i)
+            store.put(f'key{i}', make_entry(i))
+        start = time.perf_counter()
+        for i in range(size, size + STEPS):
+            deepcopy_step(legacy, i)
+        legacy_ms = (time.perf_counter() - start) / STEPS * 1000
+        start = time.perf_counter()
+        for i in range(size, size + STEPS):
+            view_step(store, i)
+        view_ms = (time.perf_counter() - start) / STEPS * 1000
+        print(f'{size:>12} {legacy_ms:>20.3f} {view_ms:>16.4f}')
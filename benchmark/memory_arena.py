@@ -0,0 +1,111 @@
+import inspect
+import os
+import tempfile
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Agent, agentic
+from ceo.memory import MemoryStore, OverlayMemoryStore, SqliteMemoryStore
+from ceo.prompt import (Prompt, SelfIntroducePrompt, SchedulerPrompt, IntrospectionPrompt,
+                        ExecutorPrompt, NextMovePrompt)
+
+HISTORY = 5000
+DEPTH = 8
+LEVELS = ('Director', 'Manager', 'Lead', 'Worker')
+
+
+def history(size: int, name: str = 'Auditor') -> dict:
+    return {f'agent:[{name}] at:[{i}]': {
+        'agent_name': name,
+        f'message_from_{name}': f'I looked into item {i}, it was fine.',
+        f'action_taken_by_{name}': {'ability': 'inspect', 'choice': {'item': i}, 'returns': 'fine'}
+    } for i in range(size)}
+
+
+def chain(bring_in) -> tuple[float, int]:
+    # each level of delegation brings in everything above it and adds one entry of its own
+    memory, stored = MemoryStore(history(HISTORY)).view(), 0
+    start = time.perf_counter()
+    for level in range(DEPTH):
+        store = bring_in(memory)
+        store.put(f'agent:[level-{level}] at:[0]', {'agent_name': f'level-{level}'})
+        stored += len(store.delta()) if isinstance(store, OverlayMemoryStore) else len(store)
+        memory = store.view()
+    return time.perf_counter() - start, stored
+
+
+def inspect_item(item: int) -> str:
+    """
+    Inspects an item.
+    :param item: The item to inspect.
+    :return: What was found.
+    """
+    return f'item {item} is fine'
+
+
+def prompt_class() -> type | None:
+    # the class of the prompt being answered, the text of a prompt also carries what sub-agents wrote
+    frame = inspect.currentframe()
+    while frame is not None:
+        owner = frame.f_locals.get('self', None)
+        if isinstance(owner, Prompt):
+            return type(owner)
+        frame = frame.f_back
+    return None
+
+
+class ScriptedModel(BaseChatModel):
+    # each level delegates to the one below it once, the last level inspects one item
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    @staticmethod
+    def respond(kind: type | None, prompt: str) -> str:
+        if kind is SelfIntroducePrompt:
+            return 'I get things inspected.'
+        if kind is SchedulerPrompt:
+            return 'schedule:[delegate]\n--END--'
+        if kind is IntrospectionPrompt:
+            return '--THOUGHT-PROCESS--\n(Start) [inspect]: ok (--SUCCESS--)\n--CONCLUSION--\nInspected.\n--END--'
+        if kind is ExecutorPrompt:
+            return '{"summarization": "done"}'
+        if kind is not NextMovePrompt:
+            raise ValueError(f'Unexpected prompt: {kind}.')
+        for level, below in zip(LEVELS, LEVELS[1:]):
+            if f'talk_to_{below}' in prompt:
+                if f'action_taken_by_{level}' in prompt:
+                    return 'done\n--SEP--\nargs:{}\nability:[-mission-complete-]\n--END--'
+                return f'delegate\n--SEP--\nargs:{{}}\nability:[__AgenticAbility__talk_to_{below}]\n--END--'
+        if 'action_taken_by_Worker' in prompt:
+            return 'done\n--SEP--\nargs:{}\nability:[-mission-complete-]\n--END--'
+        return 'inspect\n--SEP--\nargs:{"item": 7}\nability:[inspect_item]\n--END--'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = self.respond(prompt_class(), messages[-1].content)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+def hierarchy() -> Agent:
+    agent = Agent(abilities=[inspect_item], brain=ScriptedModel(), name=LEVELS[-1], summarize_actions=False)
+    for name in reversed(LEVELS[:-1]):
+        agent = Agent(abilities=[agentic(agent)(lambda: None)], brain=ScriptedModel(), name=name,
+                      summarize_actions=False)
+    return agent
+
+
+if __name__ == '__main__':
+    copy_s, copied = chain(MemoryStore)
+    print(f'{DEPTH} levels of delegation over {HISTORY} entries, copying the history: '
+          f'{copy_s * 1000:.1f} ms, {copied} entries stored')
+    overlay_s, stored = chain(OverlayMemoryStore)
+    print(f'{DEPTH} levels of delegation over {HISTORY} entries, sharing the history: '
+          f'{overlay_s * 1000:.1f} ms, {stored} entries stored')
+    store = SqliteMemoryStore(os.path.join(tempfile.mkdtemp(), 'director.db')).update(history(HISTORY))
+    start = time.perf_counter()
+    hierarchy().session(memory=store).relay('inspect item 7', 'inspect item 7').just_do_it()
+    print(f'A run delegated through {len(LEVELS) - 1} levels over {HISTORY} entries: '
+          f'{(time.perf_counter() - start) * 1000:.1f} ms, {LEVELS[0]} memory {HISTORY} -> {len(store)} entries')
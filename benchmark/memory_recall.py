@@ -0,0 +1,41 @@
+import datetime
+import json
+import random
+import time
+
+from ceo.enum.EvictionStrategy import EvictionStrategy
+from ceo.memory import MemoryPolicy, MemoryStore, WorkingMemory
+
+SIZES = (10, 100, 1000, 5000)
+STEPS = 50
+ABILITIES = ['calculator', 'write_file', 'read_file', 'search_web', 'send_email', 'translate']
+TOPICS = ['sphere volume', 'quarterly report', 'flight to Paris', 'invoice 4711', 'weather in Oslo', 'new logo']
+
+
+def make_entry(i: int, rand: random.Random) -> dict:
+    ability, topic = rand.choice(ABILITIES), rand.choice(TOPICS)
+    return {
+        'timestamp': datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f'),
+        'agent_name': 'CEO',
+        'message_from_CEO': f'I used the {ability} ability for the {topic}, the result is {i}.',
+        'action_taken_by_CEO': {'ability': ability, 'choice': topic, 'returns': str(i)}
+    }
+
+
+if __name__ == '__main__':
+    query = 'write the invoice 4711 into a file'
+    print(f'{"history size":>12} {"full (chars)":>14} {"relevance (chars)":>18} {"relevance (ms/step)":>20}')
+    for size in SIZES:
+        rand = random.Random(size)
+        store = MemoryStore()
+        for i in range(size):
+            store.put(f'key{i}', make_entry(i, rand))
+        working_memory = WorkingMemory(MemoryPolicy(eviction=EvictionStrategy.RELEVANCE, keep_last=4, top_k=4))
+        working_memory.render(store.view(), query=query)
+        start = time.perf_counter()
+        for i in range(size, size + STEPS):
+            store.put(f'key{i}', make_entry(i, rand))
+            rendered = working_memory.render(store.view(), query=query)
+        recall_ms = (time.perf_counter() - start) / STEPS * 1000
+        full = len(json.dumps(store.view().to_dict(), ensure_ascii=False))
+        print(f'{size:>12} {full:>14} {len(json.dumps(rendered, ensure_ascii=False)):>18} {recall_ms:>20.3f}')
@@ -0,0 +1,99 @@
+import asyncio
+import concurrent.futures
+import re
+import threading
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Agent
+
+ASYNC_SESSIONS = 2000
+THREAD_SESSIONS = 500
+THREADS = 64
+LATENCY = 0.005
+REQUEST = re.compile(r'add one to (\d+)')
+RESULT = re.compile(r'"returns": "(\d+)"')
+introductions = 0
+
+
+def add_one(number: int) -> int:
+    """
+    Adds one to a number.
+    :param number: The number to add one to.
+    :return: The number plus one.
+    """
+    return number + 1
+
+
+class ScriptedModel(BaseChatModel):
+    # answers every prompt of a run from what the prompt itself holds, so crossed sessions give wrong answers
+    latency: float = LATENCY
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    def respond(self, prompt: str) -> str:
+        if 'Introduce yourself' in prompt:
+            global introductions
+            introductions += 1
+            return 'I can add one to a number.'
+        number = REQUEST.search(prompt).group(1)
+        if 'plan your workflow' in prompt:
+            return 'schedule:[add_one]\n--END--'
+        if 'THOUGHT-PROCESS' in prompt:
+            return f'--THOUGHT-PROCESS--\n(Start) [add]: ok (--SUCCESS--)\n--CONCLUSION--\n' \
+                   f'{RESULT.search(prompt).group(1)}\n--END--'
+        if 'action_taken_by' in prompt:
+            return 'done\n--SEP--\nargs:{}\nability:[-mission-complete-]\n--END--'
+        return f'add\n--SEP--\nargs:{{"number": {number}}}\nability:[add_one]\n--END--'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages[-1].content)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages[-1].content)))])
+
+
+def run(agent: Agent, number: int) -> bool:
+    session = agent.session().relay(f'add one to {number}', f'add one to {number}')
+    return session.just_do_it()['conclusion'].strip() == str(number + 1)
+
+
+async def arun(agent: Agent, number: int) -> bool:
+    session = (await agent.asession()).relay(f'add one to {number}', f'add one to {number}')
+    return (await session.ajust_do_it())['conclusion'].strip() == str(number + 1)
+
+
+async def arun_shared(agent: Agent, number: int) -> bool:
+    # what had to be done before sessions: every run mutates the one agent
+    agent.relay(f'add one to {number}', f'add one to {number}')
+    return (await agent.ajust_do_it())['conclusion'].strip() == str(number + 1)
+
+
+async def arun_all(agent: Agent, run_one, size: int) -> list[bool]:
+    return await asyncio.gather(*(run_one(agent, number) for number in range(size)), return_exceptions=True)
+
+
+if __name__ == '__main__':
+    agent = Agent(abilities=[add_one], brain=ScriptedModel(), name='Adder', summarize_actions=False)
+    results = asyncio.run(arun_all(agent, arun_shared, THREAD_SESSIONS))
+    print(f'{THREAD_SESSIONS} concurrent asyncio runs on one agent without sessions: '
+          f'{results.count(True)} correct')
+    start = time.perf_counter()
+    results = asyncio.run(arun_all(agent, arun, ASYNC_SESSIONS))
+    async_s = time.perf_counter() - start
+    print(f'{ASYNC_SESSIONS} concurrent asyncio sessions over one agent: {async_s:.2f} s, '
+          f'{results.count(True)} correct, {introductions} introduction(s)')
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(lambda number: run(agent, number), range(THREAD_SESSIONS)))
+    thread_s = time.perf_counter() - start
+    print(f'{THREAD_SESSIONS} sessions on {THREADS} threads over one agent: {thread_s:.2f} s, '
+          f'{results.count(True)} correct, {introductions} introduction(s), '
+          f'{threading.active_count()} threads left')
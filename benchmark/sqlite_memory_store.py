@@ -0,0 +1,52 @@
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+
+from ceo.memory import MemoryPolicy, SqliteMemoryStore, WorkingMemory
+
+ENTRIES = 100000
+READS = 1000
+
+
+def make_entry(i: int) -> dict:
+    return {
+        'timestamp': datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f'),
+        'agent_name': 'CEO',
+        'message_from_CEO': f'I used the calculator ability to evaluate the expression {i} * 2, '
+                            f'and the result is {i * 2}, which is the computed value of the expression.',
+        'action_taken_by_CEO': {'ability': 'calculator', 'choice': {'expr': f'{i} * 2'}, 'returns': str(i * 2)}
+    }
+
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), 'memory.db')
+    store = SqliteMemoryStore(path)
+    entries = {f'agent:[CEO] step:[{i}]': make_entry(i) for i in range(ENTRIES)}
+    start = time.perf_counter()
+    store.update(entries)
+    write_s = time.perf_counter() - start
+    json_size = len(json.dumps(entries, ensure_ascii=False).encode('utf-8'))
+    store.close()
+    del entries
+    start = time.perf_counter()
+    store = SqliteMemoryStore(path)
+    view = store.view()
+    open_ms = (time.perf_counter() - start) * 1000
+    rand = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(READS):
+        view[view.key_at(rand.randrange(ENTRIES))]
+    read_us = (time.perf_counter() - start) / READS * 1000 ** 2
+    start = time.perf_counter()
+    for i in range(10):
+        store.put(f'agent:[CEO] step:[{ENTRIES + i}]', make_entry(ENTRIES + i))
+        WorkingMemory(MemoryPolicy(keep_last=8)).render(store.view())
+    step_ms = (time.perf_counter() - start) / 10 * 1000
+    print(f'append {ENTRIES} entries: {write_s:.2f} s')
+    print(f'on disk: {os.path.getsize(path) / 1024 ** 2:.1f} MiB, as json: {json_size / 1024 ** 2:.1f} MiB')
+    print(f'reopen and view: {open_ms:.2f} ms')
+    print(f'random entry read: {read_us:.1f} us')
+    print(f'append and render the last 8 entries: {step_ms:.2f} ms/step')
@@ -0,0 +1,87 @@
+import random
+import statistics
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Agent, Personality, TerminationPolicy, SoftBudgetPolicy
+
+RUNS = 50
+PLANNED_STEPS = 3
+TOKENS_PER_CALL = 500
+# the termination scheme agents used before TerminationPolicy, kept here to compare against
+LEGACY = {
+    Personality.PRUDENT: (0.25, 1.45),
+    Personality.INQUISITIVE: (0.05, 1.25)
+}
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+class StubbornModel(BaseChatModel):
+    # never decides the mission is complete, so only the termination policy ends a run
+    @property
+    def _llm_type(self) -> str:
+        return 'stubborn'
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        if 'Introduce yourself' in prompt:
+            return 'I probe problems.'
+        if 'plan your workflow' in prompt:
+            return f'schedule:[{", ".join(["probe"] * PLANNED_STEPS)}]\n--END--'
+        if 'THOUGHT-PROCESS' in prompt:
+            return '--THOUGHT-PROCESS--\n(Start) [probe]: ok (--SUCCESS--)\n--CONCLUSION--\nInconclusive.\n--END--'
+        depth = prompt.count('action_taken_by')
+        return f'deeper\n--SEP--\nargs:{{"depth": {depth}}}\nability:[probe]\n--END--'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = AIMessage(content=self.respond(messages[-1].content), usage_metadata={
+            'input_tokens': TOKENS_PER_CALL, 'output_tokens': 0, 'total_tokens': TOKENS_PER_CALL})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def legacy_steps(expected_steps: int, p: float, beta: float) -> int:
+    steps = 0
+    while True:
+        if steps > expected_steps:
+            if sum(random.uniform(0, 1) for _ in range(3)) / 3 <= p:
+                return steps
+            p = (beta * p) % 1.0
+        steps += 1
+
+
+def describe(steps: list[int]) -> str:
+    return (f'min {min(steps)}, max {max(steps)}, mean {statistics.mean(steps):.2f}, '
+            f'stdev {statistics.pstdev(steps):.2f}')
+
+
+if __name__ == '__main__':
+    for personality, (p, beta) in LEGACY.items():
+        steps = [legacy_steps(PLANNED_STEPS, p, beta) for _ in range(RUNS * 100)]
+        print(f'legacy {personality.value} ({RUNS * 100} simulated runs): {describe(steps)}')
+    policies = {
+        'prudent': None,
+        'inquisitive': None,
+        'max_llm_calls=10': TerminationPolicy(max_llm_calls=10),
+        'max_tokens=6000': SoftBudgetPolicy(slack=4.0, grace=2, max_tokens=6000)
+    }
+    for name, policy in policies.items():
+        personality = Personality.INQUISITIVE if name == 'inquisitive' else Personality.PRUDENT
+        calls = list()
+        agent = Agent(abilities=[probe], brain=StubbornModel(), name='Prober', personality=personality,
+                      summarize_actions=False, termination_policy=policy,
+                      profile_callback=lambda profile: calls.append(len(profile.llm_calls())))
+        steps = list()
+        for _ in range(RUNS):
+            agent.assign('find the root cause')
+            steps.append(agent.just_do_it()['misc']['step_count'])
+        print(f'{name} ({RUNS} runs): steps {describe(steps)}; llm calls {describe(calls)}')
@@ -0,0 +1,77 @@
+import random
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Ability
+from ceo.profile import RunProfile, profiling
+from ceo.prompt import NextMovePrompt
+
+STEPS = 200
+MALFORMED_RATE = 0.3
+LATENCY = 0.01
+
+
+def calculator(expr: str) -> float:
+    """
+    Evaluates a single math expression.
+    """
+    return eval(expr)
+
+
+def write_file(filename: str, content: str) -> bool:
+    """
+    Writes content into a file.
+    """
+    return True
+
+
+class ScriptedModel(BaseChatModel):
+    # answers like a real model would, but gets the text format wrong now and then
+    malformed_rate: float = MALFORMED_RATE
+    latency: float = LATENCY
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(tools=tools, tool_choice=tool_choice, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        if 'tools' in kwargs:
+            message = AIMessage(content='I should calculate first.', tool_calls=[
+                {'name': 'calculator', 'args': {'expr': '1 + 1'}, 'id': 'call_0'}
+            ])
+        elif random.random() < self.malformed_rate:
+            message = AIMessage(content='I should calculate first.\nargs:{"expr": "1 + 1"}\nability:[calculator]')
+        else:
+            message = AIMessage(content='I should calculate first.\n--SEP--\n'
+                                        'args:{"expr": "1 + 1"}\nability:[calculator]\n--END--')
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def bench(tool_calling: bool) -> tuple[float, int, int]:
+    random.seed(0)
+    model = ScriptedModel()
+    abilities = [Ability(calculator), Ability(write_file)]
+    with profiling(RunProfile('bench')) as profile:
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            NextMovePrompt(request='What is 1 + 1?', abilities=abilities,
+                           tool_calling=tool_calling).invoke(model)
+        time_used = time.perf_counter() - start
+    calls = profile.llm_calls()
+    return time_used / STEPS * 1000, len(calls), sum(1 for call in calls if call['retry'] > 0)
+
+
+if __name__ == '__main__':
+    print(f'{STEPS} next moves, {MALFORMED_RATE:.0%} malformed text responses, {LATENCY * 1000:.0f} ms per call')
+    print(f'{"mode":>12} {"ms/step":>10} {"llm calls":>10} {"retries":>8}')
+    for mode, tool_calling in (('text', False), ('tool calls', True)):
+        ms, calls, retries = bench(tool_calling)
+        print(f'{mode:>12} {ms:>10.2f} {calls:>10} {retries:>8}')
@@ -5,10 +5,13 @@ from .brain.lm import (
     get_dashscope_model,
     get_deepseek_model
 )
-from .brain.agent import Agent
+from .brain.agent import Agent, Session
+from .brain.termination_policy import TerminationPolicy, SoftBudgetPolicy
 from .ability import Ability, AgenticAbility
 from .util import ability, agentic
-from .enum import Personality
+from .enum import Personality, EvictionStrategy, EventType, ExecutionPolicy
+from .memory import MemoryPolicy
+from .cache import LRUCache, SqliteCache
 
 __AUTHOR__ = '吴子豪 / Vortez Wohl'
 __EMAIL__ = 'vortez.wohl@gmail.com'
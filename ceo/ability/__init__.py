@@ -1,2 +1,6 @@
 from .ability import Ability
+from .ability_registry import AbilityRegistry
+from .ability_index import AbilityIndex
+from .runtime import AbilityRuntime, get_runtime, set_runtime, shutdown_runtime
+from .executors import get_thread_pool, get_process_pool, set_executor_limits, shutdown_executors
 from .agentic_ability import AgenticAbility
@@ -1,32 +1,85 @@
 import asyncio
+import concurrent.futures
+import contextvars
 import copy
+import functools
+import hashlib
 import inspect
 import json
-import threading
+import logging
+import pickle
+import typing
 
 from typing_extensions import Callable
 
+from ceo.ability.executors import get_process_pool, get_thread_pool, submit_to_own_thread
+from ceo.ability.runtime import get_runtime
+from ceo.cache.ability_cache import MISSING, get_ability_cache, make_args_key
+from ceo.deadline.run_deadline import bound_timeout
+from ceo.enum.ExecutionPolicy import ExecutionPolicy
+from ceo.exception.ability_timeout_exception import AbilityTimeoutException
+
+log = logging.getLogger('ceo.ability')
+
+
+JSON_SCHEMA_TYPES = {
+    str: 'string',
+    int: 'integer',
+    float: 'number',
+    bool: 'boolean',
+    list: 'array',
+    tuple: 'array',
+    dict: 'object'
+}
+
+# set by @ability(lazy=True) on functions whose docstring has not been generated yet
+PENDING_DOCSTRING_ATTR = '__pending_docstring__'
+# set by @ability(execution=...) on functions which should not run on the caller's thread
+EXECUTION_POLICY_ATTR = '__execution_policy__'
+# set by @ability(timeout=...), seconds an ability may take before the agent stops waiting for it
+TIMEOUT_ATTR = '__ability_timeout__'
+# set by @ability(memoize=True, ...) on pure functions, to (ttl, maxsize) of their cached results
+MEMOIZE_ATTR = '__ability_memoize__'
+
 
 class Ability:
-    def __init__(self, function: Callable):
+    def __init__(self, function: Callable, execution: ExecutionPolicy | None = None, timeout: float | None = None):
         signature = inspect.signature(function)
-        doc_str = inspect.getdoc(function)
-        if doc_str is None:
-            doc_str = json.dumps({
-                'src': inspect.getsource(function)
-            }, ensure_ascii=False)
         self._name: str = function.__name__
-        self._description: str | dict = str()
+        self._description: str | dict | None = None
         self._function: Callable = function
         self._parameters: dict = dict()
         self._returns: any = signature.return_annotation
+        self._key: str | None = None
+        if execution is None:
+            execution = getattr(function, EXECUTION_POLICY_ATTR, ExecutionPolicy.INLINE)
+        self._execution: ExecutionPolicy = execution
+        if timeout is None:
+            timeout = getattr(function, TIMEOUT_ATTR, None)
+        self._timeout: float | None = timeout
+        self._memoize: tuple[float | None, int | None] | None = getattr(function, MEMOIZE_ATTR, None)
+        self._signature = signature
         for name, param in signature.parameters.items():
             self._parameters[name] = str(param.annotation)
+
+    def __describe(self) -> str | dict:
+        # resolved on first use, so lazily generated docstrings are only paid for when shown to the model
+        if self._description is not None:
+            return self._description
+        pending_docstring = getattr(self._function, PENDING_DOCSTRING_ATTR, None)
+        if pending_docstring is not None:
+            pending_docstring()
+        doc_str = inspect.getdoc(self._function)
+        if doc_str is None:
+            doc_str = json.dumps({
+                'src': inspect.getsource(self._function)
+            }, ensure_ascii=False)
         try:
-            self._description = json.loads(doc_str)
-            self._description = self._description.get('description', self._description)
+            description = json.loads(doc_str)
+            self._description = description.get('description', description)
         except json.decoder.JSONDecodeError:
             self._description = doc_str
+        return self._description
 
     def __repr__(self):
         return json.dumps(self.to_dict(), ensure_ascii=False)
@@ -35,21 +88,94 @@ class Ability:
         return self.__repr__()
 
     def __call__(self, *args, **kwargs):
+        key = self.__memo_key(args, kwargs)
+        if key is None:
+            return self.__call(*args, **kwargs)
+        (ttl, maxsize), cache = self._memoize, get_ability_cache()
+        result = cache.lookup(self._name, self.key, key, ttl=ttl, maxsize=maxsize)
+        if result is MISSING:
+            result = self.__call(*args, **kwargs)
+            cache.store(self.key, key, result, ttl=ttl, maxsize=maxsize)
+        return result
+
+    def __call(self, *args, **kwargs):
+        timeout = bound_timeout(self._timeout)
+        if self._execution == ExecutionPolicy.PROCESS and self.__transferable(args, kwargs):
+            return self.__wait(get_process_pool().submit(_call_in_process, self._function, args, kwargs), timeout)
         if inspect.iscoroutinefunction(self._function):
-            __res = None
+            return get_runtime().run(self._function(*args, **kwargs), timeout=timeout)
+        if self._execution == ExecutionPolicy.INLINE:
+            if timeout is None:
+                return self._function(*args, **kwargs)
+            # an inline ability with a time limit runs on a thread of its own, so that the caller can stop waiting
+            # for it without leaving it on a worker of the bounded pool
+            return self.__wait(submit_to_own_thread(contextvars.copy_context().run,
+                                                    self._function, *args, **kwargs), timeout)
+        return self.__wait(get_thread_pool().submit(contextvars.copy_context().run,
+                                                    self._function, *args, **kwargs), timeout)
+
+    @staticmethod
+    def __wait(future: concurrent.futures.Future, timeout: float | None) -> any:
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            if future.done():
+                raise
+            future.cancel()
+            raise AbilityTimeoutException(timeout)
+
+    async def acall(self, *args, **kwargs):
+        key = self.__memo_key(args, kwargs)
+        if key is None:
+            return await self.__acall_within_timeout(*args, **kwargs)
+        (ttl, maxsize), cache = self._memoize, get_ability_cache()
+        result = cache.lookup(self._name, self.key, key, ttl=ttl, maxsize=maxsize)
+        if result is MISSING:
+            result = await self.__acall_within_timeout(*args, **kwargs)
+            cache.store(self.key, key, result, ttl=ttl, maxsize=maxsize)
+        return result
 
-            def __func(loop: asyncio.AbstractEventLoop):
-                nonlocal __res, args, kwargs
-                __res = loop.run_until_complete(self._function(*args, **kwargs))
+    def __memo_key(self, args: tuple, kwargs: dict) -> str | None:
+        # None when results are not memoized, or the arguments can not be told apart reliably
+        if self._memoize is None:
+            return None
+        return make_args_key(self.key, self._signature, args, kwargs)
 
-            __thread = threading.Thread(
-                target=__func,
-                args=(asyncio.new_event_loop(),)
-            )
-            __thread.start()
-            __thread.join(timeout=None)
-            return __res
-        return self._function(*args, **kwargs)
+    async def __acall_within_timeout(self, *args, **kwargs):
+        timeout = bound_timeout(self._timeout)
+        if timeout is None:
+            return await self.__acall(*args, **kwargs)
+        task = asyncio.ensure_future(self.__acall(*args, **kwargs))
+        try:
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if not done:
+            task.cancel()
+            raise AbilityTimeoutException(timeout)
+        return task.result()
+
+    async def __acall(self, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        if self._execution == ExecutionPolicy.PROCESS and self.__transferable(args, kwargs):
+            return await loop.run_in_executor(get_process_pool(), _call_in_process, self._function, args, kwargs)
+        if inspect.iscoroutinefunction(self._function):
+            return await self._function(*args, **kwargs)
+        if self._execution == ExecutionPolicy.INLINE:
+            return await asyncio.to_thread(self._function, *args, **kwargs)
+        return await loop.run_in_executor(get_thread_pool(), functools.partial(
+            contextvars.copy_context().run, self._function, *args, **kwargs))
+
+    def __transferable(self, args: tuple, kwargs: dict) -> bool:
+        # the function travels to a worker process by reference, its arguments by value
+        try:
+            pickle.dumps((self._function, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            log.warning(f'AbilityWarn: {self._name} runs on a thread instead of a process, '
+                        f'it or its arguments can not be pickled. {e}')
+            return False
+        return True
 
     def to_dict(self) -> dict:
         param_list: list = list()
@@ -59,18 +185,85 @@ class Ability:
                 param_list.append(name)
         return {
             'ability_name': self._name,
-            'description': self._description,
+            'description': self.__describe(),
             'parameters_required': param_list,
             'returns': str(self._returns)
         }
 
+    def to_tool(self, name: str | None = None) -> dict:
+        # an OpenAI style function schema, accepted by BaseChatModel.bind_tools
+        description = self.__describe()
+        param_descriptions = dict()
+        if isinstance(description, dict):
+            for param in description.get('parameters', list()):
+                if isinstance(param, dict):
+                    for param_name, param_info in param.items():
+                        if isinstance(param_info, dict):
+                            param_descriptions[param_name] = str(param_info.get('description', ''))
+        properties, required = dict(), list()
+        for param_name, param in self._tool_parameters().items():
+            prop = dict()
+            json_type = JSON_SCHEMA_TYPES.get(typing.get_origin(param.annotation) or param.annotation, None)
+            if json_type is not None:
+                prop['type'] = json_type
+            if param_name in param_descriptions.keys():
+                prop['description'] = param_descriptions[param_name]
+            properties[param_name] = prop
+            if param.default is inspect.Parameter.empty:
+                required.append(param_name)
+        return {
+            'type': 'function',
+            'function': {
+                'name': name if name is not None else self._name,
+                'description': json.dumps(description, ensure_ascii=False)
+                if isinstance(description, dict) else str(description),
+                'parameters': {
+                    'type': 'object',
+                    'properties': properties,
+                    'required': required
+                }
+            }
+        }
+
+    def _tool_parameters(self) -> dict[str, inspect.Parameter]:
+        return {
+            name: param for name, param in inspect.signature(self._function).parameters.items()
+            if param.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        }
+
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def execution(self) -> ExecutionPolicy:
+        return self._execution
+
+    @property
+    def timeout(self) -> float | None:
+        return self._timeout
+
+    @property
+    def memoize(self) -> bool:
+        return self._memoize is not None
+
+    @property
+    def key(self) -> str:
+        if self._key is None:
+            self._key = self._identity()
+        return self._key
+
+    def _identity(self) -> str:
+        return source_key(self._function)
+
     @property
     def description(self) -> str:
-        return self._description
+        return self.__describe()
+
+    @property
+    def pending(self) -> bool:
+        # whether reading the description would first generate a lazy docstring
+        return self._description is None and getattr(self._function, PENDING_DOCSTRING_ATTR, None) is not None
 
     @property
     def parameters(self) -> dict:
@@ -83,3 +276,17 @@ class Ability:
     @property
     def function(self) -> Callable:
         return self._function
+
+
+def _call_in_process(function: Callable, args: tuple, kwargs: dict) -> any:
+    if inspect.iscoroutinefunction(function):
+        return asyncio.run(function(*args, **kwargs))
+    return function(*args, **kwargs)
+
+
+def source_key(function: Callable) -> str:
+    try:
+        __src = inspect.getsource(function)
+    except (OSError, TypeError):
+        __src = f'{getattr(function, "__module__", None)}.{getattr(function, "__qualname__", repr(function))}'
+    return hashlib.md5(__src.encode('utf-8')).hexdigest()
@@ -0,0 +1,34 @@
+import inspect
+
+from ceo.ability.ability import Ability
+from ceo.retrieval.bm25 import BM25Index, flatten_text
+
+
+class AbilityIndex:
+    def __init__(self, abilities: list[Ability] | None = None):
+        self._index = BM25Index()
+        self._abilities: dict[str, Ability] = dict()
+        if abilities is not None:
+            for ability in abilities:
+                self.add(ability)
+
+    def __len__(self) -> int:
+        return len(self._abilities)
+
+    @staticmethod
+    def text_of(ability: Ability) -> str:
+        # lazy docstrings are left pending, the function's own docstring stands in for them
+        description = inspect.getdoc(ability.function) or str() if ability.pending else ability.description
+        return ' '.join((
+            ability.name.replace('_', ' '),
+            ' '.join(ability.parameters.keys()).replace('_', ' '),
+            flatten_text(description)
+        ))
+
+    def add(self, ability: Ability):
+        self._abilities[ability.key] = ability
+        self._index.add(ability.key, self.text_of(ability))
+        return self
+
+    def search(self, query: str, k: int) -> list[Ability]:
+        return [self._abilities[key] for key, _ in self._index.search(query, k)]
@@ -0,0 +1,64 @@
+from collections.abc import Iterator
+from typing import Callable
+
+from ceo.ability.ability import Ability, source_key
+
+
+class AbilityRegistry:
+    def __init__(self, abilities: list[Callable | Ability] | None = None):
+        self._abilities: dict[str, Ability] = dict()
+        self._version = 0
+        self._snapshot: list[Ability] | None = None
+        if abilities is not None:
+            for ability in abilities:
+                self.add(ability)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @staticmethod
+    def key_of(ability: Callable | Ability) -> str:
+        if isinstance(ability, Ability):
+            return ability.key
+        return source_key(ability)
+
+    def add(self, ability: Callable | Ability) -> Ability | None:
+        key = self.key_of(ability)
+        if key in self._abilities:
+            return None
+        if not isinstance(ability, Ability):
+            ability = Ability(ability)
+        self._abilities[key] = ability
+        self.__changed()
+        return ability
+
+    def remove(self, ability: Callable | Ability) -> Ability | None:
+        removed = self._abilities.pop(self.key_of(ability), None)
+        if removed is not None:
+            self.__changed()
+        return removed
+
+    def get(self, key: str) -> Ability | None:
+        return self._abilities.get(key, None)
+
+    def to_list(self) -> list[Ability]:
+        if self._snapshot is None:
+            self._snapshot = list(self._abilities.values())
+        return self._snapshot
+
+    def __changed(self):
+        self._version += 1
+        self._snapshot = None
+
+    def __contains__(self, ability: Callable | Ability) -> bool:
+        return self.key_of(ability) in self._abilities
+
+    def __iter__(self) -> Iterator[Ability]:
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        return len(self._abilities)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(size={len(self._abilities)}, version={self._version})'
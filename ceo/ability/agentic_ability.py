@@ -1,11 +1,12 @@
 import json
 import logging
-from collections import OrderedDict
+from collections.abc import Mapping
 
 from typing_extensions import override
 
 from ceo.ability import Ability
 from ceo.brain.memory_augment import MemoryAugment
+from ceo.memory import OverlayMemoryStore
 
 PREFIX = '__AgenticAbility__'
 
@@ -17,7 +18,7 @@ log = logging.getLogger('ceo.ability')
 class AgenticAbility(Ability):
     def __init__(self, agent: BaseAgent | MemoryAugment):
         try:
-            _test_mem = agent.memory
+            _test_mem = agent.memory_view
         except AttributeError:
             raise TypeError("The 'agent' of AgenticAbility should be instance of 'ceo.Agent'.")
         self._agent = agent
@@ -62,10 +63,53 @@ class AgenticAbility(Ability):
         log.debug(f'Agent dispatcher generated. {self.__name__}: {self.__doc__}')
 
     @override
-    def __call__(self, request: str, request_by_step: str, memory: OrderedDict, *args, **kwargs) -> str:
-        self._agent.relay(request_by_step=request_by_step, request=request)
-        self._agent.bring_in_memory(memory)
-        result = self._agent.just_do_it()
+    def _identity(self) -> str:
+        return self._name
+
+    @override
+    def _tool_parameters(self) -> dict:
+        # the delegating agent fills in request and memory itself
+        return dict()
+
+    @override
+    def __call__(self, request: str, request_by_step: str, memory: Mapping | OverlayMemoryStore,
+                 *args, **kwargs) -> str:
+        agent = self.__session()
+        agent.relay(request_by_step=request_by_step, request=request)
+        agent.bring_in_memory(self.__memory_for(agent, memory))
+        return self.__clean_result(agent.just_do_it())
+
+    @override
+    async def acall(self, request: str, request_by_step: str, memory: Mapping | OverlayMemoryStore,
+                    *args, **kwargs) -> str:
+        agent = await self.__asession()
+        agent.relay(request_by_step=request_by_step, request=request)
+        agent.bring_in_memory(self.__memory_for(agent, memory))
+        return self.__clean_result(await agent.ajust_do_it())
+
+    def __session(self) -> BaseAgent | MemoryAugment:
+        # a session per call, so the same agent can take several delegations at once
+        session = getattr(self._agent, 'session', None)
+        if session is None:
+            return self._agent
+        return session()
+
+    async def __asession(self) -> BaseAgent | MemoryAugment:
+        # the introduction a new session needs is generated without blocking the event loop
+        asession = getattr(self._agent, 'asession', None)
+        if asession is None:
+            return self._agent
+        return await asession()
+
+    @staticmethod
+    def __memory_for(agent: BaseAgent | MemoryAugment, memory: Mapping | OverlayMemoryStore) -> Mapping:
+        # agents without sessions only take plain mappings
+        if isinstance(memory, OverlayMemoryStore) and getattr(agent, 'session', None) is None:
+            return memory.view()
+        return memory
+
+    @staticmethod
+    def __clean_result(result: dict | str) -> str:
         if isinstance(result, dict):
             if 'conclusion' in result.keys():
                 del result['conclusion']
@@ -0,0 +1,81 @@
+import atexit
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import threading
+
+DEFAULT_THREAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_PROCESS_WORKERS = os.cpu_count() or 1
+log = logging.getLogger('ceo.ability')
+
+# shared by every ability of every agent in the process, so their total concurrency stays bounded
+__thread_pool: concurrent.futures.ThreadPoolExecutor | None = None
+__process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+__thread_workers = DEFAULT_THREAD_WORKERS
+__process_workers = DEFAULT_PROCESS_WORKERS
+__executors_lock = threading.Lock()
+
+
+def get_thread_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global __thread_pool
+    with __executors_lock:
+        if __thread_pool is None:
+            __thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=__thread_workers,
+                                                                  thread_name_prefix='ceo-ability')
+            log.debug(f'Ability thread pool started. Workers: {__thread_workers};')
+        return __thread_pool
+
+
+def get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global __process_pool
+    with __executors_lock:
+        if __process_pool is None:
+            # spawned workers do not inherit the locks and threads of the agent process
+            __process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=__process_workers,
+                                                                    mp_context=multiprocessing.get_context('spawn'))
+            log.debug(f'Ability process pool started. Workers: {__process_workers};')
+        return __process_pool
+
+
+def submit_to_own_thread(func, *args, **kwargs) -> concurrent.futures.Future:
+    # for calls which may be abandoned once their caller stops waiting, so they never hold a worker of the pools
+    future = concurrent.futures.Future()
+
+    def __run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=__run, name='ceo-ability-timed', daemon=True).start()
+    return future
+
+
+def set_executor_limits(thread_workers: int | None = None, process_workers: int | None = None):
+    # takes effect for pools started afterwards, running pools are shut down once idle
+    global __thread_workers, __process_workers
+    if (thread_workers is not None and thread_workers < 1) or (process_workers is not None and process_workers < 1):
+        raise ValueError('An ability executor needs at least 1 worker.')
+    with __executors_lock:
+        if thread_workers is not None:
+            __thread_workers = thread_workers
+        if process_workers is not None:
+            __process_workers = process_workers
+    shutdown_executors(wait=False)
+
+
+def shutdown_executors(wait: bool = True):
+    global __thread_pool, __process_pool
+    with __executors_lock:
+        thread_pool, process_pool = __thread_pool, __process_pool
+        __thread_pool = __process_pool = None
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=wait)
+    if process_pool is not None:
+        process_pool.shutdown(wait=wait)
+
+
+atexit.register(shutdown_executors)
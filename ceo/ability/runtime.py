@@ -0,0 +1,157 @@
+import asyncio
+import atexit
+import concurrent.futures
+import itertools
+import logging
+import threading
+from typing import Coroutine
+
+from ceo.exception.ability_timeout_exception import AbilityTimeoutException
+
+DEFAULT_POOL_SIZE = 1
+log = logging.getLogger('ceo.ability')
+
+
+class AbilityRuntime:
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        if size < 1:
+            raise ValueError('The size of AbilityRuntime should be at least 1.')
+        self._size = size
+        self._loops: list[asyncio.AbstractEventLoop] = list()
+        self._threads: list[threading.Thread] = list()
+        self._thread_ids: set[int] = set()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def running(self) -> bool:
+        return len(self._loops) > 0 and not self._closed
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('AbilityRuntime has been shut down.')
+            if len(self._loops) > 0:
+                return self
+            for i in range(self._size):
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(
+                    target=self.__serve,
+                    args=(loop, ready),
+                    name=f'ceo-ability-runtime-{i}',
+                    daemon=True
+                )
+                thread.start()
+                ready.wait()
+                self._loops.append(loop)
+                self._threads.append(thread)
+                self._thread_ids.add(thread.ident)
+        log.debug(f'AbilityRuntime started. Loops: {self._size};')
+        return self
+
+    def __serve(self, loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        if not self.running:
+            self.start()
+        loop = self._loops[next(self._counter) % self._size]
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> any:
+        if threading.get_ident() in self._thread_ids:
+            # called from inside a runtime loop, blocking on it here would deadlock
+            return self.__run_isolated(coro, timeout)
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise AbilityTimeoutException(timeout)
+
+    @staticmethod
+    def __run_isolated(coro: Coroutine, timeout: float | None) -> any:
+        __res = __exc = None
+
+        def __func():
+            nonlocal __res, __exc
+            try:
+                __res = asyncio.run(asyncio.wait_for(coro, timeout=timeout))
+            except asyncio.TimeoutError:
+                __exc = AbilityTimeoutException(timeout)
+            except BaseException as e:
+                __exc = e
+
+        __thread = threading.Thread(target=__func)
+        __thread.start()
+        __thread.join()
+        if __exc is not None:
+            raise __exc
+        return __res
+
+    def shutdown(self, timeout: float | None = 5.0):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            loops, threads = self._loops, self._threads
+            self._loops, self._threads = list(), list()
+            self._thread_ids = set()
+        for loop in loops:
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in threads:
+            thread.join(timeout=timeout)
+        log.debug(f'AbilityRuntime shut down. Loops: {len(loops)};')
+
+
+__default_runtime: AbilityRuntime | None = None
+__default_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AbilityRuntime:
+    global __default_runtime
+    with __default_runtime_lock:
+        if __default_runtime is None or __default_runtime.closed:
+            __default_runtime = AbilityRuntime()
+        return __default_runtime
+
+
+def set_runtime(runtime: AbilityRuntime) -> AbilityRuntime:
+    global __default_runtime
+    with __default_runtime_lock:
+        previous = __default_runtime
+        __default_runtime = runtime
+    if previous is not None and previous is not runtime:
+        previous.shutdown()
+    return runtime
+
+
+def shutdown_runtime(timeout: float | None = 5.0):
+    global __default_runtime
+    with __default_runtime_lock:
+        runtime, __default_runtime = __default_runtime, None
+    if runtime is not None:
+        runtime.shutdown(timeout=timeout)
+
+
+atexit.register(shutdown_runtime)
@@ -1,73 +1,247 @@
-import copy
+import asyncio
+import concurrent.futures
+import contextvars
 import hashlib
 import json
 import logging
-import random
+import queue
+import threading
+import warnings
 import datetime
 import time
+from collections.abc import Iterator, AsyncIterator
 from typing import Callable
 from typing_extensions import override
-from collections import OrderedDict
+from collections.abc import Mapping
 
 from langchain_core.language_models import BaseChatModel
 
+from ceo.ability import Ability, AbilityIndex
 from ceo.ability.agentic_ability import PREFIX as AGENTIC_ABILITY_PREFIX
-from ceo.brain.base_agent import BaseAgent
+from ceo.brain.agent_event import AgentEvent
+from ceo.brain.base_agent import BaseAgent, SYSTEM_ABILITY_PREFIX
 from ceo.brain.memory_augment import MemoryAugment
+from ceo.brain.termination_policy import TerminationPolicy
+from ceo.deadline import run_deadline, deadline_exceeded, call_before_deadline, await_before_deadline
+from ceo.enum.EventType import EventType
 from ceo.enum.Personality import Personality
+from ceo.exception.deadline_exceeded_exception import DeadlineExceededException
+from ceo.exception.run_cancelled_exception import RunCancelledException
+from ceo.memory import MemoryStore, MemoryPolicy, OverlayMemoryStore, WorkingMemory
+from ceo.profile import RunProfile, current_profile, profiling
+from ceo.retrieval import flatten_text
 from ceo.prompt import (
     NextMovePrompt,
     ExecutorPrompt,
-    IntrospectionPrompt
+    IntrospectionPrompt,
+    MemorySummaryPrompt
 )
 
+# termination probabilities and penalty rates of the deprecated stop()/penalize() scheme, reported by p and beta
 PRUDENT_P = 0.25
 PRUDENT_BETA = 1.45
 INQUISITIVE_P = 0.05
 INQUISITIVE_BETA = 1.25
+MAX_CONCURRENT_ACTIONS = 8
+STREAM_END = object()
 log = logging.getLogger('ceo')
+_share_lock = threading.Lock()
 
 
 class Agent(BaseAgent, MemoryAugment):
     def __init__(self, abilities: list[Callable],
                  brain: BaseChatModel, name: str = '',
                  personality: Personality = Personality.PRUDENT,
-                 request: str = '', memory: OrderedDict | None = None):
+                 request: str = '', memory: Mapping | MemoryStore | None = None,
+                 multi_action: bool = False, memory_policy: MemoryPolicy | None = None,
+                 profile_callback: Callable[[RunProfile], any] | None = None,
+                 summarize_actions: bool = True,
+                 event_callback: Callable[[AgentEvent], any] | None = None,
+                 tool_calling: bool = False,
+                 ability_top_k: int | None = None,
+                 time_limit: float | None = None,
+                 termination_policy: TerminationPolicy | None = None):
         BaseAgent.__init__(self, abilities=abilities, brain=brain, name=name, request=request)
-        MemoryAugment.__init__(self, memory=memory)
+        MemoryAugment.__init__(self, memory=memory, memory_policy=memory_policy)
         self.__expected_step = 0
-        if personality == Personality.PRUDENT:
-            self._p = self.__base_p = PRUDENT_P
-            self._beta = PRUDENT_BETA
-        elif personality == Personality.INQUISITIVE:
-            self._p = self.__base_p = INQUISITIVE_P
-            self._beta = INQUISITIVE_BETA
+        self._multi_action = multi_action
+        self._tool_calling = tool_calling
+        self._ability_top_k = ability_top_k
+        self._time_limit = time_limit
+        self._ability_index: AbilityIndex | None = None
+        self._ability_index_version = -1
+        self._shown_abilities: set[str] = set()
+        self._pinned_abilities: set[str] = set()
+        self._more_abilities = self.__new_more_abilities()
+        self._working_memory = self.__new_working_memory()
+        self._profile_callback = profile_callback
+        self._summarize_actions = summarize_actions
+        self._event_callback = event_callback
+        self._stream_sink: Callable[[AgentEvent], any] | None = None
+        self._cancelled: threading.Event | None = None
+        self._introducing: asyncio.Task | None = None
+        if termination_policy is None:
+            termination_policy = TerminationPolicy.of(personality)
+        self._termination_policy = termination_policy
+        self._costliest_step: dict | None = None
+        self._p, self._beta = Agent.__legacy_penalty(personality)
+        self.__base_p = self._p
+
+    @staticmethod
+    def __legacy_penalty(personality: Personality) -> tuple[float, float]:
+        if personality == Personality.INQUISITIVE:
+            return INQUISITIVE_P, INQUISITIVE_BETA
+        return PRUDENT_P, PRUDENT_BETA
 
     @property
     def p(self) -> float:
+        warnings.warn('Agent.p is deprecated, termination is decided by Agent.termination_policy.',
+                      DeprecationWarning, stacklevel=2)
         return self._p
 
     @property
     def base_p(self) -> float:
+        warnings.warn('Agent.base_p is deprecated, termination is decided by Agent.termination_policy.',
+                      DeprecationWarning, stacklevel=2)
         return self.__base_p
 
     @property
     def beta(self) -> float:
+        warnings.warn('Agent.beta is deprecated, termination is decided by Agent.termination_policy.',
+                      DeprecationWarning, stacklevel=2)
         return self._beta
 
+    @property
+    def termination_policy(self) -> TerminationPolicy:
+        return self._termination_policy
+
+    @property
+    def multi_action(self) -> bool:
+        return self._multi_action
+
+    @property
+    def tool_calling(self) -> bool:
+        return self._tool_calling
+
+    @property
+    def ability_top_k(self) -> int | None:
+        return self._ability_top_k
+
+    @property
+    def time_limit(self) -> float | None:
+        return self._time_limit
+
+    @property
+    def summarize_actions(self) -> bool:
+        return self._summarize_actions
+
+    @property
+    def working_memory(self) -> Mapping | None:
+        if self._working_memory is None:
+            return self.memory_view
+        return self._working_memory.render(self.memory_view, query=f'{self._request} {self._request_by_step}')
+
+    def __new_working_memory(self) -> WorkingMemory | None:
+        if self._memory_policy is None:
+            return None
+        summarizer = None
+        if self._memory_policy.summarize:
+            summarizer = lambda previous_summary, events: MemorySummaryPrompt(
+                previous_summary=previous_summary,
+                events=events
+            ).invoke(self._model)
+        return WorkingMemory(self._memory_policy, summarizer=summarizer)
+
+    @override
+    def __getstate__(self) -> dict:
+        state = BaseAgent.__getstate__(self)
+        # callbacks and in-flight run state belong to this process only
+        state['_working_memory'] = None
+        state['_profile_callback'] = state['_event_callback'] = None
+        state['_stream_sink'] = state['_cancelled'] = None
+        state['_ability_index'], state['_more_abilities'] = None, None
+        state['_introducing'] = None
+        return state
+
+    @override
+    def __setstate__(self, state: dict):
+        BaseAgent.__setstate__(self, state)
+        self._working_memory = self.__new_working_memory()
+        self._more_abilities = self.__new_more_abilities()
+
+    def set_memory_policy(self, memory_policy: MemoryPolicy | None):
+        self._memory_policy = memory_policy
+        self._working_memory = self.__new_working_memory()
+        return self
+
     @override
-    def bring_in_memory(self, memory: OrderedDict):
+    def bring_in_memory(self, memory: Mapping | OverlayMemoryStore):
+        if isinstance(memory, OverlayMemoryStore):
+            if len(self._memory) < 1 and not self._memory.durable:
+                # delegated to, the delegating agent's memory is read in place and this run only adds the delta
+                self._memory = memory
+                log.debug(f'Agent: {self._name}; Memory brought in: {len(memory)} (shared);')
+                return self
+            memory = memory.view()
         self._memory.update(memory)
         log.debug(f'Agent: {self._name}; '
-                  f'Memory brought in: {len(memory.keys())};')
+                  f'Memory brought in: {len(memory)};')
+        return self
+
+    def session(self, memory: Mapping | MemoryStore | None = None) -> 'Session':
+        return Session(self, memory=memory)
+
+    def _share(self):
+        # resolve what every session reads from this agent once, before any of them starts
+        with _share_lock:
+            if self._introduction_outdated:
+                self.introduce()
+            if self._ability_top_k is not None:
+                self.__ability_index()
+        return self
+
+    async def asession(self, memory: Mapping | MemoryStore | None = None) -> 'Session':
+        await self._ashare()
+        return Session(self, memory=memory)
+
+    async def _ashare(self):
+        # as _share(), but the introduction is generated without blocking the event loop,
+        # and only once for all the coroutines that need it at the same time
+        if self._introduction_outdated:
+            loop = asyncio.get_running_loop()
+            with _share_lock:
+                introducing = self._introducing
+                if introducing is None or introducing.get_loop() is not loop:
+                    introducing = self._introducing = loop.create_task(self.aintroduce())
+            try:
+                await asyncio.shield(introducing)
+            finally:
+                with _share_lock:
+                    if self._introducing is introducing and introducing.done():
+                        self._introducing = None
+        return self._share()
+
+    def _begin(self, memory: Mapping | MemoryStore | None = None):
+        # a durable store of the agent is kept by reposition(), any other memory is left to the agent
+        self._request = self._request_by_step = str()
+        self._stream_sink = self._cancelled = None
+        self.reposition()
+        if isinstance(memory, MemoryStore):
+            self._memory = memory
+        elif memory is not None:
+            self._memory = MemoryStore(memory)
+        self._more_abilities = self.__new_more_abilities()
         return self
 
     @override
     def reposition(self):
         BaseAgent.reposition(self)
-        self._memory = OrderedDict()
+        if self._memory is None or not self._memory.durable:
+            self._memory = MemoryStore()
+        self._working_memory = self.__new_working_memory()
+        self._shown_abilities, self._pinned_abilities = set(), set()
         self.__expected_step = 0
-        self._p = self.__base_p
+        self._costliest_step = None
         return self
 
     @override
@@ -75,10 +249,19 @@ class Agent(BaseAgent, MemoryAugment):
         BaseAgent.assign(self, request)
         return self.reposition()
 
+    @override
+    async def aassign(self, request: str):
+        await BaseAgent.aassign(self, request)
+        return self.reposition()
+
     @override
     def reassign(self, request: str):
         return self.assign(request)
 
+    @override
+    async def areassign(self, request: str):
+        return await self.aassign(request)
+
     @override
     def relay(self, request: str, request_by_step: str):
         self._request = request
@@ -87,42 +270,308 @@ class Agent(BaseAgent, MemoryAugment):
 
     @override
     def just_do_it(self) -> dict:
+        try:
+            with profiling(self.__new_profile()) as profile, run_deadline(self._time_limit):
+                result = self.__just_do_it()
+        except RunCancelledException:
+            self.reposition()
+            raise
+        result['misc']['profile'] = profile.to_dict()
+        self.__emit(EventType.RESULT, result, step=result['misc']['step_count'])
+        return result
+
+    async def ajust_do_it(self) -> dict:
+        try:
+            with profiling(self.__new_profile()) as profile, run_deadline(self._time_limit):
+                result = await self.__ajust_do_it()
+        except (RunCancelledException, asyncio.CancelledError):
+            self.reposition()
+            raise
+        result['misc']['profile'] = profile.to_dict()
+        self.__emit(EventType.RESULT, result, step=result['misc']['step_count'])
+        return result
+
+    def stream(self) -> Iterator[AgentEvent]:
+        events = queue.Queue()
+        cancelled = threading.Event()
+        outcome = dict()
+        self._stream_sink, self._cancelled = events.put, cancelled
+
+        def __run():
+            try:
+                self.just_do_it()
+            except BaseException as e:
+                outcome['error'] = e
+            finally:
+                self._stream_sink = self._cancelled = None
+                events.put(STREAM_END)
+
+        __thread = threading.Thread(target=contextvars.copy_context().run, args=(__run,), daemon=True)
+        __thread.start()
+        try:
+            while True:
+                event = events.get()
+                if event is STREAM_END:
+                    break
+                yield event
+            if 'error' in outcome.keys():
+                raise outcome['error']
+        finally:
+            cancelled.set()
+
+    async def astream(self) -> AsyncIterator[AgentEvent]:
+        events = asyncio.Queue()
+        cancelled = threading.Event()
+        self._stream_sink, self._cancelled = events.put_nowait, cancelled
+        task = asyncio.ensure_future(self.ajust_do_it())
+        task.add_done_callback(lambda _: events.put_nowait(STREAM_END))
+        try:
+            while True:
+                event = await events.get()
+                if event is STREAM_END:
+                    break
+                yield event
+            task.result()
+        finally:
+            cancelled.set()
+            if not task.done():
+                task.cancel()
+            self._stream_sink = self._cancelled = None
+
+    def set_event_callback(self, event_callback: Callable[[AgentEvent], any] | None):
+        self._event_callback = event_callback
+        return self
+
+    def __emit(self, event_type: EventType, data: dict | None = None, step: int | None = None):
+        cancelled = self._cancelled
+        if cancelled is not None and cancelled.is_set():
+            raise RunCancelledException(self._name)
+        if self._event_callback is None and self._stream_sink is None:
+            return
+        event = AgentEvent(event_type=event_type, agent_name=self._name, step=self._act_count if step is None else step, data=data)
+        if self._event_callback is not None:
+            self._event_callback(event)
+        if self._stream_sink is not None:
+            self._stream_sink(event)
+
+    def __conclusion_sink(self) -> Callable[[str], any] | None:
+        if self._event_callback is None and self._stream_sink is None:
+            return None
+        return lambda chunk: self.__emit(EventType.CONCLUSION_CHUNK, {'text': chunk})
+
+    def __conclusion_reset(self) -> Callable[[int], any] | None:
+        # a malformed conclusion is retried, subscribers drop the chunks they got so far
+        if self._event_callback is None and self._stream_sink is None:
+            return None
+        return lambda retry: self.__emit(EventType.CONCLUSION_RESET, {'retry': retry})
+
+    @staticmethod
+    def __describe_next_move(next_move: tuple[Ability, dict] | list[tuple[Ability, dict]] | bool) -> dict:
+        if isinstance(next_move, bool):
+            return {'moves': [], 'mission_complete': next_move}
+        if isinstance(next_move, tuple):
+            next_move = [next_move]
+        return {'moves': [{'ability': action.name, 'args': args} for action, args in next_move]}
+
+    def __new_profile(self) -> RunProfile:
+        return RunProfile(agent_name=self._name, parent=current_profile(), callback=self._profile_callback)
+
+    def set_summarize_actions(self, summarize_actions: bool):
+        self._summarize_actions = summarize_actions
+        return self
+
+    def set_tool_calling(self, tool_calling: bool):
+        self._tool_calling = tool_calling
+        return self
+
+    def set_ability_top_k(self, ability_top_k: int | None):
+        self._ability_top_k = ability_top_k
+        return self
+
+    def set_time_limit(self, time_limit: float | None):
+        self._time_limit = time_limit
+        return self
+
+    @override
+    def _relevant_abilities(self) -> list[Ability]:
+        abilities = self.abilities
+        if self._ability_top_k is None or len(abilities) <= self._ability_top_k:
+            return abilities
+        selected = {ability.key for ability in self.__ability_index().search(self.__ability_query(),
+                                                                             self._ability_top_k)}
+        selected.update(self._pinned_abilities)
+        # system abilities are always listed, in the order they were granted
+        relevant = [ability for ability in abilities
+                    if ability.key in selected or ability.name.startswith(SYSTEM_ABILITY_PREFIX)]
+        self._shown_abilities = {ability.key for ability in relevant}
+        relevant.append(self._more_abilities)
+        return relevant
+
+    def __ability_index(self) -> AbilityIndex:
+        if self._ability_index is None or self._ability_index_version != self._abilities.version:
+            self._ability_index = AbilityIndex([ability for ability in self.abilities
+                                                if not ability.name.startswith(SYSTEM_ABILITY_PREFIX)])
+            self._ability_index_version = self._abilities.version
+        return self._ability_index
+
+    def __ability_query(self) -> str:
+        query = f'{self._request} {self._request_by_step}'
+        memory = self.memory_view
+        if memory is not None and len(memory) > 0:
+            query += f' {flatten_text(memory.latest())}'
+        return query
+
+    def __new_more_abilities(self) -> Ability:
+        def list_more_abilities(query: str) -> dict:
+            """
+            What does this ability do: To find more of your abilities, which are not listed yet.
+            Use it only when none of the listed abilities can advance the request.
+            :param query: Keywords describing what the ability you need should do.
+            :return: Names of the abilities found, they are listed to you from now on.
+            """
+            limit = len(self._shown_abilities) + (self._ability_top_k or 0)
+            found = [ability for ability in self.__ability_index().search(query, limit)
+                     if ability.key not in self._shown_abilities][:self._ability_top_k]
+            self._pinned_abilities.update(ability.key for ability in found)
+            return {
+                'success': len(found) > 0,
+                'abilities_found': [ability.name for ability in found]
+            }
+
+        list_more_abilities.__name__ = f'{SYSTEM_ABILITY_PREFIX}{list_more_abilities.__name__}'
+        return Ability(list_more_abilities)
+
+    def set_profile_callback(self, profile_callback: Callable[[RunProfile], any] | None):
+        self._profile_callback = profile_callback
+        return self
+
+    def __just_do_it(self) -> dict:
         __start_time = time.perf_counter()
+        out_of_time = False
         if self.__expected_step < 1:
-            self.estimate_step()
+            try:
+                call_before_deadline(self.estimate_step)
+            except DeadlineExceededException:
+                out_of_time = True
         log.debug(f'Agent: {self._name}; Expected steps: {self.__expected_step}; Request: "{self._request}";')
         stop = False
         while True:
-            if self._act_count > self.__expected_step:
-                stop = self.stop()
-                self.penalize()
+            stop = self.stop()
             next_move = False
-            if not stop:
+            out_of_time = out_of_time or deadline_exceeded()
+            if not stop and not out_of_time:
+                self.__emit(EventType.STEP_START)
+                step_usage = self.__usage()
                 combined_request = {
                     'raw_request': self._request,
                     'request_by_step': self._request_by_step
                 }
-                next_move = NextMovePrompt(
-                    request=combined_request,
-                    abilities=self._abilities,
-                    history=self.memory
-                ).invoke(self._model)
-                if not isinstance(next_move, bool):
-                    action, args = next_move
-                    if action.name.startswith(AGENTIC_ABILITY_PREFIX):
-                        args = {
-                            'request': self._request,
-                            'request_by_step': self._request_by_step,
-                            'memory': self.memory
-                        }
-                    self.memorize(ExecutorPrompt(args=args, action=action).invoke(model=self._model))
-                    self._act_count += 1
-                    continue
-            brief_conclusion, response = IntrospectionPrompt(
-                request=self._request,
-                history=self.memory,
-                self_info=self.introduction
-            ).invoke(self._model)
+                try:
+                    next_move = call_before_deadline(NextMovePrompt(
+                        request=combined_request,
+                        abilities=self._relevant_abilities(),
+                        history=self.working_memory,
+                        multi_action=self._multi_action,
+                        tool_calling=self._tool_calling,
+                        ext_context=self.__budget_hint()
+                    ).invoke, self._model)
+                except DeadlineExceededException:
+                    out_of_time = True
+                else:
+                    next_move = self.__fit_budget(next_move)
+                    self.__emit(EventType.NEXT_MOVE, self.__describe_next_move(next_move))
+                    if not isinstance(next_move, bool):
+                        moves = next_move if self._multi_action else [next_move]
+                        for action_taken in self.execute(moves):
+                            self.memorize(action_taken)
+                        self._act_count += len(moves)
+                        self.__measure_step(step_usage)
+                        continue
+            if not out_of_time:
+                try:
+                    brief_conclusion, response = call_before_deadline(IntrospectionPrompt(
+                        request=self._request,
+                        history=self.working_memory,
+                        self_info=self.introduction
+                    ).invoke, self._model, on_chunk=self.__conclusion_sink(),
+                        on_retry=self.__conclusion_reset())
+                except DeadlineExceededException:
+                    out_of_time = True
+            if out_of_time:
+                brief_conclusion, response = self.__best_effort_conclusion()
+            __time_used = time.perf_counter() - __start_time
+            __step_count = self._act_count
+            self.reposition()
+            log.debug(f'Agent: {self._name}; Conclusion: {brief_conclusion};')
+            log.debug(f'Agent: {self._name}; Step count: {__step_count}; Time used: {__time_used} seconds;')
+            return {
+                "success": next_move,
+                "conclusion": brief_conclusion,
+                "raw_response": response,
+                'misc': {
+                    'time_used': __time_used,
+                    'step_count': __step_count,
+                    'out_of_time': out_of_time,
+                    'stopped_by_budget': stop
+                }
+            }
+
+    async def __ajust_do_it(self) -> dict:
+        __start_time = time.perf_counter()
+        out_of_time = False
+        if self.__expected_step < 1:
+            try:
+                await await_before_deadline(self.aestimate_step())
+            except DeadlineExceededException:
+                out_of_time = True
+        log.debug(f'Agent: {self._name}; Expected steps: {self.__expected_step}; Request: "{self._request}";')
+        stop = False
+        while True:
+            stop = self.stop()
+            next_move = False
+            out_of_time = out_of_time or deadline_exceeded()
+            if not stop and not out_of_time:
+                self.__emit(EventType.STEP_START)
+                step_usage = self.__usage()
+                combined_request = {
+                    'raw_request': self._request,
+                    'request_by_step': self._request_by_step
+                }
+                try:
+                    next_move = await await_before_deadline(NextMovePrompt(
+                        request=combined_request,
+                        abilities=self._relevant_abilities(),
+                        history=self.working_memory,
+                        multi_action=self._multi_action,
+                        tool_calling=self._tool_calling,
+                        ext_context=self.__budget_hint()
+                    ).ainvoke(self._model))
+                except DeadlineExceededException:
+                    out_of_time = True
+                else:
+                    next_move = self.__fit_budget(next_move)
+                    self.__emit(EventType.NEXT_MOVE, self.__describe_next_move(next_move))
+                    if not isinstance(next_move, bool):
+                        moves = next_move if self._multi_action else [next_move]
+                        for action_taken in await self.aexecute(moves):
+                            self.memorize(action_taken)
+                        self._act_count += len(moves)
+                        self.__measure_step(step_usage)
+                        continue
+            if not out_of_time:
+                try:
+                    if self._introduction_outdated:
+                        await await_before_deadline(self._ashare())
+                    brief_conclusion, response = await await_before_deadline(IntrospectionPrompt(
+                        request=self._request,
+                        history=self.working_memory,
+                        self_info=self.introduction
+                    ).ainvoke(self._model, on_chunk=self.__conclusion_sink(),
+                                   on_retry=self.__conclusion_reset()))
+                except DeadlineExceededException:
+                    out_of_time = True
+            if out_of_time:
+                brief_conclusion, response = self.__best_effort_conclusion()
             __time_used = time.perf_counter() - __start_time
             __step_count = self._act_count
             self.reposition()
@@ -134,13 +583,103 @@ class Agent(BaseAgent, MemoryAugment):
                 "raw_response": response,
                 'misc': {
                     'time_used': __time_used,
-                    'step_count': __step_count
+                    'step_count': __step_count,
+                    'out_of_time': out_of_time,
+                    'stopped_by_budget': stop
                 }
             }
 
-    def assign_with_memory(self, request: str, memory: OrderedDict):
+    def execute(self, moves: list[tuple[Ability, dict]]) -> list[dict]:
+        executors = [ExecutorPrompt(args=self.__prepare_args(action, args), action=action)
+                     for action, args in moves]
+        if len(executors) == 1:
+            return self.__merge_deltas(executors, [self.__execute(executors[0])])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(executors), MAX_CONCURRENT_ACTIONS)) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self.__execute, executor)
+                       for executor in executors]
+            return self.__merge_deltas(executors, [future.result() for future in futures])
+
+    async def aexecute(self, moves: list[tuple[Ability, dict]]) -> list[dict]:
+        executors = [ExecutorPrompt(args=self.__prepare_args(action, args), action=action)
+                     for action, args in moves]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ACTIONS)
+
+        async def __execute(executor: ExecutorPrompt) -> dict:
+            async with semaphore:
+                return await self.__aexecute(executor)
+
+        return self.__merge_deltas(executors, list(await asyncio.gather(*[__execute(executor)
+                                                                          for executor in executors])))
+
+    def __merge_deltas(self, executors: list[ExecutorPrompt], actions_taken: list[dict]) -> list[dict]:
+        # only what delegated agents added comes back, once they are all done and before their results
+        for executor in executors:
+            memory = executor.args.get('memory', None)
+            if executor.action.name.startswith(AGENTIC_ABILITY_PREFIX) and isinstance(memory, OverlayMemoryStore):
+                delta = memory.delta()
+                self._memory.update(delta)
+                log.debug(f'Agent: {self._name}; Memory merged back from {executor.action.name}: {len(delta)};')
+        return actions_taken
+
+    def __execute(self, executor: ExecutorPrompt) -> dict:
+        self.__emit(EventType.ABILITY_START, {'ability': executor.action.name, 'args': self.__event_args(executor)})
+        result = executor.execute()
+        self.__emit(EventType.ABILITY_END, {'ability': executor.action.name, 'result': executor.render_result(result)})
+        if self._summarize_actions:
+            try:
+                return call_before_deadline(executor.summarize, model=self._model, result=result)
+            except DeadlineExceededException:
+                pass
+        return executor.record(result)
+
+    async def __aexecute(self, executor: ExecutorPrompt) -> dict:
+        self.__emit(EventType.ABILITY_START, {'ability': executor.action.name, 'args': self.__event_args(executor)})
+        result = await executor.aexecute()
+        self.__emit(EventType.ABILITY_END, {'ability': executor.action.name, 'result': executor.render_result(result)})
+        if self._summarize_actions:
+            try:
+                return await await_before_deadline(executor.asummarize(model=self._model, result=result))
+            except DeadlineExceededException:
+                pass
+        return executor.record(result)
+
+    def __best_effort_conclusion(self) -> tuple[str, str]:
+        # out of time, so the conclusion is drawn from memory without asking the model
+        brief_conclusion = f'Ran out of time after {self._act_count} step(s), the request may not be fulfilled.'
+        response = brief_conclusion
+        memory = self.memory_view
+        latest = memory.latest() if memory is not None else None
+        if latest is not None:
+            progress = latest.get(f'message_from_{latest.get("agent_name")}', None)
+            response = f'{brief_conclusion} Latest progress: {progress}'
+        log.debug(f'Agent: {self._name}; Out of time; Step count: {self._act_count};')
+        sink = self.__conclusion_sink()
+        if sink is not None:
+            sink(response)
+        return brief_conclusion, response
+
+    @staticmethod
+    def __event_args(executor: ExecutorPrompt) -> dict:
+        args = dict(executor.args)
+        if 'memory' in args.keys() and executor.action.name.startswith(AGENTIC_ABILITY_PREFIX):
+            del args['memory']
+        return args
+
+    def __prepare_args(self, action: Ability, args: dict) -> dict:
+        if action.name.startswith(AGENTIC_ABILITY_PREFIX):
+            return {
+                'request': self._request,
+                'request_by_step': self._request_by_step,
+                'memory': OverlayMemoryStore(self.memory_view)
+            }
+        return args
+
+    def assign_with_memory(self, request: str, memory: Mapping):
         return self.assign(request).bring_in_memory(memory)
 
+    async def aassign_with_memory(self, request: str, memory: Mapping):
+        return (await self.aassign(request)).bring_in_memory(memory)
+
     def estimate_step(self):
         if self._request_by_step == '':
             self.__expected_step = 0
@@ -148,13 +687,20 @@ class Agent(BaseAgent, MemoryAugment):
         self.__expected_step = len(self.plan(_log=False))
         return self
 
+    async def aestimate_step(self):
+        if self._request_by_step == '':
+            self.__expected_step = 0
+            return
+        self.__expected_step = len(await self.aplan(_log=False))
+        return self
+
     def set_expected_step(self, expected_step: int):
         self.__expected_step = expected_step
         return self
 
     def memorize(self, action_taken: dict):
         now = datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f')
-        _action_taken = copy.deepcopy(action_taken)
+        _action_taken = dict(action_taken)
         _tmp_summarization = _action_taken['summarization']
         del _action_taken['summarization']
         _tmp_action_taken = _action_taken
@@ -168,33 +714,152 @@ class Agent(BaseAgent, MemoryAugment):
             f'action_taken_by_{self._name}': _tmp_action_taken
         }
         mem_hash = hashlib.md5(json.dumps(new_memory, ensure_ascii=False).encode()).hexdigest()
-        self._memory[f"agent:[{self._name}] at:[{now}] hash:[{mem_hash}]"] = new_memory
-        log.debug(f'Agent: {self._name}; Memory size: {len(self._memory.keys())}; Memory update: {_tmp_summarization};')
+        mem_key = f"agent:[{self._name}] at:[{now}] hash:[{mem_hash}]"
+        self._memory.put(mem_key, new_memory)
+        self.__emit(EventType.MEMORY_APPEND, {'key': mem_key, 'entry': new_memory})
+        log.debug(f'Agent: {self._name}; Memory size: {len(self._memory)}; Memory update: {_tmp_summarization};')
         return self
 
     def stop(self) -> bool:
-        resample = 3
-        log.debug(f'Agent: {self._name}; Termination Probability(p): {self._p}; Penalty Rate(beta): {self._beta};')
-        rand_sum = 0.0
-        for i in range(resample):
-            rand_sum += random.uniform(0, 1)
-        rand_avg = rand_sum / resample
-        if rand_avg > self._p:
-            return False
-        return True
+        # the conclusion takes one more call, plus one for an introduction still to be generated
+        # and one for a rolling summary of the memory still in flight
+        folding = self._working_memory is not None and self._working_memory.folding
+        reserve_calls = 1 + int(self._introduction_outdated) + int(folding)
+        exhausted = self._termination_policy.exhausted(self._act_count, self.__expected_step, current_profile(),
+                                                       next_step=self._costliest_step, reserve_calls=reserve_calls)
+        if exhausted is not None:
+            log.debug(f'Agent: {self._name}; Budget exhausted: {exhausted}; Step count: {self._act_count};')
+            return True
+        return False
+
+    def __budget_hint(self) -> str:
+        if not self._termination_policy.wrap_up(self._act_count, self.__expected_step):
+            return str()
+        steps_left = self._termination_policy.steps_left(self._act_count, self.__expected_step)
+        return (f'Your step budget is almost used up, {steps_left} step(s) left. '
+                f'Finish the request in as few steps as possible, '
+                f'or complete the mission now if the request is already fulfilled.')
+
+    def __fit_budget(self, next_move: tuple[Ability, dict] | list[tuple[Ability, dict]] | bool):
+        # a multi-action turn takes as many steps as it has moves, those past the step budget are dropped
+        if not isinstance(next_move, list):
+            return next_move
+        steps_left = self._termination_policy.steps_left(self._act_count, self.__expected_step)
+        if steps_left is None or len(next_move) <= steps_left:
+            return next_move
+        log.debug(f'Agent: {self._name}; Moves dropped over the step budget: {len(next_move) - steps_left};')
+        return next_move[:max(steps_left, 1)]
+
+    @staticmethod
+    def __usage() -> dict | None:
+        profile = current_profile()
+        return TerminationPolicy.usage(profile) if profile is not None else None
+
+    def __measure_step(self, step_usage: dict | None):
+        # the costliest step so far is what the next one is expected to cost
+        usage = self.__usage()
+        if step_usage is None or usage is None:
+            return
+        cost = {key: usage[key] - step_usage[key] for key in usage.keys()}
+        if self._costliest_step is not None:
+            cost = {key: max(cost[key], self._costliest_step[key]) for key in cost.keys()}
+        self._costliest_step = cost
+
+    def set_termination_policy(self, termination_policy: TerminationPolicy):
+        self._termination_policy = termination_policy
+        return self
 
     def penalize(self):
-        self._p = (self._beta * self._p) % 1.0
+        warnings.warn('Agent.penalize() is deprecated and does nothing, '
+                      'termination is decided by Agent.termination_policy.', DeprecationWarning, stacklevel=2)
         return self
 
     def set_penalty(self, p: float, beta: float):
+        # the closest personality's budgets stand in for the probability scheme
+        warnings.warn('Agent.set_penalty() is deprecated, use Agent.set_termination_policy() instead.',
+                      DeprecationWarning, stacklevel=2)
         self._p = self.__base_p = p
         self._beta = beta
-        return self
+        personality = Personality.PRUDENT if p >= PRUDENT_P else Personality.INQUISITIVE
+        return self.set_termination_policy(TerminationPolicy.of(personality))
 
     def change_personality(self, personality: Personality):
-        if personality == Personality.PRUDENT:
-            return self.set_penalty(p=PRUDENT_P, beta=PRUDENT_BETA)
-        elif personality == Personality.INQUISITIVE:
-            return self.set_penalty(p=INQUISITIVE_P, beta=INQUISITIVE_BETA)
+        self._p, self._beta = Agent.__legacy_penalty(personality)
+        self.__base_p = self._p
+        return self.set_termination_policy(TerminationPolicy.of(personality))
+
+
+class Session(Agent):
+    def __init__(self, agent: Agent, memory: Mapping | MemoryStore | None = None):
+        # shares abilities, brain and introduction with `agent`, owns the request, memory and step state
+        if isinstance(agent, Session):
+            agent = agent.agent
+        agent._share()
+        self.__dict__.update(agent.__dict__)
+        self._agent = agent
+        # a durable store of the agent is read through an overlay of this session's own,
+        # what the session adds is merged into the store when a run ends
+        self.__durable: MemoryStore | None = None
+        if memory is None and self._memory is not None and self._memory.durable:
+            self.__durable = self._memory
+        self.__overlay: OverlayMemoryStore | None = None
+        self.__merged = 0
+        self._begin(memory)
+
+    @property
+    def agent(self) -> Agent:
+        return self._agent
+
+    def __merge(self):
+        if self.__overlay is None:
+            return
+        delta = self.__overlay.delta()
+        if len(delta) > self.__merged:
+            self.__durable.update(dict(delta.items_between(self.__merged, len(delta))))
+            self.__merged = len(delta)
+
+    @override
+    def reposition(self):
+        self.__merge()
+        Agent.reposition(self)
+        if self.__durable is not None:
+            self._memory = self.__overlay = OverlayMemoryStore(self.__durable.view())
+            self.__merged = 0
         return self
+
+    @override
+    def bring_in_memory(self, memory: Mapping | OverlayMemoryStore):
+        if self.__durable is not None and isinstance(memory, OverlayMemoryStore):
+            # copied into the overlay, so that it is merged into the durable store as well
+            memory = memory.view()
+        return Agent.bring_in_memory(self, memory)
+
+    @override
+    def just_do_it(self) -> dict:
+        try:
+            return Agent.just_do_it(self)
+        finally:
+            self.__merge()
+
+    @override
+    async def ajust_do_it(self) -> dict:
+        try:
+            return await Agent.ajust_do_it(self)
+        finally:
+            self.__merge()
+
+    @override
+    def session(self, memory: Mapping | MemoryStore | None = None) -> 'Session':
+        return Session(self._agent, memory=memory)
+
+    @override
+    async def asession(self, memory: Mapping | MemoryStore | None = None) -> 'Session':
+        return await self._agent.asession(memory=memory)
+
+    @override
+    def grant_ability(self, ability: Callable | Ability, update_introduction: bool = True) -> bool:
+        raise TypeError(f'Session of "{self._name}" shares its abilities, grant them to the agent instead.')
+
+    @override
+    def deprive_ability(self, ability: Callable | Ability, update_introduction: bool = True) -> bool:
+        raise TypeError(f'Session of "{self._name}" shares its abilities, deprive the agent of them instead.')
@@ -0,0 +1,48 @@
+import json
+import time
+
+from ceo.enum.EventType import EventType
+
+
+class AgentEvent:
+    def __init__(self, event_type: EventType, agent_name: str, step: int, data: dict | None = None):
+        self._type = event_type
+        self._agent_name = agent_name
+        self._step = step
+        self._data = data if data is not None else dict()
+        self._timestamp = time.time()
+
+    @property
+    def type(self) -> EventType:
+        return self._type
+
+    @property
+    def agent_name(self) -> str:
+        return self._agent_name
+
+    @property
+    def step(self) -> int:
+        return self._step
+
+    @property
+    def data(self) -> dict:
+        return self._data
+
+    @property
+    def timestamp(self) -> float:
+        return self._timestamp
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self._type.value,
+            'agent_name': self._agent_name,
+            'step': self._step,
+            'timestamp': self._timestamp,
+            'data': self._data
+        }
+
+    def __repr__(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+    def __str__(self):
+        return self.__repr__()
@@ -1,7 +1,7 @@
 import hashlib
-import inspect
 import json
 import logging
+import os
 import random
 import time
 import warnings
@@ -9,7 +9,10 @@ from typing import Callable
 
 from langchain_core.language_models import BaseChatModel
 
-from ceo.ability.agentic_ability import Ability, PREFIX as AGENTIC_ABILITY_PREFIX
+from ceo.ability.agentic_ability import Ability
+from ceo.ability.ability_registry import AbilityRegistry
+from ceo.brain import snapshot as snapshot_io
+from ceo.cache.response_cache import ResponseCache, model_signature
 from ceo.prompt import (
     SchedulerPrompt,
     AnalyserPrompt,
@@ -19,12 +22,15 @@ from ceo.prompt import (
     SelfIntroducePrompt
 )
 
+SYSTEM_ABILITY_PREFIX = '__SystemAbility__'
 log = logging.getLogger('ceo')
 
 
 class BaseAgent:
+    _introduction_cache: ResponseCache | None = None
+
     def __init__(self, abilities: list[Callable], brain: BaseChatModel, name: str = '', request: str = ''):
-        self._abilities = list()
+        self._abilities = AbilityRegistry()
         self._act_count = 0
         self._name = name
         self._model = brain
@@ -36,11 +42,13 @@ class BaseAgent:
         self.__prev_results = list()
         self.__schedule = list()
         self._introduction = str()
+        self._introduction_outdated = False
         self.grant_abilities(abilities)
+        self.__grant_system_abilities()
 
     @property
     def abilities(self) -> list[Ability]:
-        return self._abilities
+        return self._abilities.to_list()
 
     @property
     def name(self) -> str:
@@ -48,6 +56,8 @@ class BaseAgent:
 
     @property
     def introduction(self) -> str:
+        if self._introduction_outdated:
+            self.introduce()
         return self._introduction
 
     @property
@@ -76,7 +86,99 @@ class BaseAgent:
             "abilities": [ability.to_dict() for ability in self.abilities]
         }
 
+    @staticmethod
+    def set_introduction_cache(cache: ResponseCache | None):
+        BaseAgent._introduction_cache = cache
+
+    @staticmethod
+    def introduction_cache() -> ResponseCache | None:
+        return BaseAgent._introduction_cache
+
     def introduce(self, update: bool = True) -> str:
+        self.__grant_system_abilities()
+        if update:
+            cache_key, cached = self.__cached_introduction()
+            if cached is None:
+                cached = SelfIntroducePrompt(agent=self).invoke(self._model)
+            self.__set_introduction(cache_key, cached)
+        return self._introduction
+
+    async def aintroduce(self, update: bool = True) -> str:
+        self.__grant_system_abilities()
+        if update:
+            cache_key, cached = self.__cached_introduction()
+            if cached is None:
+                cached = await SelfIntroducePrompt(agent=self).ainvoke(self._model)
+            self.__set_introduction(cache_key, cached)
+        return self._introduction
+
+    def __cached_introduction(self) -> tuple[str | None, str | None]:
+        # (key to cache a newly generated introduction under, cached introduction)
+        cache = BaseAgent._introduction_cache
+        if cache is None:
+            return None, None
+        cache_key = self.__introduction_key()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            log.debug(f'Agent: {self._name}; Introduction loaded from cache;')
+            return None, cached
+        return cache_key, None
+
+    def __set_introduction(self, cache_key: str | None, introduction: str):
+        self._introduction = introduction
+        if cache_key is not None:
+            BaseAgent._introduction_cache.set(cache_key, introduction)
+        self._introduction_outdated = False
+
+    def __introduction_key(self) -> str:
+        __key_src = json.dumps({
+            'agent': self._name,
+            'model': model_signature(self._model),
+            'abilities': [ability.to_dict() for ability in self.abilities]
+        }, ensure_ascii=False, sort_keys=True, default=str)
+        return f'introduction:{hashlib.sha256(__key_src.encode("utf-8")).hexdigest()}'
+
+    def snapshot(self, path: str | None = None) -> bytes:
+        # resolve the introduction first, a restored agent should never need the model to start
+        if self._introduction_outdated:
+            self.introduce()
+        data = snapshot_io.dumps(self)
+        if path is not None:
+            __dir = os.path.dirname(os.path.abspath(path))
+            if not os.path.exists(__dir):
+                os.makedirs(__dir, exist_ok=True)
+            __tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(__tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(__tmp_path, path)
+        return data
+
+    @classmethod
+    def load(cls, snapshot: str | bytes, brain: BaseChatModel):
+        # snapshots are pickles, loading one runs whatever code it holds, so only load snapshots you made yourself
+        if isinstance(snapshot, str):
+            with open(snapshot, 'rb') as f:
+                snapshot = f.read()
+        agent = snapshot_io.loads(snapshot, brain=brain)
+        if not isinstance(agent, cls):
+            raise TypeError(f'The snapshot holds a {type(agent).__name__}, not a {cls.__name__}.')
+        log.debug(f'Agent: {agent.name}; Restored from snapshot;')
+        return agent
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # the system abilities are closures over this agent, they are granted again on restore
+        state['_abilities'] = [ability for ability in self._abilities
+                               if not ability.name.startswith(SYSTEM_ABILITY_PREFIX)]
+        return state
+
+    def __setstate__(self, state: dict):
+        abilities = state.pop('_abilities')
+        self.__dict__.update(state)
+        self._abilities = AbilityRegistry(abilities)
+        self.__grant_system_abilities()
+
+    def __grant_system_abilities(self):
         def get_your_info(*args, **kwargs) -> dict:
             """
             What does this ability do: To get your personal information.
@@ -91,72 +193,47 @@ class BaseAgent:
                 'info': _info_dict
             }
 
-        get_your_info.__name__ = f'__SystemAbility__{get_your_info.__name__}'
+        get_your_info.__name__ = f'{SYSTEM_ABILITY_PREFIX}{get_your_info.__name__}'
         self.grant_ability(get_your_info, update_introduction=False)
-        if update:
-            self._introduction = SelfIntroducePrompt(agent=self).invoke(self._model)
-        return self._introduction
 
-    def grant_ability(self, ability: Callable | Ability, update_introduction: bool = True):
-        if isinstance(ability, Ability):
-            for _ability in self._abilities:
-                both_agentic = (_ability.name.startswith(AGENTIC_ABILITY_PREFIX)
-                                and ability.name.startswith(AGENTIC_ABILITY_PREFIX))
-                both_not_agentic = (not _ability.name.startswith(AGENTIC_ABILITY_PREFIX)
-                                    and not ability.name.startswith(AGENTIC_ABILITY_PREFIX))
-                if both_agentic:
-                    if ability.name == _ability.name:
-                        return
-                elif both_not_agentic:
-                    if inspect.getsource(ability.function) == inspect.getsource(_ability.function):
-                        return
-            self._abilities.append(ability)
-        else:
-            for _ability in self._abilities:
-                if not _ability.name.startswith(AGENTIC_ABILITY_PREFIX):
-                    if inspect.getsource(ability) == inspect.getsource(_ability.function):
-                        return
-            self._abilities.append(Ability(ability))
-        self.introduce(update=update_introduction)
+    def grant_ability(self, ability: Callable | Ability, update_introduction: bool = True) -> bool:
+        # the introduction is regenerated lazily, on the next read of `introduction`
+        granted = self._abilities.add(ability) is not None
+        if granted and update_introduction:
+            self._introduction_outdated = True
+        return granted
 
     def grant_abilities(self, abilities: list[Callable | Ability]):
-        prev_size = len(self.abilities)
         for ability in abilities:
-            self.grant_ability(ability, update_introduction=False)
-        self.introduce(update=(prev_size != len(self.abilities)))
-
-    def deprive_ability(self, ability: Callable | Ability, update_introduction: bool = True):
-        removed = False
-        if not isinstance(ability, Ability):
-            ability = Ability(ability)
-        for _ability in self._abilities:
-            both_agentic = (_ability.name.startswith(AGENTIC_ABILITY_PREFIX)
-                            and ability.name.startswith(AGENTIC_ABILITY_PREFIX))
-            both_not_agentic = (not _ability.name.startswith(AGENTIC_ABILITY_PREFIX)
-                            and not ability.name.startswith(AGENTIC_ABILITY_PREFIX))
-            if both_agentic:
-                if _ability.name == ability.name:
-                    self._abilities.remove(_ability)
-                    removed = True
-            elif both_not_agentic:
-                if inspect.getsource(_ability.function) == inspect.getsource(ability.function):
-                    self._abilities.remove(_ability)
-                    removed = True
-        self.introduce(update=(removed and update_introduction))
+            self.grant_ability(ability)
+
+    def deprive_ability(self, ability: Callable | Ability, update_introduction: bool = True) -> bool:
+        removed = self._abilities.remove(ability) is not None
+        if removed and update_introduction:
+            self._introduction_outdated = True
+        return removed
 
     def deprive_abilities(self, abilities: list[Callable | Ability]):
-        prev_size = len(self.abilities)
         for ability in abilities:
-            self.deprive_ability(ability, update_introduction=False)
-        self.introduce(update=(prev_size != len(self.abilities)))
+            self.deprive_ability(ability)
+
+    def _relevant_abilities(self) -> list[Ability]:
+        return self.abilities
 
     def plan(self, _log: bool = True) -> list:
-        scheduling = SchedulerPrompt(request=self._request_by_step, abilities=self._abilities)
+        scheduling = SchedulerPrompt(request=self._request_by_step, abilities=self._relevant_abilities())
         self.__schedule = scheduling.invoke(self._model)
         if _log:
             log.debug(f'Agent: {self._name}; Schedule: {[_.name for _ in self.__schedule]}; Request: "{self._request}";')
         return self.__schedule
 
+    async def aplan(self, _log: bool = True) -> list:
+        scheduling = SchedulerPrompt(request=self._request_by_step, abilities=self._relevant_abilities())
+        self.__schedule = await scheduling.ainvoke(self._model)
+        if _log:
+            log.debug(f'Agent: {self._name}; Schedule: {[_.name for _ in self.__schedule]}; Request: "{self._request}";')
+        return self.__schedule
+
     def reposition(self):
         self.__prev_results = list()
         self.__schedule = list()
@@ -168,9 +245,17 @@ class BaseAgent:
             RequestResolverPrompt(request=request).invoke(self._model))
         return self.reposition()
 
+    async def aassign(self, request: str):
+        self._request, self._request_by_step = (
+            await RequestResolverPrompt(request=request).ainvoke(self._model))
+        return self.reposition()
+
     def reassign(self, request: str):
         return self.assign(request)
 
+    async def areassign(self, request: str):
+        return await self.aassign(request)
+
     def relay(self, request: str, request_by_step: str):
         self._request = request
         self._request_by_step = request_by_step
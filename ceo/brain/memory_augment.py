@@ -1,20 +1,37 @@
 import abc
-import copy
 from collections import OrderedDict
+from collections.abc import Mapping
+
+from ceo.memory import MemoryStore, MemoryView, MemoryPolicy
 
 
 class MemoryAugment:
-    def __init__(self, memory: OrderedDict | None = None):
-        self._memory: OrderedDict | None = None
-        if memory is not None:
-            self._memory = copy.deepcopy(memory)
+    def __init__(self, memory: Mapping | MemoryStore | None = None, memory_policy: MemoryPolicy | None = None):
+        self._memory: MemoryStore | None = None
+        self._memory_policy: MemoryPolicy | None = memory_policy
+        if isinstance(memory, MemoryStore):
+            self._memory = memory
+        elif memory is not None:
+            self._memory = MemoryStore(memory)
 
     @property
     def memory(self) -> OrderedDict | None:
+        # a copy, for callers to change or serialize
         if self._memory is not None:
-            return copy.deepcopy(self._memory)
+            return self._memory.view().to_dict()
         return None
 
+    @property
+    def memory_view(self) -> MemoryView | None:
+        # read-only and not copied, later additions to the memory do not show in it
+        if self._memory is not None:
+            return self._memory.view()
+        return None
+
+    @property
+    def memory_policy(self) -> MemoryPolicy | None:
+        return self._memory_policy
+
     @abc.abstractmethod
-    def bring_in_memory(self, memory: OrderedDict):
+    def bring_in_memory(self, memory: Mapping):
         pass
@@ -0,0 +1,35 @@
+import io
+import pickle
+
+from langchain_core.language_models import BaseChatModel
+
+BRAIN_ID = 'ceo:brain'
+
+
+class SnapshotPickler(pickle.Pickler):
+    # models hold clients and credentials, they are never written into a snapshot
+    def persistent_id(self, obj: any) -> str | None:
+        if isinstance(obj, BaseChatModel):
+            return BRAIN_ID
+        return None
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, brain: BaseChatModel):
+        super().__init__(file)
+        self._brain = brain
+
+    def persistent_load(self, pid: str) -> BaseChatModel:
+        if pid == BRAIN_ID:
+            return self._brain
+        raise pickle.UnpicklingError(f'Unsupported persistent id "{pid}".')
+
+
+def dumps(obj: any) -> bytes:
+    buffer = io.BytesIO()
+    SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return buffer.getvalue()
+
+
+def loads(data: bytes, brain: BaseChatModel) -> any:
+    return SnapshotUnpickler(io.BytesIO(data), brain=brain).load()
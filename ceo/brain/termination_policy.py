@@ -0,0 +1,146 @@
+import math
+
+from ceo.enum.Personality import Personality
+from ceo.profile.run_profile import RunProfile
+
+PRUDENT_SLACK = 1.0
+PRUDENT_GRACE = 1
+PRUDENT_MIN_STEPS = 3
+INQUISITIVE_SLACK = 1.5
+INQUISITIVE_GRACE = 3
+INQUISITIVE_MIN_STEPS = 5
+# steps left at which a policy without a soft budget asks the agent to wrap up
+WRAP_UP_STEPS = 1
+
+
+class TerminationPolicy:
+    def __init__(self, max_steps: int | None = None, max_llm_calls: int | None = None,
+                 max_tokens: int | None = None, max_time: float | None = None):
+        for name, budget in (('max_steps', max_steps), ('max_llm_calls', max_llm_calls),
+                             ('max_tokens', max_tokens), ('max_time', max_time)):
+            if budget is not None and budget <= 0:
+                raise ValueError(f'{name} should be positive.')
+        self._max_steps = max_steps
+        self._max_llm_calls = max_llm_calls
+        self._max_tokens = max_tokens
+        self._max_time = max_time
+
+    @property
+    def max_steps(self) -> int | None:
+        return self._max_steps
+
+    @property
+    def max_llm_calls(self) -> int | None:
+        return self._max_llm_calls
+
+    @property
+    def max_tokens(self) -> int | None:
+        return self._max_tokens
+
+    @property
+    def max_time(self) -> float | None:
+        return self._max_time
+
+    def step_budget(self, expected_steps: int) -> int | None:
+        return self._max_steps
+
+    @staticmethod
+    def usage(profile: RunProfile) -> dict:
+        calls = profile.llm_calls()
+        return {
+            'llm_calls': len(calls),
+            'tokens': sum(call['total_tokens'] for call in calls),
+            'time': profile.time_used
+        }
+
+    def exhausted(self, steps: int, expected_steps: int, profile: RunProfile | None = None,
+                  next_step: dict | None = None, reserve_calls: int = 1) -> str | None:
+        # returns the name of the first budget the next step would overrun, llm calls, tokens and time are
+        # counted by the run profile, and room is left for `reserve_calls` calls to conclude the run
+        step_budget = self.step_budget(expected_steps)
+        if step_budget is not None and steps >= step_budget:
+            return 'max_steps'
+        if profile is None or (self._max_time is None and self._max_llm_calls is None and self._max_tokens is None):
+            return None
+        calls = profile.llm_calls()
+        # the costliest call so far stands in for the conclusion, and for the first step
+        costliest_call = {
+            'llm_calls': 1,
+            'tokens': max((call['total_tokens'] for call in calls), default=0),
+            'time': max((call['time_used'] for call in calls), default=0.0)
+        }
+        if next_step is None:
+            next_step = costliest_call
+        used = TerminationPolicy.usage(profile)
+        for name, budget, key in (('max_time', self._max_time, 'time'),
+                                  ('max_llm_calls', self._max_llm_calls, 'llm_calls'),
+                                  ('max_tokens', self._max_tokens, 'tokens')):
+            if budget is not None and used[key] + next_step[key] + reserve_calls * costliest_call[key] > budget:
+                return name
+        return None
+
+    def should_stop(self, steps: int, expected_steps: int, profile: RunProfile | None = None,
+                    next_step: dict | None = None, reserve_calls: int = 1) -> bool:
+        return self.exhausted(steps, expected_steps, profile, next_step, reserve_calls) is not None
+
+    def steps_left(self, steps: int, expected_steps: int) -> int | None:
+        step_budget = self.step_budget(expected_steps)
+        if step_budget is None:
+            return None
+        return max(step_budget - steps, 0)
+
+    def wrap_up(self, steps: int, expected_steps: int) -> bool:
+        # whether the agent should be told to finish up in the steps it has left
+        steps_left = self.steps_left(steps, expected_steps)
+        return steps_left is not None and steps_left <= WRAP_UP_STEPS
+
+    @staticmethod
+    def of(personality: Personality) -> 'TerminationPolicy':
+        if personality == Personality.INQUISITIVE:
+            return SoftBudgetPolicy(slack=INQUISITIVE_SLACK, grace=INQUISITIVE_GRACE, min_steps=INQUISITIVE_MIN_STEPS)
+        return SoftBudgetPolicy(slack=PRUDENT_SLACK, grace=PRUDENT_GRACE, min_steps=PRUDENT_MIN_STEPS)
+
+
+class SoftBudgetPolicy(TerminationPolicy):
+    def __init__(self, slack: float = PRUDENT_SLACK, grace: int = PRUDENT_GRACE, min_steps: int = PRUDENT_MIN_STEPS,
+                 max_steps: int | None = None, max_llm_calls: int | None = None,
+                 max_tokens: int | None = None, max_time: float | None = None):
+        # the soft budget is the planned steps times `slack`, or `min_steps` when there is no plan to go by,
+        # past it the agent is asked to wrap up and is stopped after `grace` more steps, `max_steps` caps both
+        TerminationPolicy.__init__(self, max_steps=max_steps, max_llm_calls=max_llm_calls,
+                                   max_tokens=max_tokens, max_time=max_time)
+        if slack <= 0 or grace < 0 or min_steps < 1:
+            raise ValueError('slack and min_steps should be positive and grace should be non-negative.')
+        self._slack = slack
+        self._grace = grace
+        self._min_steps = min_steps
+
+    @property
+    def slack(self) -> float:
+        return self._slack
+
+    @property
+    def grace(self) -> int:
+        return self._grace
+
+    @property
+    def min_steps(self) -> int:
+        return self._min_steps
+
+    def soft_budget(self, expected_steps: int) -> int:
+        if expected_steps < 1:
+            soft_budget = self._min_steps
+        else:
+            soft_budget = math.ceil(expected_steps * self._slack)
+        if self._max_steps is not None:
+            return min(soft_budget, self._max_steps)
+        return soft_budget
+
+    def step_budget(self, expected_steps: int) -> int:
+        step_budget = self.soft_budget(expected_steps) + self._grace
+        if self._max_steps is not None:
+            return min(step_budget, self._max_steps)
+        return step_budget
+
+    def wrap_up(self, steps: int, expected_steps: int) -> bool:
+        return steps >= self.soft_budget(expected_steps) or TerminationPolicy.wrap_up(self, steps, expected_steps)
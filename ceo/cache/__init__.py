@@ -0,0 +1,5 @@
+from .response_cache import ResponseCache, make_cache_key
+from .lru_cache import LRUCache
+from .sqlite_cache import SqliteCache
+from .docstring_cache import DocstringCache, get_docstring_cache
+from .ability_cache import AbilityCache, get_ability_cache, set_ability_cache
@@ -0,0 +1,162 @@
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+
+from ceo.cache.lru_cache import LRUCache, DEFAULT_MAXSIZE
+from ceo.cache.sqlite_cache import SqliteCache
+
+DEFAULT_TABLE = 'ability_results'
+# returned by AbilityCache.lookup on a miss, since None is a valid result of an ability
+MISSING = object()
+log = logging.getLogger('ceo.ability')
+
+
+class _Uncanonical(Exception):
+    pass
+
+
+def canonicalize(value: any) -> any:
+    # equal arguments give equal json, whatever order or container type they were passed in
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': sorted((canonicalize(item) for item in value), key=_sort_key)}
+    if isinstance(value, dict):
+        return {'__dict__': sorted(([canonicalize(k), canonicalize(v)] for k, v in value.items()),
+                                   key=lambda pair: _sort_key(pair[0]))}
+    # anything else could compare equal while printing differently, or the other way around
+    raise _Uncanonical(type(value).__name__)
+
+
+def _sort_key(value: any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+def make_args_key(ability_key: str, signature: inspect.Signature, args: tuple, kwargs: dict) -> str | None:
+    try:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        __args = canonicalize(dict(bound.arguments))
+    except (TypeError, _Uncanonical):
+        return None
+    __key_src = json.dumps({
+        'ability': ability_key,
+        'args': __args
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(__key_src.encode('utf-8')).hexdigest()
+
+
+class AbilityCache:
+    def __init__(self, path: str | None = None, table: str = DEFAULT_TABLE):
+        # results stay in memory per ability, and also go to disk when a path is given
+        self._memory: dict[str, LRUCache] = dict()
+        self._disk: SqliteCache | None = SqliteCache(path, table=table) if path is not None else None
+        self._stats: dict[str, dict[str, int]] = dict()
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str | None:
+        return self._disk.path if self._disk is not None else None
+
+    def __memory_of(self, ability_key: str, ttl: float | None, maxsize: int | None) -> LRUCache:
+        with self._lock:
+            memory = self._memory.get(ability_key, None)
+            if memory is None:
+                memory = self._memory[ability_key] = LRUCache(
+                    maxsize=maxsize if maxsize is not None else DEFAULT_MAXSIZE, ttl=ttl)
+            return memory
+
+    def __count(self, ability_name: str, stat: str):
+        with self._lock:
+            stats = self._stats.setdefault(ability_name, {'hits': 0, 'disk_hits': 0, 'misses': 0})
+            stats[stat] += 1
+
+    def lookup(self, ability_name: str, ability_key: str, key: str,
+               ttl: float | None = None, maxsize: int | None = None) -> any:
+        memory = self.__memory_of(ability_key, ttl, maxsize)
+        item = memory.get(key)
+        if item is not None:
+            self.__count(ability_name, 'hits')
+            return item[0]
+        if self._disk is not None:
+            stored = self._disk.get(key)
+            if stored is not None:
+                stored = json.loads(stored)
+                if stored['expires'] is None or stored['expires'] > time.time():
+                    memory.set(key, (stored['value'],))
+                    self.__count(ability_name, 'hits')
+                    self.__count(ability_name, 'disk_hits')
+                    return stored['value']
+        self.__count(ability_name, 'misses')
+        return MISSING
+
+    def store(self, ability_key: str, key: str, value: any,
+              ttl: float | None = None, maxsize: int | None = None):
+        self.__memory_of(ability_key, ttl, maxsize).set(key, (value,))
+        if self._disk is not None:
+            try:
+                encoded = json.dumps(value, ensure_ascii=False)
+                # only results which come back from disk exactly as they were are worth sharing there
+                if json.loads(encoded) != value:
+                    return self
+            except (TypeError, ValueError):
+                return self
+            self._disk.set(key, json.dumps({
+                'expires': time.time() + ttl if ttl is not None else None,
+                'value': json.loads(encoded)
+            }, ensure_ascii=False))
+        return self
+
+    def stats(self, ability_name: str | None = None) -> dict:
+        with self._lock:
+            if ability_name is not None:
+                return dict(self._stats.get(ability_name, {'hits': 0, 'disk_hits': 0, 'misses': 0}))
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def hit_ratio(self, ability_name: str | None = None) -> float:
+        stats = self.stats(ability_name)
+        if ability_name is None:
+            hits = sum(stat['hits'] for stat in stats.values())
+            misses = sum(stat['misses'] for stat in stats.values())
+        else:
+            hits, misses = stats['hits'], stats['misses']
+        return hits / (hits + misses) if hits + misses > 0 else 0.0
+
+    def clear(self):
+        with self._lock:
+            memories = list(self._memory.values())
+            self._stats.clear()
+        for memory in memories:
+            memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+        return self
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+
+# shared by every agent in the process, so that one agent's lookup is served to the others
+__ability_cache: AbilityCache | None = None
+__ability_cache_lock = threading.Lock()
+
+
+def get_ability_cache() -> AbilityCache:
+    global __ability_cache
+    with __ability_cache_lock:
+        if __ability_cache is None:
+            __ability_cache = AbilityCache()
+        return __ability_cache
+
+
+def set_ability_cache(cache: AbilityCache) -> AbilityCache:
+    global __ability_cache
+    with __ability_cache_lock:
+        __ability_cache = cache
+    return cache
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import textwrap
+import threading
+
+from langchain_core.language_models import BaseChatModel
+from typing_extensions import override
+
+from ceo.cache.response_cache import ResponseCache
+
+CACHE_ENV = 'CEO_ABILITY_CACHE'
+CACHE_FILENAME = 'abilities.db'
+DEFAULT_TABLE = 'docstrings'
+log = logging.getLogger('ceo.ability')
+
+
+def normalize_source(source: str) -> str:
+    lines = [line.rstrip() for line in textwrap.dedent(source).splitlines()]
+    return '\n'.join(line for line in lines if len(line) > 0)
+
+
+def model_name(model: BaseChatModel | str) -> str:
+    if isinstance(model, str):
+        return model
+    for attr in ('model_name', 'model'):
+        name = getattr(model, attr, None)
+        if isinstance(name, str) and len(name) > 0:
+            return name
+    return f'{type(model).__module__}.{type(model).__qualname__}'
+
+
+def make_docstring_key(source: str, model: BaseChatModel | str) -> str:
+    __key_src = json.dumps({
+        'model': model_name(model),
+        'src': normalize_source(source)
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(__key_src.encode('utf-8')).hexdigest()
+
+
+class DocstringCache(ResponseCache):
+    def __init__(self, path: str, table: str = DEFAULT_TABLE):
+        if not table.isidentifier():
+            raise ValueError(f'Invalid table name "{table}".')
+        self._path = path
+        self._table = table
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._read_only = False
+        __dir = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(__dir, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS {self._table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        except (OSError, sqlite3.Error) as e:
+            # read-only deploy images: use whatever has been baked in, never write
+            self._read_only = True
+            if self._conn is not None:
+                # opened, then failed on the pragma or the table
+                self._conn.close()
+            self._conn = None
+            if os.path.exists(path):
+                self._conn = sqlite3.connect(f'file:{os.path.abspath(path)}?mode=ro&immutable=1',
+                                             uri=True, check_same_thread=False)
+            log.debug(f'DocstringCache opened read-only. Path: {path}; Reason: {e};')
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    def load(self) -> dict[str, str]:
+        with self._lock:
+            if self._entries is None:
+                self._entries = dict()
+                if self._conn is not None:
+                    try:
+                        rows = self._conn.execute(f'SELECT key, value FROM {self._table}').fetchall()
+                    except sqlite3.Error:
+                        rows = list()
+                    self._entries.update(rows)
+            return self._entries
+
+    @override
+    def get(self, key: str) -> str | None:
+        return self.load().get(key, None)
+
+    @override
+    def set(self, key: str, value: str):
+        entries = self.load()
+        with self._lock:
+            entries[key] = value
+            if self._read_only or self._conn is None:
+                return self
+            self._conn.execute(f'INSERT OR REPLACE INTO {self._table} (key, value) VALUES (?, ?)', (key, value))
+        return self
+
+    @override
+    def clear(self):
+        with self._lock:
+            self._entries = dict()
+            if not self._read_only and self._conn is not None:
+                self._conn.execute(f'DELETE FROM {self._table}')
+        return self
+
+    def compact(self):
+        # fold the WAL back into the database file so it can be shipped as a single read-only file
+        with self._lock:
+            if not self._read_only and self._conn is not None:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return self
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+__caches: dict[str, DocstringCache] = dict()
+__caches_lock = threading.Lock()
+
+
+def get_docstring_cache(path: str | None = None) -> DocstringCache:
+    if path is None:
+        path = os.getenv(CACHE_ENV, CACHE_FILENAME)
+    path = os.path.abspath(path)
+    with __caches_lock:
+        cache = __caches.get(path, None)
+        if cache is None:
+            cache = __caches[path] = DocstringCache(path)
+        return cache
+
+
+def compact_docstring_caches():
+    with __caches_lock:
+        caches = list(__caches.values())
+    for cache in caches:
+        cache.compact()
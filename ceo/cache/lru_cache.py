@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+
+from typing_extensions import override
+
+from ceo.cache.response_cache import ResponseCache
+
+DEFAULT_MAXSIZE = 1024
+
+
+class LRUCache(ResponseCache):
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float | None = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[str, tuple[float, any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def ttl(self) -> float | None:
+        return self._ttl
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @override
+    def get(self, key: str) -> any:
+        with self._lock:
+            item = self._data.get(key, None)
+            if item is None:
+                return None
+            created, value = item
+            if self._ttl is not None and time.monotonic() - created > self._ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    @override
+    def set(self, key: str, value: any):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return self
+
+    @override
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+        return self
@@ -0,0 +1,44 @@
+import abc
+import hashlib
+import json
+
+from langchain_core.language_models import BaseChatModel
+
+
+def model_signature(model: BaseChatModel) -> str:
+    try:
+        # model name and every sampling parameter, the same string langchain keys its own cache with
+        return model._get_llm_string()
+    except (AttributeError, NotImplementedError, TypeError, ValueError):
+        return f'{type(model).__module__}.{type(model).__qualname__}'
+
+
+def make_cache_key(model: BaseChatModel, prompt: str, **kwargs) -> str:
+    __prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    __key_src = json.dumps({
+        'model': model_signature(model),
+        'params': kwargs,
+        'prompt': __prompt_hash
+    }, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(__key_src.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    @abc.abstractmethod
+    def get(self, key: str) -> str | None:
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: str):
+        pass
+
+    @abc.abstractmethod
+    def clear(self):
+        pass
+
+    def lookup(self, model: BaseChatModel, prompt: str, **kwargs) -> str | None:
+        return self.get(make_cache_key(model, prompt, **kwargs))
+
+    def update(self, model: BaseChatModel, prompt: str, value: str, **kwargs):
+        self.set(make_cache_key(model, prompt, **kwargs), value)
+        return self
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import threading
+import time
+
+from typing_extensions import override
+
+from ceo.cache.response_cache import ResponseCache
+
+DEFAULT_TABLE = 'responses'
+
+
+class SqliteCache(ResponseCache):
+    def __init__(self, path: str, ttl: float | None = None, table: str = DEFAULT_TABLE):
+        if not table.isidentifier():
+            raise ValueError(f'Invalid table name "{table}".')
+        self._path = path
+        self._ttl = ttl
+        self._table = table
+        self._lock = threading.Lock()
+        __dir = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(__dir):
+            os.makedirs(__dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {self._table} '
+                           '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)')
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def ttl(self) -> float | None:
+        return self._ttl
+
+    @override
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(f'SELECT value, created FROM {self._table} WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self._ttl is not None and time.time() - created > self._ttl:
+            with self._lock:
+                self._conn.execute(f'DELETE FROM {self._table} WHERE key = ?', (key,))
+            return None
+        return value
+
+    @override
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(f'INSERT OR REPLACE INTO {self._table} (key, value, created) VALUES (?, ?, ?)',
+                               (key, value, time.time()))
+        return self
+
+    @override
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self._table}')
+        return self
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,9 @@
+from .run_deadline import (
+    run_deadline,
+    current_deadline,
+    time_left,
+    deadline_exceeded,
+    bound_timeout,
+    call_before_deadline,
+    await_before_deadline
+)
@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+from collections.abc import Awaitable, Callable
+
+from ceo.exception.deadline_exceeded_exception import DeadlineExceededException
+
+# time.monotonic() by which the current run, and every sub-agent it delegates to, has to be done
+_current_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar('ceo_run_deadline', default=None)
+
+
+def current_deadline() -> float | None:
+    return _current_deadline.get()
+
+
+def time_left() -> float | None:
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def deadline_exceeded() -> bool:
+    left = time_left()
+    return left is not None and left <= 0.0
+
+
+def bound_timeout(timeout: float | None) -> float | None:
+    # the tighter of a timeout and the time left
+    left = time_left()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    return min(timeout, left)
+
+
+@contextlib.contextmanager
+def run_deadline(seconds: float | None):
+    # a nested deadline can only shorten the one already in effect
+    if seconds is None:
+        yield current_deadline()
+        return
+    deadline = time.monotonic() + seconds
+    outer = _current_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def call_before_deadline(func: Callable, *args, **kwargs) -> any:
+    left = time_left()
+    if left is None:
+        return func(*args, **kwargs)
+    if left <= 0.0:
+        raise DeadlineExceededException()
+    __res = __exc = None
+
+    def __func():
+        nonlocal __res, __exc
+        try:
+            __res = func(*args, **kwargs)
+        except BaseException as e:
+            __exc = e
+
+    # a blocking call can not be interrupted, so it is left behind on a daemon thread once time is up
+    __thread = threading.Thread(target=contextvars.copy_context().run, args=(__func,), daemon=True)
+    __thread.start()
+    __thread.join(timeout=left)
+    if __thread.is_alive():
+        raise DeadlineExceededException()
+    if __exc is not None:
+        raise __exc
+    return __res
+
+
+async def await_before_deadline(awaitable: Awaitable) -> any:
+    left = time_left()
+    if left is None:
+        return await awaitable
+    task = asyncio.ensure_future(awaitable)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=left)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        raise DeadlineExceededException()
+    return task.result()
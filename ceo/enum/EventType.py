@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class EventType(Enum):
+    STEP_START = "step_start"
+    NEXT_MOVE = "next_move"
+    ABILITY_START = "ability_start"
+    ABILITY_END = "ability_end"
+    MEMORY_APPEND = "memory_append"
+    CONCLUSION_CHUNK = "conclusion_chunk"
+    CONCLUSION_RESET = "conclusion_reset"
+    RESULT = "result"
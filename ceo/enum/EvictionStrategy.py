@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class EvictionStrategy(Enum):
+    OLDEST_FIRST = "oldest_first"
+    KEEP_FIRST_AND_LAST = "keep_first_and_last"
+    RELEVANCE = "relevance"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ExecutionPolicy(Enum):
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
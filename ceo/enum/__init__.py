@@ -1 +1,4 @@
 from .Personality import Personality
+from .EvictionStrategy import EvictionStrategy
+from .EventType import EventType
+from .ExecutionPolicy import ExecutionPolicy
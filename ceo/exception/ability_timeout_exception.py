@@ -0,0 +1,3 @@
+class AbilityTimeoutException(TimeoutError):
+    def __init__(self, timeout: float | None):
+        super().__init__(f'Ability execution timed out after {timeout} seconds')
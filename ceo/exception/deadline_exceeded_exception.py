@@ -0,0 +1,3 @@
+class DeadlineExceededException(TimeoutError):
+    def __init__(self):
+        super().__init__('The deadline of this run has passed')
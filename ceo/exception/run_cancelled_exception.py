@@ -0,0 +1,3 @@
+class RunCancelledException(Exception):
+    def __init__(self, agent_name: str):
+        super().__init__(f'The run of agent "{agent_name}" has been cancelled')
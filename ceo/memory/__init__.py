@@ -0,0 +1,5 @@
+from .memory_store import MemoryStore, MemoryView, FrozenDict, freeze, thaw
+from .memory_policy import MemoryPolicy
+from .working_memory import WorkingMemory
+from .sqlite_memory_store import SqliteMemoryStore
+from .overlay_memory_store import OverlayMemoryStore
@@ -0,0 +1,92 @@
+import json
+from collections.abc import Callable
+
+from ceo.enum.EvictionStrategy import EvictionStrategy
+from ceo.memory.memory_store import MemoryView
+
+CHARS_PER_TOKEN = 4
+
+
+class MemoryPolicy:
+    def __init__(self, max_chars: int | None = None, max_tokens: int | None = None,
+                 eviction: EvictionStrategy = EvictionStrategy.OLDEST_FIRST,
+                 keep_first: int = 1, keep_last: int | None = None, summarize: bool = False, top_k: int = 4):
+        if keep_first < 0 or (keep_last is not None and keep_last < 1):
+            raise ValueError('keep_first should be non-negative and keep_last should be at least 1.')
+        if top_k < 0:
+            raise ValueError('top_k should be non-negative.')
+        self._max_chars = max_chars
+        self._max_tokens = max_tokens
+        self._eviction = eviction
+        self._keep_first = keep_first
+        self._keep_last = keep_last
+        self._summarize = summarize
+        self._top_k = top_k
+
+    @property
+    def max_chars(self) -> int | None:
+        return self._max_chars
+
+    @property
+    def max_tokens(self) -> int | None:
+        return self._max_tokens
+
+    @property
+    def eviction(self) -> EvictionStrategy:
+        return self._eviction
+
+    @property
+    def keep_first(self) -> int:
+        return self._keep_first
+
+    @property
+    def keep_last(self) -> int | None:
+        return self._keep_last
+
+    @property
+    def summarize(self) -> bool:
+        return self._summarize
+
+    @property
+    def top_k(self) -> int:
+        # evicted entries recalled by relevance to the request, with EvictionStrategy.RELEVANCE
+        return self._top_k
+
+    @property
+    def budget(self) -> int | None:
+        budgets = list()
+        if self._max_chars is not None:
+            budgets.append(self._max_chars)
+        if self._max_tokens is not None:
+            budgets.append(self._max_tokens * CHARS_PER_TOKEN)
+        if len(budgets) < 1:
+            return None
+        return min(budgets)
+
+    @staticmethod
+    def measure(entry: any) -> int:
+        return len(json.dumps(entry, ensure_ascii=False))
+
+    def select(self, memory: MemoryView, size_of: Callable[[str], int] | None = None) -> tuple[int, int]:
+        # returns the [start, end) range of entries to be evicted, the rest are kept verbatim
+        if size_of is None:
+            size_of = lambda _key: self.measure(memory[_key])
+        size = len(memory)
+        head = 0
+        if self._eviction in (EvictionStrategy.KEEP_FIRST_AND_LAST, EvictionStrategy.RELEVANCE):
+            head = min(self._keep_first, size)
+        budget = self.budget
+        used = sum(size_of(memory.key_at(i)) for i in range(head))
+        kept = 0
+        tail = size
+        while tail > head:
+            if self._keep_last is not None and kept >= self._keep_last:
+                break
+            cost = size_of(memory.key_at(tail - 1))
+            # the latest entry is always kept so that the latest progress stays visible
+            if budget is not None and kept > 0 and used + cost > budget:
+                break
+            used += cost
+            kept += 1
+            tail -= 1
+        return head, tail
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+from collections.abc import Mapping, Iterator
+
+
+class FrozenDict(dict):
+    def __readonly(self, *args, **kwargs):
+        raise TypeError('Memory entries are read-only.')
+
+    __setitem__ = __delitem__ = __ior__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: any) -> any:
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: any) -> any:
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class MemoryView(Mapping):
+    __slots__ = ('_keys', '_entries', '_positions', '_length')
+
+    def __init__(self, keys: list[str], entries: dict[str, FrozenDict], positions: dict[str, int], length: int):
+        self._keys = keys
+        self._entries = entries
+        self._positions = positions
+        self._length = length
+
+    def __getitem__(self, key: str) -> FrozenDict:
+        position = self._positions.get(key, None)
+        if position is None or position >= self._length:
+            raise KeyError(key)
+        return self._entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._length):
+            yield self._keys[i]
+
+    def __reversed__(self) -> Iterator[str]:
+        for i in range(self._length - 1, -1, -1):
+            yield self._keys[i]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(size={self._length})'
+
+    def latest(self) -> FrozenDict | None:
+        if self._length < 1:
+            return None
+        return self._entries[self._keys[self._length - 1]]
+
+    def key_at(self, index: int) -> str:
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError(index)
+        return self._keys[index]
+
+    def items_between(self, start: int, end: int) -> list[tuple[str, FrozenDict]]:
+        start, end = max(start, 0), min(end, self._length)
+        return [(self._keys[i], self._entries[self._keys[i]]) for i in range(start, end)]
+
+    def to_dict(self) -> OrderedDict:
+        # a mutable, json serializable copy
+        return OrderedDict((key, thaw(self._entries[key])) for key in self)
+
+
+class MemoryStore:
+    def __init__(self, memory: Mapping | None = None):
+        self._keys: list[str] = list()
+        self._entries: dict[str, FrozenDict] = dict()
+        self._positions: dict[str, int] = dict()
+        if memory is not None:
+            self.update(memory)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    @property
+    def durable(self) -> bool:
+        # durable stores outlive a run, reposition() keeps them
+        return False
+
+    def view(self) -> MemoryView:
+        return MemoryView(self._keys, self._entries, self._positions, len(self._keys))
+
+    def put(self, key: str, entry: Mapping):
+        entry = freeze(entry)
+        if key in self._positions:
+            if self._entries[key] == entry:
+                return self
+            # copy on write, views handed out earlier keep the old entry
+            self._keys = list(self._keys)
+            self._entries = dict(self._entries)
+            self._positions = dict(self._positions)
+            self._entries[key] = entry
+            return self
+        self._positions[key] = len(self._keys)
+        self._entries[key] = entry
+        self._keys.append(key)
+        return self
+
+    def update(self, memory: Mapping):
+        for key, entry in memory.items():
+            self.put(key, entry)
+        return self
@@ -0,0 +1,142 @@
+import bisect
+from collections.abc import Iterator, Mapping, Sequence
+
+from typing_extensions import override
+
+from ceo.memory.memory_store import MemoryStore, MemoryView, FrozenDict, freeze
+
+
+class _Segments:
+    __slots__ = ('views', 'offsets')
+
+    def __init__(self, views: list[MemoryView]):
+        # fixed length views, one per level of delegation, read in place and never copied
+        self.views = views
+        self.offsets: list[int] = list()
+        offset = 0
+        for view in views:
+            self.offsets.append(offset)
+            offset += len(view)
+
+    def locate(self, key: str) -> tuple[int, MemoryView] | None:
+        for offset, view in zip(self.offsets, self.views):
+            if key in view:
+                return offset, view
+        return None
+
+
+class _Keys(Sequence):
+    __slots__ = ('_segments',)
+
+    def __init__(self, segments: _Segments):
+        self._segments = segments
+
+    def __getitem__(self, index: int) -> str:
+        i = bisect.bisect_right(self._segments.offsets, index) - 1
+        return self._segments.views[i].key_at(index - self._segments.offsets[i])
+
+    def __len__(self) -> int:
+        return sum(len(view) for view in self._segments.views)
+
+
+class _Positions(Mapping):
+    __slots__ = ('_segments',)
+
+    def __init__(self, segments: _Segments):
+        self._segments = segments
+
+    def __getitem__(self, key: str) -> int:
+        located = self._segments.locate(key)
+        if located is None:
+            raise KeyError(key)
+        offset, view = located
+        return offset + view._positions[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for view in self._segments.views:
+            yield from view
+
+    def __len__(self) -> int:
+        return sum(len(view) for view in self._segments.views)
+
+
+class _Entries(Mapping):
+    __slots__ = ('_segments',)
+
+    def __init__(self, segments: _Segments):
+        self._segments = segments
+
+    def __getitem__(self, key: str) -> FrozenDict:
+        located = self._segments.locate(key)
+        if located is None:
+            raise KeyError(key)
+        return located[1][key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_Positions(self._segments))
+
+    def __len__(self) -> int:
+        return sum(len(view) for view in self._segments.views)
+
+
+def segments_of(memory: Mapping | None) -> list[MemoryView]:
+    if memory is None or len(memory) < 1:
+        return list()
+    if isinstance(memory, MemoryView):
+        if isinstance(memory._keys, _Keys):
+            return list(memory._keys._segments.views)
+        return [memory]
+    # plain mappings are copied once, views of other stores are shared as they are
+    return [MemoryStore(memory).view()]
+
+
+class OverlayMemoryStore(MemoryStore):
+    def __init__(self, base: Mapping | None = None):
+        # a read-only view of the delegating agent's memory, plus the entries of this run (the delta)
+        MemoryStore.__init__(self)
+        self._base: list[MemoryView] = segments_of(base)
+        self._base_length = sum(len(view) for view in self._base)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    @override
+    def __len__(self) -> int:
+        return self._base_length + len(self._keys)
+
+    @override
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions or any(key in view for view in self._base)
+
+    @property
+    def base(self) -> MemoryView:
+        return self.__chain(self._base, self._base_length)
+
+    @override
+    def view(self) -> MemoryView:
+        return self.__chain(self._base + [self.delta()], len(self))
+
+    def delta(self) -> MemoryView:
+        return MemoryStore.view(self)
+
+    @staticmethod
+    def __chain(views: list[MemoryView], length: int) -> MemoryView:
+        views = [view for view in views if len(view) > 0]
+        if len(views) < 1:
+            return MemoryStore().view()
+        if len(views) == 1:
+            return views[0]
+        segments = _Segments(views)
+        return MemoryView(_Keys(segments), _Entries(segments), _Positions(segments), length)
+
+    @override
+    def put(self, key: str, entry: Mapping):
+        for view in self._base:
+            if key in view:
+                if view[key] == freeze(entry):
+                    return self
+                raise TypeError('Memory brought in by a delegating agent is read-only.')
+        return MemoryStore.put(self, key, entry)
@@ -0,0 +1,217 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping, Sequence
+
+from typing_extensions import override
+
+from ceo.memory.memory_store import MemoryStore, MemoryView, FrozenDict, freeze
+
+DEFAULT_TABLE = 'memory'
+DEFAULT_CACHE_SIZE = 256
+# entries shorter than this are stored as plain json, zlib does not pay off for them
+COMPRESS_THRESHOLD = 64
+# preset zlib dictionary of what every memory entry repeats, it lets short entries compress well
+ENTRY_ZDICT = (b'{"timestamp":"","agent_name":"","message_from_":"I used the  ability to ","action_taken_by_":'
+               b'{"ability":"","choice":{},"returns":"","summarization":"","success":true,"result is '
+               b'which indicates the ')
+
+
+def encode_entry(entry: Mapping) -> bytes:
+    data = json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if len(data) >= COMPRESS_THRESHOLD:
+        compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION, zdict=ENTRY_ZDICT)
+        return b'z' + compressor.compress(data) + compressor.flush()
+    return b'j' + data
+
+
+def decode_entry(blob: bytes) -> FrozenDict:
+    data = blob[1:]
+    if blob[:1] == b'z':
+        decompressor = zlib.decompressobj(zdict=ENTRY_ZDICT)
+        data = decompressor.decompress(data) + decompressor.flush()
+    return freeze(json.loads(data))
+
+
+class _Keys(Sequence):
+    __slots__ = ('_store',)
+
+    def __init__(self, store: 'SqliteMemoryStore'):
+        self._store = store
+
+    def __getitem__(self, index: int) -> str:
+        return self._store._key_at(index)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class _Positions(Mapping):
+    __slots__ = ('_store',)
+
+    def __init__(self, store: 'SqliteMemoryStore'):
+        self._store = store
+
+    def __getitem__(self, key: str) -> int:
+        position = self._store._position_of(key)
+        if position is None:
+            raise KeyError(key)
+        return position
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self._store)):
+            yield self._store._key_at(i)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class _Entries(Mapping):
+    __slots__ = ('_store',)
+
+    def __init__(self, store: 'SqliteMemoryStore'):
+        self._store = store
+
+    def __getitem__(self, key: str) -> FrozenDict:
+        return self._store._entry_of(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_Positions(self._store))
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class SqliteMemoryStore(MemoryStore):
+    def __init__(self, path: str, table: str = DEFAULT_TABLE, cache_size: int = DEFAULT_CACHE_SIZE):
+        if not table.isidentifier():
+            raise ValueError(f'Invalid table name "{table}".')
+        self._path = path
+        self._table = table
+        self._cache_size = cache_size
+        self.__open()
+
+    def __open(self):
+        self._lock = threading.Lock()
+        # decoded entries, so that recent history is not read from disk on every step
+        self._cache: OrderedDict[str, FrozenDict] = OrderedDict()
+        __dir = os.path.dirname(os.path.abspath(self._path))
+        if not os.path.exists(__dir):
+            os.makedirs(__dir, exist_ok=True)
+        self._conn = sqlite3.connect(self._path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        # rows are only ever appended, so position (the rowid) is dense and starts from 1
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS {self._table} '
+                           '(position INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, entry BLOB NOT NULL)')
+        self._keys, self._entries, self._positions = _Keys(self), _Entries(self), _Positions(self)
+        self._length = self.__count()
+
+    def __count(self) -> int:
+        with self._lock:
+            row = self._conn.execute(f'SELECT MAX(position) FROM {self._table}').fetchone()
+        return row[0] or 0
+
+    def __getstate__(self) -> dict:
+        return {'_path': self._path, '_table': self._table, '_cache_size': self._cache_size}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__open()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    @override
+    def durable(self) -> bool:
+        return True
+
+    @override
+    def __len__(self) -> int:
+        return self._length
+
+    @override
+    def __contains__(self, key: str) -> bool:
+        return self._position_of(key) is not None
+
+    @override
+    def view(self) -> MemoryView:
+        # other writers may have appended to the same file since
+        self._length = self.__count()
+        return MemoryView(self._keys, self._entries, self._positions, self._length)
+
+    def _key_at(self, index: int) -> str:
+        with self._lock:
+            row = self._conn.execute(f'SELECT key FROM {self._table} WHERE position = ?', (index + 1,)).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return row[0]
+
+    def _position_of(self, key: str) -> int | None:
+        with self._lock:
+            row = self._conn.execute(f'SELECT position FROM {self._table} WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0] - 1
+
+    def _entry_of(self, key: str) -> FrozenDict:
+        with self._lock:
+            entry = self._cache.get(key, None)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+            row = self._conn.execute(f'SELECT entry FROM {self._table} WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        entry = decode_entry(row[0])
+        self.__remember(key, entry)
+        return entry
+
+    def __remember(self, key: str, entry: FrozenDict):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    @override
+    def put(self, key: str, entry: Mapping):
+        entry = freeze(entry)
+        blob = encode_entry(entry)
+        with self._lock:
+            row = self._conn.execute(f'SELECT entry FROM {self._table} WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                if row[0] == blob or decode_entry(row[0]) == entry:
+                    return self
+                # views read rows in place, so a rewritten entry would change under every snapshot handed out
+                raise TypeError(f'Memory "{key}" is already stored, entries of a SqliteMemoryStore are append-only.')
+            cursor = self._conn.execute(f'INSERT INTO {self._table} (key, entry) VALUES (?, ?)', (key, blob))
+            self._length = cursor.lastrowid
+        self.__remember(key, entry)
+        return self
+
+    @override
+    def update(self, memory: Mapping):
+        with self._lock:
+            self._conn.execute('BEGIN')
+        try:
+            for key, entry in memory.items():
+                self.put(key, entry)
+        except BaseException:
+            with self._lock:
+                self._conn.execute('ROLLBACK')
+                self._cache.clear()
+            self._length = self.__count()
+            raise
+        with self._lock:
+            self._conn.execute('COMMIT')
+        return self
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,148 @@
+import concurrent.futures
+import contextvars
+import logging
+import threading
+from collections.abc import Callable, Mapping
+
+from ceo.enum.EvictionStrategy import EvictionStrategy
+from ceo.memory.memory_policy import MemoryPolicy
+from ceo.memory.memory_store import MemoryView, FrozenDict
+from ceo.retrieval.bm25 import BM25Index, flatten_text
+
+SUMMARY_KEY = 'summary_of_earlier_events'
+# seconds a render waits for the fold in flight when more entries have been evicted since it started
+FOLD_WAIT = 2.0
+log = logging.getLogger('ceo')
+
+__summary_executor: concurrent.futures.ThreadPoolExecutor | None = None
+__summary_executor_lock = threading.Lock()
+
+
+def _summary_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global __summary_executor
+    with __summary_executor_lock:
+        if __summary_executor is None:
+            __summary_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2,
+                                                                       thread_name_prefix='ceo-memory-summary')
+        return __summary_executor
+
+
+class WorkingMemory:
+    def __init__(self, policy: MemoryPolicy,
+                 summarizer: Callable[[str, list[tuple[str, FrozenDict]]], str] | None = None):
+        self._policy = policy
+        self._summarizer = summarizer
+        self._sizes: dict[str, int] = dict()
+        self._summary = str()
+        self._summarized_count = 0
+        self._folded_end = 0
+        self._pending: concurrent.futures.Future | None = None
+        self._pending_end = 0
+        self._lock = threading.Lock()
+        self._index = BM25Index()
+        self._indexed_keys: list[str] = list()
+
+    @property
+    def policy(self) -> MemoryPolicy:
+        return self._policy
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def folding(self) -> bool:
+        pending = self._pending
+        return pending is not None and not pending.done()
+
+    def __size_of(self, memory: MemoryView, key: str) -> int:
+        size = self._sizes.get(key, None)
+        if size is None:
+            size = self._sizes[key] = self._policy.measure(memory[key])
+        return size
+
+    def render(self, memory: MemoryView | None, query: str | None = None) -> Mapping | None:
+        if memory is None:
+            return None
+        start, end = self._policy.select(memory, lambda _key: self.__size_of(memory, _key))
+        if end <= start:
+            return memory
+        if self._summarizer is not None:
+            self.__fold(memory, start, end)
+        rendered = dict()
+        with self._lock:
+            summary, summarized_count, folded_end = self._summary, self._summarized_count, self._folded_end
+        # evicted entries which the summary does not cover yet, they are folded in the background
+        unsummarized = max(end - max(start, folded_end), 0) if self._summarizer is not None else 0
+        if len(summary) > 0 or unsummarized > 0:
+            rendered[SUMMARY_KEY] = {
+                'summary': summary,
+                'events_summarized': summarized_count
+            }
+            if unsummarized > 0:
+                rendered[SUMMARY_KEY]['events_not_yet_summarized'] = unsummarized
+        for key, entry in memory.items_between(0, start):
+            rendered[key] = entry
+        recalled = list()
+        if self._policy.eviction == EvictionStrategy.RELEVANCE and query:
+            recalled = self.__recall(memory, query, start, end)
+        for key, entry in recalled:
+            rendered[key] = entry
+        for key, entry in memory.items_between(end, len(memory)):
+            rendered[key] = entry
+        log.debug(f'WorkingMemory: {len(memory)} entries; {end - start - len(recalled)} evicted; '
+                  f'{len(recalled)} recalled; {self._summarized_count} summarized;')
+        return rendered
+
+    def __recall(self, memory: MemoryView, query: str, start: int, end: int) -> list[tuple[str, FrozenDict]]:
+        indexed = len(self._indexed_keys)
+        if indexed > len(memory) or (indexed > 0 and memory.key_at(indexed - 1) != self._indexed_keys[-1]):
+            # a different memory is being rendered, start over
+            self._index, self._indexed_keys, indexed = BM25Index(), list(), 0
+        # entries are indexed once, as they arrive, so a step only pays for the new ones
+        for key, entry in memory.items_between(indexed, end):
+            self._index.add(len(self._indexed_keys), f'{key} {flatten_text(entry)}')
+            self._indexed_keys.append(key)
+        hits = self._index.search(query, self._policy.top_k, candidates=range(start, end))
+        # recalled entries keep their chronological order
+        keys = [memory.key_at(position) for position in sorted(position for position, _ in hits)]
+        return [(key, memory[key]) for key in keys]
+
+    def __fold(self, memory: MemoryView, start: int, end: int):
+        pending = self._pending
+        if pending is not None and not pending.done():
+            if end <= self._pending_end:
+                return
+            # entries evicted since the fold in flight started would be neither shown nor summarized
+            # until the next fold, so it is waited for briefly and the next one is started right away
+            concurrent.futures.wait([pending], timeout=FOLD_WAIT)
+            if not pending.done():
+                log.debug(f'WorkingMemory: rolling summary still in flight, {end - self._pending_end} events wait.')
+                return
+        with self._lock:
+            if self._pending is not pending or end <= self._folded_end:
+                return
+            events = memory.items_between(max(start, self._folded_end), end)
+            previous_summary = self._summary
+            # in the caller's context, so that the summary call is profiled and counted against the run's budgets
+            self._pending = _summary_executor().submit(contextvars.copy_context().run,
+                                                       self.__summarize, previous_summary, events, end)
+            self._pending_end = end
+
+    def __summarize(self, previous_summary: str, events: list[tuple[str, FrozenDict]], end: int):
+        # the fold is applied before its future is done, so a render that waited for it sees the new summary
+        try:
+            summary = self._summarizer(previous_summary, events)
+        except Exception as e:
+            log.warning(f'WorkingMemoryWarn: rolling summary failed. {e}')
+            return
+        with self._lock:
+            self._summary = summary
+            self._summarized_count += len(events)
+            self._folded_end = end
+
+    def wait(self, timeout: float | None = None):
+        pending = self._pending
+        if pending is not None:
+            concurrent.futures.wait([pending], timeout=timeout)
+        return self
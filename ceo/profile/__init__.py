@@ -0,0 +1 @@
+from .run_profile import RunProfile, current_profile, profiling
@@ -0,0 +1,166 @@
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from langchain_core.messages import BaseMessage
+
+_current_profile: contextvars.ContextVar['RunProfile | None'] = contextvars.ContextVar('ceo_run_profile', default=None)
+
+
+def current_profile() -> 'RunProfile | None':
+    return _current_profile.get()
+
+
+@contextlib.contextmanager
+def profiling(profile: 'RunProfile'):
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        profile.finish()
+
+
+def token_usage(message: BaseMessage | None) -> dict:
+    usage = {'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0, 'cache_read_tokens': 0}
+    if message is None:
+        return usage
+    usage_metadata = getattr(message, 'usage_metadata', None)
+    if usage_metadata:
+        usage['input_tokens'] = usage_metadata.get('input_tokens', 0) or 0
+        usage['output_tokens'] = usage_metadata.get('output_tokens', 0) or 0
+        usage['total_tokens'] = usage_metadata.get('total_tokens', 0) or 0
+        # prompt tokens the provider served from its prefix cache
+        input_token_details = usage_metadata.get('input_token_details', None) or dict()
+        usage['cache_read_tokens'] = input_token_details.get('cache_read', 0) or 0
+        return usage
+    response_metadata = getattr(message, 'response_metadata', None) or dict()
+    token_usage_dict = response_metadata.get('token_usage', response_metadata.get('usage', None)) or dict()
+    usage['input_tokens'] = token_usage_dict.get('prompt_tokens', token_usage_dict.get('input_tokens', 0)) or 0
+    usage['output_tokens'] = token_usage_dict.get('completion_tokens', token_usage_dict.get('output_tokens', 0)) or 0
+    usage['total_tokens'] = (token_usage_dict.get('total_tokens', 0)
+                             or usage['input_tokens'] + usage['output_tokens'])
+    return usage
+
+
+class RunProfile:
+    def __init__(self, agent_name: str, parent: 'RunProfile | None' = None,
+                 callback: Callable[['RunProfile'], any] | None = None):
+        self._agent_name = agent_name
+        self._parent = parent
+        self._callback = callback
+        self._records: list[dict] = list()
+        self._last_prompts: dict[str, str] = dict()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._end: float | None = None
+        if parent is not None:
+            parent.add_record({'type': 'agent', 'agent': agent_name, 'profile': self})
+
+    @property
+    def agent_name(self) -> str:
+        return self._agent_name
+
+    @property
+    def parent(self) -> 'RunProfile | None':
+        return self._parent
+
+    @property
+    def records(self) -> list[dict]:
+        with self._lock:
+            return list(self._records)
+
+    @property
+    def time_used(self) -> float:
+        end = self._end if self._end is not None else time.perf_counter()
+        return end - self._start
+
+    def add_record(self, record: dict):
+        with self._lock:
+            self._records.append(record)
+        return self
+
+    def record_llm_call(self, prompt_class: str, retry: int, prompt: str, response: str,
+                        time_used: float, message: BaseMessage | None = None, cached: bool = False):
+        with self._lock:
+            previous_prompt = self._last_prompts.get(prompt_class, str())
+            self._last_prompts[prompt_class] = prompt
+        record = {
+            'type': 'llm',
+            'prompt_class': prompt_class,
+            'retry': retry,
+            'prompt_chars': len(prompt),
+            # how much of the prompt repeats the previous one of its kind, the part a prefix cache can reuse
+            'prefix_chars': len(os.path.commonprefix([previous_prompt, prompt])),
+            'response_chars': len(response),
+            'cached': cached,
+            'time_used': time_used
+        }
+        record.update(token_usage(message))
+        return self.add_record(record)
+
+    def record_ability_call(self, ability: str, time_used: float, success: bool = True):
+        return self.add_record({
+            'type': 'ability',
+            'ability': ability,
+            'success': success,
+            'time_used': time_used
+        })
+
+    def finish(self):
+        if self._end is None:
+            self._end = time.perf_counter()
+            if self._callback is not None:
+                self._callback(self)
+        return self
+
+    def llm_calls(self, recursive: bool = True) -> list[dict]:
+        calls = list()
+        for record in self.records:
+            if record['type'] == 'llm':
+                calls.append(record)
+            elif record['type'] == 'agent' and recursive:
+                calls.extend(record['profile'].llm_calls(recursive=True))
+        return calls
+
+    def total_tokens(self, recursive: bool = True) -> int:
+        return sum(call['total_tokens'] for call in self.llm_calls(recursive=recursive))
+
+    def to_dict(self) -> dict:
+        records = list()
+        time_by_prompt: dict[str, float] = dict()
+        ability_time = 0.0
+        retries = 0
+        prompt_chars = prefix_chars = 0
+        tokens = {'input_tokens': 0, 'output_tokens': 0, 'total_tokens': 0, 'cache_read_tokens': 0}
+        for record in self.records:
+            if record['type'] == 'agent':
+                records.append({'type': 'agent', 'agent': record['agent'], 'profile': record['profile'].to_dict()})
+                continue
+            records.append(dict(record))
+            if record['type'] == 'llm':
+                time_by_prompt[record['prompt_class']] = (time_by_prompt.get(record['prompt_class'], 0.0)
+                                                          + record['time_used'])
+                if record['retry'] > 0:
+                    retries += 1
+                if not record['cached']:
+                    prompt_chars += record['prompt_chars']
+                    prefix_chars += record['prefix_chars']
+                for key in tokens.keys():
+                    tokens[key] += record[key]
+            elif record['type'] == 'ability':
+                ability_time += record['time_used']
+        return {
+            'agent': self._agent_name,
+            'time_used': self.time_used,
+            'llm_call_count': sum(1 for record in records if record['type'] == 'llm'),
+            'retry_count': retries,
+            'tokens': tokens,
+            'prefix_hit_ratio': prefix_chars / prompt_chars if prompt_chars > 0 else 0.0,
+            'llm_time_by_prompt': time_by_prompt,
+            'ability_time': ability_time,
+            'records': records
+        }
@@ -7,3 +7,4 @@ from .request_resolver_prompt import RequestResolverPrompt
 from .self_introduce import SelfIntroducePrompt
 from .docstring_prompt import DocstringPrompt
 from .next_move_prompt import NextMovePrompt
+from .memory_summary_prompt import MemorySummaryPrompt
@@ -20,7 +20,6 @@ class AnalyserPrompt(Prompt):
         prompt = {
             "precondition": "Below is the <tool(ability)> you can use (you can only use this tool(ability)). "
                             f'And there is a user request in <user_request>.',
-            "user_request": request,
             "objective": "What you need to do is to generate values of parameters of the <tool(ability)> "
                          "to achieve <user request>",
             "hints": {
@@ -32,9 +31,10 @@ class AnalyserPrompt(Prompt):
                                              "which are only described in <tool(ability)>.",
                 "no_redundant_info": "With no any redundant information, only a json which provides parameters."
             },
-            "tool(ability)": action.to_dict(),
             "output_format": "json",
-            "output_example": '{"param_1.name": "value_for_param_1", "param_2.name": "value_for_param_2"}'
+            "output_example": '{"param_1.name": "value_for_param_1", "param_2.name": "value_for_param_2"}',
+            "tool(ability)": action.to_dict(),
+            "user_request": request
         }
         if len(prev_results_str) != 0:
             prompt['action_history (previous actions)'] = prev_results_str
@@ -52,8 +52,13 @@ class AnalyserPrompt(Prompt):
         log.debug(f'AnalyserPrompt: {self.prompt}')
 
     def invoke(self, model: BaseChatModel) -> tuple[Ability, dict]:
+        return self.__parse(self._invoke_model(model, self.prompt))
+
+    async def ainvoke(self, model: BaseChatModel) -> tuple[Ability, dict]:
+        return self.__parse(await self._ainvoke_model(model, self.prompt))
+
+    def __parse(self, result: str) -> tuple[Ability, dict]:
         # noinspection DuplicatedCode
-        result = model.invoke(self.prompt).content
         log.debug(f'AnalyserResponse: {result}')
         if not result.startswith('{'):
             result = result[result.find('{'):]
@@ -75,8 +75,23 @@ class DocstringPrompt(Prompt):
         log.debug(f'DocstringPrompt: {self.prompt}')
 
     def invoke(self, model: BaseChatModel) -> str | Iterator:
+        return self.__parse(self._invoke_model(model, self.prompt))
+
+    async def ainvoke(self, model: BaseChatModel) -> str:
+        return self.__parse(await self._ainvoke_model(model, self.prompt))
+
+    @staticmethod
+    def batch(prompts: list['DocstringPrompt'], model: BaseChatModel, max_concurrency: int | None = None) -> list[str]:
+        return [DocstringPrompt.__parse(resp) for resp in Prompt._batch_model(model, prompts, max_concurrency)]
+
+    @staticmethod
+    async def abatch(prompts: list['DocstringPrompt'], model: BaseChatModel,
+                     max_concurrency: int | None = None) -> list[str]:
+        return [DocstringPrompt.__parse(resp) for resp in await Prompt._abatch_model(model, prompts, max_concurrency)]
+
+    @staticmethod
+    def __parse(raw_docstring: str) -> str:
         # noinspection DuplicatedCode
-        raw_docstring = model.invoke(self.prompt).content
         log.debug(f'DocstringResponse: {raw_docstring}')
         if not raw_docstring.startswith('{'):
             raw_docstring = raw_docstring[raw_docstring.find('{'):]
@@ -1,23 +1,27 @@
-import copy
 import json
 import logging
-from collections.abc import Iterator
+import time
+from collections.abc import Iterator, AsyncIterator
 
 from langchain_core.language_models import BaseChatModel
 
 from ceo.ability.agentic_ability import PREFIX as AGENTIC_ABILITY_PREFIX
 from ceo.ability.ability import Ability
+from ceo.exception.ability_timeout_exception import AbilityTimeoutException
 from ceo.exception.too_dumb_exception import TooDumbException
+from ceo.profile.run_profile import current_profile
 from ceo.prompt.prompt import Prompt
 
 log = logging.getLogger('ceo.prompt')
 
+MAX_RESULT_CHARS = 2000
+
 
 class ExecutorPrompt(Prompt):
     def __init__(self, args: dict, action: Ability, ext_context: str = ''):
         self.action = action
-        self.args = copy.deepcopy(args)
-        tmp_args = copy.deepcopy(self.args)
+        self.args = dict(args)
+        tmp_args = dict(self.args)
         if self.action.name.startswith(AGENTIC_ABILITY_PREFIX):
             del tmp_args['memory']
         prompt = json.dumps({
@@ -35,13 +39,123 @@ class ExecutorPrompt(Prompt):
     def explain(self, model: BaseChatModel, stream: bool = False) -> str | Iterator:
         if stream:
             return model.stream(self.prompt)
-        resp = model.invoke(self.prompt).content
+        resp = self._invoke_model(model, self.prompt)
+        log.debug(f'ExecutorResponse (before): {resp}')
+        return resp
+
+    async def aexplain(self, model: BaseChatModel, stream: bool = False) -> str | AsyncIterator:
+        if stream:
+            return model.astream(self.prompt)
+        resp = await self._ainvoke_model(model, self.prompt)
         log.debug(f'ExecutorResponse (before): {resp}')
         return resp
 
-    def invoke(self, model: BaseChatModel, max_retry: int = 3) -> dict:
-        result = self.action.__call__(**self.args)
-        tmp_args = copy.deepcopy(self.args)
+    def invoke(self, model: BaseChatModel, max_retry: int = 3, summarize: bool = True) -> dict:
+        result = self.execute()
+        if not summarize:
+            return self.record(result)
+        return self.summarize(model, result, max_retry=max_retry)
+
+    async def ainvoke(self, model: BaseChatModel, max_retry: int = 3, summarize: bool = True) -> dict:
+        result = await self.aexecute()
+        if not summarize:
+            return self.record(result)
+        return await self.asummarize(model, result, max_retry=max_retry)
+
+    def summarize(self, model: BaseChatModel, result: any, max_retry: int = 3) -> dict:
+        prompt = self.__summarization_prompt(result)
+        count = 0
+        tmp_prompt = prompt
+        while True:
+            self.__check_retry(count, max_retry, model)
+            count += 1
+            res = self._invoke_model(model, tmp_prompt, retry=count - 1)
+            res_dict, tmp_prompt = self.__parse(res, prompt, count)
+            if res_dict is not None:
+                return res_dict
+
+    async def asummarize(self, model: BaseChatModel, result: any, max_retry: int = 3) -> dict:
+        prompt = self.__summarization_prompt(result)
+        count = 0
+        tmp_prompt = prompt
+        while True:
+            self.__check_retry(count, max_retry, model)
+            count += 1
+            res = await self._ainvoke_model(model, tmp_prompt, retry=count - 1)
+            res_dict, tmp_prompt = self.__parse(res, prompt, count)
+            if res_dict is not None:
+                return res_dict
+
+    def record(self, result: any) -> dict:
+        choice = self.__choice()
+        returns = self.render_result(result)
+        record = {
+            'ability': self.action.name,
+            'choice': choice,
+            'returns': returns,
+            'summarization': f'I used the {self.action.name} ability '
+                             f'with {json.dumps(choice, ensure_ascii=False, default=str)}, '
+                             f'the result is: {returns}'
+        }
+        log.debug(f'Executor (after) record: {record}')
+        return record
+
+    @staticmethod
+    def render_result(result: any, max_chars: int = MAX_RESULT_CHARS) -> str:
+        if isinstance(result, str):
+            rendered = result
+        else:
+            try:
+                rendered = json.dumps(result, ensure_ascii=False, default=str)
+            except (TypeError, ValueError):
+                rendered = str(result)
+        if max_chars is not None and len(rendered) > max_chars:
+            rendered = f'{rendered[:max_chars]}...({len(rendered) - max_chars} more characters truncated)'
+        return rendered
+
+    def __choice(self) -> dict | str:
+        if self.action.name.startswith(AGENTIC_ABILITY_PREFIX):
+            return 'Ask for a favor.'
+        return dict(self.args)
+
+    def execute(self) -> any:
+        __start_time = time.perf_counter()
+        success = False
+        try:
+            result = self.action.__call__(**self.args)
+            success = True
+            return result
+        except AbilityTimeoutException as e:
+            # the agent is told, and can try something else in the time that is left
+            log.warning(f'ExecutorWarn: {self.action.name}; {e};')
+            return str(e)
+        finally:
+            self.__record_ability_call(__start_time, success)
+
+    async def aexecute(self) -> any:
+        __start_time = time.perf_counter()
+        success = False
+        try:
+            result = await self.action.acall(**self.args)
+            success = True
+            return result
+        except AbilityTimeoutException as e:
+            log.warning(f'ExecutorWarn: {self.action.name}; {e};')
+            return str(e)
+        finally:
+            self.__record_ability_call(__start_time, success)
+
+    def __record_ability_call(self, start_time: float, success: bool):
+        profile = current_profile()
+        if profile is not None:
+            profile.record_ability_call(
+                ability=self.action.name,
+                time_used=time.perf_counter() - start_time,
+                success=success
+            )
+
+    def __summarization_prompt(self, result: any) -> str:
+        tmp_args = dict(self.args)
         if self.action.name.startswith(AGENTIC_ABILITY_PREFIX):
             tmp_args = {'choice': 'Ask for a favor.'}
         prompt = json.dumps({
@@ -50,9 +164,6 @@ class ExecutorPrompt(Prompt):
                             "result of your using of this <ability> is shown at <result>.",
             "task": "Explain what you have done according to <ability>, <result>, and <args(choice)> "
                     "accurately, comprehensively, and briefly.",
-            "ability": self.action.to_dict(),
-            "args(choice)": tmp_args,
-            "result": str(result),
             "output_format": {
                 'ability': '{ability_just_used}',
                 'choice': '{choice_just_made}',
@@ -68,41 +179,44 @@ class ExecutorPrompt(Prompt):
                                  "the result shows 'success' which indicates success of wechat message sending."
             }, ensure_ascii=False),
             "hint_for_output": 'You must strictly follow the json format in <output_format>!! '
-                               'You can refer to example in <output_example>!!'
+                               'You can refer to example in <output_example>!!',
+            "ability": self.action.to_dict(),
+            "args(choice)": tmp_args,
+            "result": str(result)
         }, ensure_ascii=False)
         if len(self.ext_context) > 0:
             prompt = Prompt.construct_prompt(prompt, self.ext_context)
         log.debug(f'ExecutorPrompt (after): {prompt}')
-        count = 0
+        return prompt
+
+    @staticmethod
+    def __check_retry(count: int, max_retry: int, model: BaseChatModel):
+        # noinspection DuplicatedCode
+        if count > 0:
+            if count <= max_retry:
+                log.warning(f'ExecutorAfterPromptWarn: incorrectly formatted. Retry: {count}')
+            else:
+                log.warning(f'ExecutorAfterPromptWarn: max retry exceeded.')
+                raise TooDumbException(model)
+
+    @staticmethod
+    def __parse(res: str, prompt: str, count: int) -> tuple[dict | None, str]:
         exclamation = '!'
-        tmp_prompt = prompt
         keys = ('summarization', 'ability', 'choice', 'returns')
-        while True:
-            # noinspection DuplicatedCode
-            if count > 0:
-                if count <= max_retry:
-                    log.warning(f'ExecutorAfterPromptWarn: incorrectly formatted. Retry: {count}')
-                else:
-                    log.warning(f'ExecutorAfterPromptWarn: max retry exceeded.')
-                    raise TooDumbException(model)
-            count += 1
-            res = model.invoke(tmp_prompt).content
-            log.debug(f"Executor (after) thought process: \n{res}")
-            try:
-                correct_format = True
-                res_dict: dict = json.loads(res[res.find('{'):res.rfind('}') + 1].strip())
-                for _key in keys:
-                    if _key not in res_dict.keys():
-                        correct_format = False
-                if correct_format:
-                    break
-                tmp_prompt = (f'{prompt}Attention_{count}: '
-                              f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
-                              f'You should refer to example in <output_example>{count * 2 * exclamation}')
-                tmp_prompt = Prompt.construct_prompt(tmp_prompt, '')
-            except json.decoder.JSONDecodeError:
-                tmp_prompt = (f'{prompt}Attention_{count}: '
-                              f'You must strictly follow the json format in <output_format>{count * 2 * exclamation} '
-                              f'You should refer to example in <output_example>{count * 2 * exclamation}')
-                tmp_prompt = Prompt.construct_prompt(tmp_prompt, '')
-        return res_dict
+        log.debug(f"Executor (after) thought process: \n{res}")
+        try:
+            res_dict: dict = json.loads(res[res.find('{'):res.rfind('}') + 1].strip())
+            correct_format = True
+            for _key in keys:
+                if _key not in res_dict.keys():
+                    correct_format = False
+            if correct_format:
+                return res_dict, prompt
+            tmp_prompt = (f'{prompt}Attention_{count}: '
+                          f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
+                          f'You should refer to example in <output_example>{count * 2 * exclamation}')
+        except json.decoder.JSONDecodeError:
+            tmp_prompt = (f'{prompt}Attention_{count}: '
+                          f'You must strictly follow the json format in <output_format>{count * 2 * exclamation} '
+                          f'You should refer to example in <output_example>{count * 2 * exclamation}')
+        return None, Prompt.construct_prompt(tmp_prompt, '')
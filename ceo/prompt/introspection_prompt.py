@@ -1,11 +1,12 @@
 import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator, AsyncIterator, Mapping
 
 from langchain_core.language_models import BaseChatModel
+from typing_extensions import override
 
 from ceo.exception.too_dumb_exception import TooDumbException
-from ceo.prompt.prompt import Prompt
+from ceo.prompt.prompt import Prompt, PARTIAL_OK, PARTIAL_DONE, PARTIAL_MALFORMED
 
 log = logging.getLogger('ceo.prompt')
 
@@ -29,17 +30,18 @@ Based on above assessments, here is my conclusion:
 
 
 class IntrospectionPrompt(Prompt):
-    def __init__(self, request: str, history: dict | list, self_info: str | dict, ext_context: str = ''):
+    _stop_sequences = (END,)
+
+    def __init__(self, request: str, history: Mapping | list, self_info: str | dict, ext_context: str = ''):
+        if isinstance(history, Mapping) and not isinstance(history, dict):
+            history = dict(history)
         prompt = json.dumps({
             "precondition": "Below in <history> are actions have been performed to achieve <request>. ",
-            "request": request,
-            "your_identity": self_info,
             "hint_for_your_identity": 'You can know your identity from <your_identity>.',
             "task": "Think step by step concisely whether <request> has been fully achieved "
                     "according to <history> and <request>. "
                     "Then, provide the detailed results mentioned in <history> accurately. "
                     "Finally, if the <request> has not been fully achieved, explain why failed?",
-            "history": history,
             "output_datatype": "text",
             "output_format": f'{THOUGHT_PROCESS}\n'
                              '({condition_for_action_1}) [{action_1_to_take}]: {record_of_action_1_from_history} ({success_or_failed})\n'
@@ -63,33 +65,83 @@ class IntrospectionPrompt(Prompt):
             "hint_for_end_pattern": f'The "{END}" pattern marks the end of your whole response, '
                                     f'no more words are allowed after "{END}" pattern. '
                                     f'The "{END}" pattern is absolutely important, do not forget to place it '
-                                    'in the end of your response.'
+                                    'in the end of your response.',
+            "your_identity": self_info,
+            "request": request,
+            "history": history
         }, ensure_ascii=False)
         super().__init__(prompt, ext_context)
         log.debug(f'IntrospectionPrompt: {self.prompt}')
 
-    def invoke(self, model: BaseChatModel, stream: bool = False, max_retry: int = 6) -> tuple[str, str] | Iterator:
+    def invoke(self, model: BaseChatModel, stream: bool = False, max_retry: int = 6,
+               on_chunk: Callable[[str], any] | None = None,
+               on_retry: Callable[[int], any] | None = None) -> tuple[str, str] | Iterator:
         if stream:
             return model.stream(self.prompt)
         count: int = 0
-        exclamation = '!'
         tmp_prompt = self.prompt
         while True:
-            # noinspection DuplicatedCode
-            if count > 0:
-                if count <= max_retry:
-                    log.warning(f'IntrospectionPromptWarn: incorrectly formatted. Retry: {count}')
-                else:
-                    log.warning(f'IntrospectionPromptWarn: max retry exceeded.')
-                    raise TooDumbException(model)
+            self.__check_retry(count, max_retry, model)
+            count += 1
+            resp = self._complete(model, tmp_prompt, retry=count - 1, on_chunk=on_chunk)
+            if self.__is_well_formatted(resp):
+                return self.__parse(resp)
+            if on_chunk is not None and on_retry is not None:
+                # what has been streamed so far is to be discarded
+                on_retry(count)
+            tmp_prompt = self.__retry_prompt(count)
+
+    async def ainvoke(self, model: BaseChatModel, stream: bool = False, max_retry: int = 6,
+                      on_chunk: Callable[[str], any] | None = None,
+                      on_retry: Callable[[int], any] | None = None) -> tuple[str, str] | AsyncIterator:
+        if stream:
+            return model.astream(self.prompt)
+        count: int = 0
+        tmp_prompt = self.prompt
+        while True:
+            self.__check_retry(count, max_retry, model)
             count += 1
-            resp = model.invoke(tmp_prompt).content
-            log.debug(f"Introspection thought process: \n{resp}")
-            if resp.count(THOUGHT_PROCESS) == 1 and resp.count(CONCLUSION) == 1 and resp.count(END) == 1:
-                break
-            tmp_prompt = (f'{self.prompt}Attention_{count}: '
-                          f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
-                          f'You should refer to example in <output_example>{count * 2 * exclamation}')
+            resp = await self._acomplete(model, tmp_prompt, retry=count - 1, on_chunk=on_chunk)
+            if self.__is_well_formatted(resp):
+                return self.__parse(resp)
+            if on_chunk is not None and on_retry is not None:
+                # what has been streamed so far is to be discarded
+                on_retry(count)
+            tmp_prompt = self.__retry_prompt(count)
+
+    @override
+    def _check_partial(self, partial: str) -> int:
+        if END in partial:
+            return PARTIAL_DONE
+        if partial.count(THOUGHT_PROCESS) > 1 or partial.count(CONCLUSION) > 1:
+            return PARTIAL_MALFORMED
+        if CONCLUSION in partial and THOUGHT_PROCESS not in partial:
+            return PARTIAL_MALFORMED
+        return PARTIAL_OK
+
+    @staticmethod
+    def __check_retry(count: int, max_retry: int, model: BaseChatModel):
+        # noinspection DuplicatedCode
+        if count > 0:
+            if count <= max_retry:
+                log.warning(f'IntrospectionPromptWarn: incorrectly formatted. Retry: {count}')
+            else:
+                log.warning(f'IntrospectionPromptWarn: max retry exceeded.')
+                raise TooDumbException(model)
+
+    @staticmethod
+    def __is_well_formatted(resp: str) -> bool:
+        log.debug(f"Introspection thought process: \n{resp}")
+        return resp.count(THOUGHT_PROCESS) == 1 and resp.count(CONCLUSION) == 1 and resp.count(END) == 1
+
+    def __retry_prompt(self, count: int) -> str:
+        exclamation = '!'
+        return (f'{self.prompt}Attention_{count}: '
+                f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
+                f'You should refer to example in <output_example>{count * 2 * exclamation}')
+
+    @staticmethod
+    def __parse(resp: str) -> tuple[str, str]:
         log.debug(f'IntrospectionResponse: {resp}')
         _conclusion = resp[resp.rfind(CONCLUSION) + len(CONCLUSION):resp.rfind(END)].strip().strip('\n').strip('\r')
         return _conclusion, resp
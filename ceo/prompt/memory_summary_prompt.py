@@ -0,0 +1,38 @@
+import json
+import logging
+
+from langchain_core.language_models import BaseChatModel
+
+from ceo.prompt.prompt import Prompt
+
+log = logging.getLogger('ceo.prompt')
+
+
+class MemorySummaryPrompt(Prompt):
+    def __init__(self, previous_summary: str, events: list | dict, ext_context: str = ''):
+        if isinstance(events, list):
+            events = {key: entry for key, entry in events}
+        prompt = json.dumps({
+            "precondition": "<previous_summary> summarizes earlier events, "
+                            "<events> are events happened after them (chronologically).",
+            "task": "Merge <previous_summary> and <events> into one compact summary.",
+            "additional_important": "For all details in <events> and <previous_summary>, "
+                                    "you should preserve specific information with accuracy requirements "
+                                    "such as datas, numbers, dates, names, file names, results, etc.",
+            "output_datatype": "text",
+            "limitation_for_output": "Output the summary only, brief, concise, accurate and chronological.",
+            "previous_summary": previous_summary if len(previous_summary) > 0 else "Nothing happened before.",
+            "events": events
+        }, ensure_ascii=False)
+        super().__init__(prompt, ext_context)
+        log.debug(f'MemorySummaryPrompt: {self.prompt}')
+
+    def invoke(self, model: BaseChatModel) -> str:
+        resp = self._invoke_model(model, self.prompt)
+        log.debug(f'MemorySummaryResponse: {resp}')
+        return resp.strip()
+
+    async def ainvoke(self, model: BaseChatModel) -> str:
+        resp = await self._ainvoke_model(model, self.prompt)
+        log.debug(f'MemorySummaryResponse: {resp}')
+        return resp.strip()
@@ -1,12 +1,16 @@
+import copy
+import hashlib
 import json
 import logging
-from collections import OrderedDict
+import re
+from collections.abc import Mapping
 
 from langchain_core.language_models import BaseChatModel
+from typing_extensions import override
 
 from ceo.ability import Ability
 from ceo.ability.agentic_ability import PREFIX as AGENTIC_ABILITY_PREFIX
-from ceo.prompt.prompt import Prompt
+from ceo.prompt.prompt import Prompt, PARTIAL_OK, PARTIAL_DONE, PARTIAL_MALFORMED
 from ceo.exception.too_dumb_exception import TooDumbException
 
 log = logging.getLogger('ceo.prompt')
@@ -15,6 +19,7 @@ SEPARATOR = '--SEP--'
 END = '--END--'
 MISSION_COMPLETE = '-mission-complete-'
 MISSION_FAILED = '-mission-failed-'
+MAX_TOOL_NAME_LENGTH = 64
 
 OUTPUT_EXAMPLE = """
 [step1] In the provided history, events related to the user's request are listed chronologically:
@@ -32,13 +37,40 @@ args:{
 ability:[calculator]
 """ + END
 
+MULTI_ACTION_OUTPUT_EXAMPLE = """
+[step1] In the provided history, events related to the user's request are listed chronologically:
+    1. Steve calculated the radius of the sphere using the expression "(3 * 174.9 / 15.9 * 2.77)", resulting in a radius of 91.41 cm.
+[step2] According to the history, only the radius has been calculated, the surface area and volume calculation and file writing have not been completed, therefore the user request has not been fully and properly accomplished.
+[step3] The unfinished parts of the user request are the calculation of the surface area and volume and writing the results to 'result.txt'. The abilities I possess include "calculator" for performing calculations and "write_file" for writing content to a file. 
+[step4] Since the user's request is not fully accomplished, my next moves are to use the "calculator" ability with the expression "4 * 3.14159 * (91.41^2)" to compute the surface area and, independently, the "calculator" ability with the expression "(4/3) * 3.14159 * (91.41^3)" to compute the volume. Writing the file depends on both results, so it has to wait.
+[step5] This step is not applicable because the user request has not been fully accomplished, and I have the ability to continue progressing.
+[step6] This step is not applicable because the user request has not been fully accomplished.
+""" + SEPARATOR + """
+args:{
+  "{name_of_param}": "4 * 3.14159 * (91.41^2)"
+}
+ability:[calculator]
+args:{
+  "{name_of_param}": "(4/3) * 3.14159 * (91.41^3)"
+}
+ability:[calculator]
+""" + END
+
 
 class NextMovePrompt(Prompt):
+    _stop_sequences = (END,)
+
     def __init__(self, request: str | dict,
                  abilities: list[Ability],
-                 history: OrderedDict | None = None,
+                 history: Mapping | None = None,
+                 multi_action: bool = False,
+                 tool_calling: bool = False,
                  ext_context: str = ''):
         self.abilities = abilities
+        self.__multi_action = multi_action
+        self.__tools: list[dict] | None = None
+        self.__tool_names: dict[str, str] = dict()
+        self.__tool_prompt: str | None = None
         self.__ability_names = [MISSION_COMPLETE, MISSION_FAILED]
         for ability in self.abilities:
             self.__ability_names.append(ability.name)
@@ -60,10 +92,14 @@ class NextMovePrompt(Prompt):
         latest_progress = None
         for ability in self.abilities:
             abilities_dict[ability.name] = ability.to_dict()
-        if history in ('', '[]', '()', '{}', {}, [], (), None) or len(history.keys()) == 0:
-            latest_progress = history = "Nothing happened before you."
+        if isinstance(history, Mapping):
+            if len(history) < 1:
+                latest_progress = history = "Nothing happened before you."
+            else:
+                latest_progress = history[next(reversed(history))]
+                history = dict(history)
         else:
-            latest_progress = history[list(history.keys())[-1]]
+            latest_progress = history = "Nothing happened before you."
         prompt_dict = {
             "precondition": "In <abilities> are abilities you have, and there is a <user_request>. "
                             "<history> shows events happened before you, "
@@ -145,67 +181,215 @@ class NextMovePrompt(Prompt):
             "output_example": OUTPUT_EXAMPLE,
             "hint_for_output": 'You must strictly follow the format in <output_format>! '
                                'You should refer to example in <output_example>!',
-            "user_request": request,
-            "history": history,
-            "latest_progress": latest_progress,
             "hint_for_latest_progress": "The <latest_progress> shows the previous move.",
-            "abilities": abilities_dict,
             "limitation_1_for_ability_choosing": "Only one ability can be chosen.",
             "limitation_2_for_ability_choosing": "You can only use the abilities listed in <abilities>.",
             "limitation_for_ability_output_format": 'The ability should be after the args. '
                                                     'The ability name should be surrounded by "[ ]".',
             "limitation_for_args": f'You must make sure the parameter_names you provide '
-                                   f'for <args> are real and correct according to <abilities>!'
+                                   f'for <args> are real and correct according to <abilities>!',
+            # the ability catalog stays the same across the steps of a run, per-step fields come last
+            "abilities": abilities_dict,
+            "user_request": request,
+            "history": history,
+            "latest_progress": latest_progress
         }
+        if self.__multi_action:
+            prompt_dict["instructions_you_must_follow_step_by_step"][3]["second_action"] = (
+                "Choose and provide the abilities according to your next move, "
+                "you may choose several abilities at once only if none of them depends on "
+                "the result of another (they will be performed at the same time)")
+            prompt_dict["instructions_you_must_follow_step_by_step"][3]["third_action"] = (
+                "After you have chosen the abilities as next move, "
+                "generate arguments for each ability(function) to achieve <next move>, "
+                "before you generate arguments, explain why you give these arguments briefly.")
+            prompt_dict["output_format"] = ("{step1_thought_process}\n{step2_thought_process}\n"
+                                            "{step3_thought_process}\n{step4_thought_process}\n"
+                                            "{step5_thought_process}\n{step6_thought_process}\n"
+                                            f"{SEPARATOR}\n"
+                                            'args:{"{name_of_param_1}":{value_for_param_1}}\n'
+                                            'ability:[ability_1.name]\n'
+                                            'args:{"{name_of_param_1}":{value_for_param_1}}\n'
+                                            'ability:[ability_{n}.name]\n'
+                                            f'{END}')
+            prompt_dict["limitation_for_args_output_format"] = (
+                f'The "{SEPARATOR}" pattern should be after '
+                f'all the thought processes and before the <args and ability> pairs.'
+                f'The <args and ability> pairs should be after the "{SEPARATOR}" pattern.'
+                'Each <args> should be formatted as json and followed by its ability.')
+            prompt_dict["output_example"] = MULTI_ACTION_OUTPUT_EXAMPLE
+            prompt_dict["limitation_1_for_ability_choosing"] = (
+                "Several abilities can be chosen only if they are independent of each other, "
+                f'"{MISSION_COMPLETE}" and "{MISSION_FAILED}" must be chosen alone.')
         prompt = json.dumps(prompt_dict, ensure_ascii=False)
         super().__init__(prompt, ext_context)
+        if tool_calling:
+            # the text prompt is kept as a fallback for models without native tool calling
+            self.__tools = self.__build_tools()
+            self.__tool_prompt = Prompt.construct_prompt(
+                json.dumps(self.__tool_calling_prompt_dict(prompt_dict), ensure_ascii=False), ext_context)
         log.debug(f'NextMovePrompt: {self.prompt}')
 
-    # noinspection PyUnusedLocal,DuplicatedCode
-    def invoke(self, model: BaseChatModel, max_retry: int = 6) -> tuple[Ability, dict] | bool:
-        result: str = str()
+    def __build_tools(self) -> list[dict]:
+        tools = list()
+        for special_name, special_description in ((MISSION_COMPLETE, 'To be chosen only when mission is completed.'),
+                                                  (MISSION_FAILED, 'To be chosen only when mission is failed.')):
+            self.__tool_names[special_name] = special_name
+            tools.append({
+                'type': 'function',
+                'function': {
+                    'name': special_name,
+                    'description': special_description,
+                    'parameters': {'type': 'object', 'properties': {}, 'required': []}
+                }
+            })
+        for ability in self.abilities:
+            tool_name = self.__tool_name(ability.name)
+            self.__tool_names[tool_name] = ability.name
+            tools.append(ability.to_tool(name=tool_name))
+        return tools
+
+    def __tool_name(self, ability_name: str) -> str:
+        # providers only accept [a-zA-Z0-9_-]{1,64} as function names
+        tool_name = re.sub(r'[^a-zA-Z0-9_-]', '_', ability_name)
+        if (tool_name != ability_name or len(tool_name) > MAX_TOOL_NAME_LENGTH
+                or tool_name in self.__tool_names.keys()):
+            __suffix = hashlib.md5(ability_name.encode('utf-8')).hexdigest()[:8]
+            tool_name = f'{tool_name[:MAX_TOOL_NAME_LENGTH - len(__suffix) - 1]}_{__suffix}'
+        return tool_name
+
+    @staticmethod
+    def __tool_calling_prompt_dict(prompt_dict: dict) -> dict:
+        prompt_dict = copy.deepcopy(prompt_dict)
+        for key in ('output_example', 'hint_for_output', 'limitation_for_thought_process_output',
+                    'limitation_for_args_output_format', 'limitation_for_ability_output_format',
+                    'hint_for_separation_pattern', 'hint_for_end_pattern'):
+            prompt_dict.pop(key, None)
+        steps = prompt_dict["instructions_you_must_follow_step_by_step"]
+        steps[3]["third_action"] = ("After you have chosen the ability as next move, "
+                                    "call it as a tool with the arguments that achieve <next move>.")
+        steps[4]["action"] = f'Call the special tool "{MISSION_FAILED}" (which is not a real ability) without arguments.'
+        steps[5]["action"] = (f'Call the special tool "{MISSION_COMPLETE}" (which is not a real ability) '
+                              'without arguments.')
+        prompt_dict["abilities"] = 'Your abilities are provided to you as tools.'
+        prompt_dict["limitation_2_for_ability_choosing"] = "You can only use the abilities provided as tools."
+        prompt_dict["output_format"] = ("Write down your thought process of steps 1 to 6 briefly, "
+                                        "then make your next move by calling the tool of the chosen ability.")
+        return prompt_dict
+
+    def invoke(self, model: BaseChatModel,
+               max_retry: int = 6) -> tuple[Ability, dict] | list[tuple[Ability, dict]] | bool:
+        if self.__tools is not None:
+            try:
+                moves = self.__parse_tool_calls(self._invoke_tools(model, self.__tool_prompt, self.__tools))
+            except NotImplementedError:
+                log.warning('NextMovePromptWarn: tool calling is not supported by the model, falls back to text.')
+                moves = None
+            if moves is not None:
+                return self.__resolve(moves)
+        count: int = 0
+        tmp_prompt = self.prompt
+        while True:
+            self.__check_retry(count, max_retry, model)
+            count += 1
+            result = self._complete(model, tmp_prompt, retry=count - 1)
+            moves, tmp_prompt = self.__parse(result, tmp_prompt, count)
+            if moves is not None:
+                return self.__resolve(moves)
+
+    async def ainvoke(self, model: BaseChatModel,
+                      max_retry: int = 6) -> tuple[Ability, dict] | list[tuple[Ability, dict]] | bool:
+        if self.__tools is not None:
+            try:
+                moves = self.__parse_tool_calls(await self._ainvoke_tools(model, self.__tool_prompt, self.__tools))
+            except NotImplementedError:
+                log.warning('NextMovePromptWarn: tool calling is not supported by the model, falls back to text.')
+                moves = None
+            if moves is not None:
+                return self.__resolve(moves)
         count: int = 0
-        exclamation = '!'
         tmp_prompt = self.prompt
         while True:
-            # noinspection DuplicatedCode
-            if count > 0:
-                if count <= max_retry:
-                    log.warning(f'NextMovePromptWarn: incorrectly formatted. Retry: {count}')
-                else:
-                    log.warning(f'NextMovePromptWarn: max retry exceeded.')
-                    raise TooDumbException(model)
+            self.__check_retry(count, max_retry, model)
             count += 1
-            result = model.invoke(tmp_prompt).content
-            log.debug(f"Next move thought process: \n{result}")
-            _accurate_action_str = result[result.rfind(SEPARATOR) + len(SEPARATOR):result.rfind(END)]
-            if (result.count(SEPARATOR) == 1
-                    and result.count(END) == 1
-                    and _accurate_action_str.count('ability:') == 1
-                    and _accurate_action_str.count('args:') == 1):
-                tmp_prompt_dict = None
-                if isinstance(tmp_prompt, str):
-                    tmp_prompt_dict = json.loads(tmp_prompt)
-                tmp_prompt_dict_prompt_str = json.dumps(tmp_prompt_dict.get('prompt'), ensure_ascii=False)
-                __additional_prompt = tmp_prompt_dict.get('additional_prompt', '')
-                if len(__additional_prompt) > 0:
-                    __additional_prompt += f"\n{'-' * 5}\n"
-                tmp_prompt_dict_prompt_str += f"{__additional_prompt}"
-                result = _accurate_action_str
-                args = json.loads(result[result.find('{'):result.rfind('}') + 1].strip())
-                result = result[result.rfind('}') + 1:]
-                ability_name: str = result[result.find('['):result.rfind(']') + 1].strip()[1:-1]
+            result = await self._acomplete(model, tmp_prompt, retry=count - 1)
+            moves, tmp_prompt = self.__parse(result, tmp_prompt, count)
+            if moves is not None:
+                return self.__resolve(moves)
+
+    @override
+    def _check_partial(self, partial: str) -> int:
+        if END in partial:
+            return PARTIAL_DONE
+        # only what the full parse would reject anyway
+        if partial.count(SEPARATOR) > 1:
+            return PARTIAL_MALFORMED
+        if (not self.__multi_action and SEPARATOR in partial
+                and partial[partial.find(SEPARATOR):].count('ability:') > 1):
+            return PARTIAL_MALFORMED
+        return PARTIAL_OK
+
+    @staticmethod
+    def __check_retry(count: int, max_retry: int, model: BaseChatModel):
+        # noinspection DuplicatedCode
+        if count > 0:
+            if count <= max_retry:
+                log.warning(f'NextMovePromptWarn: incorrectly formatted. Retry: {count}')
+            else:
+                log.warning(f'NextMovePromptWarn: max retry exceeded.')
+                raise TooDumbException(model)
+
+    @staticmethod
+    def __split_moves(action_str: str) -> list[tuple[str, dict]]:
+        moves = list()
+        while action_str.count('ability:') > 0:
+            _head = action_str[:action_str.find('ability:')]
+            _tail = action_str[action_str.find('ability:') + len('ability:'):]
+            _args_str = _head[_head.find('args:') + len('args:'):]
+            args = json.loads(_args_str[_args_str.find('{'):_args_str.rfind('}') + 1].strip())
+            ability_name: str = _tail[_tail.find('['):_tail.find(']') + 1].strip()[1:-1]
+            moves.append((ability_name, args))
+            action_str = _tail[_tail.find(']') + 1:]
+        return moves
+
+    # noinspection DuplicatedCode
+    def __parse(self, result: str, tmp_prompt: str, count: int) -> tuple[list[tuple[str, dict]] | None, str]:
+        exclamation = '!'
+        log.debug(f"Next move thought process: \n{result}")
+        _accurate_action_str = result[result.rfind(SEPARATOR) + len(SEPARATOR):result.rfind(END)]
+        _move_count = _accurate_action_str.count('ability:')
+        if (result.count(SEPARATOR) == 1
+                and result.count(END) == 1
+                and _accurate_action_str.count('args:') == _move_count
+                and (_move_count == 1 or (self.__multi_action and _move_count > 1))):
+            tmp_prompt_dict = json.loads(tmp_prompt)
+            tmp_prompt_dict_prompt_str = json.dumps(tmp_prompt_dict.get('prompt'), ensure_ascii=False)
+            __additional_prompt = tmp_prompt_dict.get('additional_prompt', '')
+            if len(__additional_prompt) > 0:
+                __additional_prompt += f"\n{'-' * 5}\n"
+            tmp_prompt_dict_prompt_str += f"{__additional_prompt}"
+            moves = self.__split_moves(_accurate_action_str)
+            _agentic_ability_names = list()
+            for ability_name, args in moves:
                 if ability_name not in self.__ability_names:
                     tmp_prompt = (f'{tmp_prompt_dict_prompt_str}There is no ability called "{ability_name}", '
                                   f'These abilities are available for you to choose: {self.__ability_names}.')
-                    tmp_prompt = Prompt.construct_prompt(tmp_prompt, '')
-                    continue
+                    return None, Prompt.construct_prompt(tmp_prompt, '')
+                if len(moves) > 1 and (MISSION_COMPLETE in ability_name or MISSION_FAILED in ability_name):
+                    tmp_prompt = (f'{tmp_prompt_dict_prompt_str}"{MISSION_COMPLETE}" and "{MISSION_FAILED}" '
+                                  f'must be chosen alone, without any other ability.')
+                    return None, Prompt.construct_prompt(tmp_prompt, '')
+                if ability_name.startswith(AGENTIC_ABILITY_PREFIX):
+                    if ability_name in _agentic_ability_names:
+                        tmp_prompt = (f'{tmp_prompt_dict_prompt_str}The ability called "{ability_name}" '
+                                      f'can only be chosen once at a time.')
+                        return None, Prompt.construct_prompt(tmp_prompt, '')
+                    _agentic_ability_names.append(ability_name)
                 if (ability_name.startswith(AGENTIC_ABILITY_PREFIX)
                         or MISSION_COMPLETE in ability_name
                         or MISSION_FAILED in ability_name):
-                    break
+                    continue
                 _ability = None
-                _wrong_param = False
                 _wrong_param_names = list()
                 for ability in self.abilities:
                     if ability.name == ability_name:
@@ -213,23 +397,62 @@ class NextMovePrompt(Prompt):
                 if _ability is not None:
                     for _k in args.keys():
                         if _k not in _ability.parameters.keys():
-                            _wrong_param = True
                             _wrong_param_names.append(_k)
-                if not _wrong_param:
-                    break
-                else:
+                if len(_wrong_param_names) > 0:
                     tmp_prompt = (f'{tmp_prompt_dict_prompt_str}For ability called "{ability_name}", '
                                   f'these parameter_names are incorrect: {_wrong_param_names}, '
                                   f"correct parameter_names: {_ability.to_dict().get('parameters_required', [])};")
-                    tmp_prompt = Prompt.construct_prompt(tmp_prompt, '')
-                    continue
-            tmp_prompt = (f'{self.prompt}Attention_{count}: '
-                          f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
-                          f'You should refer to example in <output_example>{count * 2 * exclamation}')
-            tmp_prompt = Prompt.construct_prompt(tmp_prompt, '')
-        if ability_name.__contains__(MISSION_COMPLETE):
+                    return None, Prompt.construct_prompt(tmp_prompt, '')
+            return moves, tmp_prompt
+        tmp_prompt = (f'{self.prompt}Attention_{count}: '
+                      f'You must strictly follow the format in <output_format>{count * 2 * exclamation} '
+                      f'You should refer to example in <output_example>{count * 2 * exclamation}')
+        return None, Prompt.construct_prompt(tmp_prompt, '')
+
+    def __parse_tool_calls(self, tool_calls: list[dict]) -> list[tuple[str, dict]] | None:
+        moves = list()
+        for tool_call in tool_calls:
+            ability_name = self.__tool_names.get(tool_call.get('name', ''), None)
+            if ability_name is None:
+                log.warning(f'NextMovePromptWarn: unknown tool "{tool_call.get("name")}" ignored.')
+                continue
+            args = tool_call.get('args', None)
+            moves.append((ability_name, args if isinstance(args, dict) else dict()))
+        if len(moves) < 1:
+            return None
+        # "-mission-complete-" and "-mission-failed-" only count when chosen alone
+        actions = [move for move in moves if move[0] not in (MISSION_COMPLETE, MISSION_FAILED)]
+        if len(actions) < 1:
+            return moves[:1]
+        if not self.__multi_action:
+            actions = actions[:1]
+        resolved, _agentic_ability_names = list(), set()
+        for ability_name, args in actions:
+            if ability_name.startswith(AGENTIC_ABILITY_PREFIX):
+                if ability_name not in _agentic_ability_names:
+                    _agentic_ability_names.add(ability_name)
+                    resolved.append((ability_name, args))
+                continue
+            for ability in self.abilities:
+                if ability.name == ability_name:
+                    # schema-constrained output rarely gets names wrong, drop them rather than retry
+                    resolved.append((ability_name, {k: v for k, v in args.items() if k in ability.parameters.keys()}))
+                    break
+        return resolved if len(resolved) > 0 else None
+
+    def __resolve(self, moves: list[tuple[str, dict]]) -> tuple[Ability, dict] | list[tuple[Ability, dict]] | bool:
+        if moves[0][0].__contains__(MISSION_COMPLETE):
             return True
-        for ability in self.abilities:
-            if ability.name == ability_name:
-                return ability, args
-        return False
+        if moves[0][0].__contains__(MISSION_FAILED):
+            return False
+        resolved = list()
+        for ability_name, args in moves:
+            for ability in self.abilities:
+                if ability.name == ability_name:
+                    resolved.append((ability, args))
+                    break
+        if len(resolved) < 1:
+            return False
+        if self.__multi_action:
+            return resolved
+        return resolved[0]
@@ -2,12 +2,40 @@ import abc
 import datetime
 import hashlib
 import json
+import logging
 import random
+import time
+from collections.abc import Callable
 
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+from ceo.cache.response_cache import ResponseCache
+from ceo.deadline.run_deadline import deadline_exceeded
+from ceo.exception.deadline_exceeded_exception import DeadlineExceededException
+from ceo.profile.run_profile import current_profile
+
+log = logging.getLogger('ceo.prompt')
+
+# results of Prompt._check_partial, while a response is being streamed
+PARTIAL_OK = 0
+PARTIAL_DONE = 1
+PARTIAL_MALFORMED = 2
+# finish reasons providers report when a stop sequence ended the response, rather than the token limit
+# finish reasons which some providers (OpenAI, Ollama, Gemini) report both for a stop sequence and a natural end
+AMBIGUOUS_STOP_REASONS = ('stop', 'STOP')
 
 
 class Prompt:
+    _deterministic: bool = False
+    _cache: ResponseCache | None = None
+    _use_stop_sequences: bool = True
+    _incremental_parse: bool = False
+    # terminal markers of the output format, sent as stop sequences
+    _stop_sequences: tuple[str, ...] = tuple()
+    # llm types which do not tell a stop sequence from a natural end, they are sent no stop sequences
+    _unsignalled_stop: set[str] = set()
+
     def __init__(self, prompt: str, ext_context: str = ''):
         self.prompt = Prompt.construct_prompt(prompt, ext_context)
         self.ext_context = ext_context
@@ -16,22 +44,348 @@ class Prompt:
     def invoke(self, model: BaseChatModel):
         pass
 
+    @abc.abstractmethod
+    async def ainvoke(self, model: BaseChatModel):
+        pass
+
+    @staticmethod
+    def set_deterministic(deterministic: bool = True):
+        Prompt._deterministic = deterministic
+
+    @staticmethod
+    def deterministic() -> bool:
+        return Prompt._deterministic
+
+    @staticmethod
+    def set_cache(cache: ResponseCache | None):
+        Prompt._cache = cache
+
+    @staticmethod
+    def cache() -> ResponseCache | None:
+        return Prompt._cache
+
+    @staticmethod
+    def set_stop_sequences(enabled: bool = True):
+        Prompt._use_stop_sequences = enabled
+
+    @staticmethod
+    def stop_sequences() -> bool:
+        return Prompt._use_stop_sequences
+
+    @staticmethod
+    def set_incremental_parse(enabled: bool = True):
+        Prompt._incremental_parse = enabled
+
+    @staticmethod
+    def incremental_parse() -> bool:
+        return Prompt._incremental_parse
+
+    def _check_partial(self, partial: str) -> int:
+        # overridden by marker-terminated prompts to end or abort a streamed response early
+        return PARTIAL_OK
+
+    def __stop(self, model: BaseChatModel) -> list[str] | None:
+        if (Prompt._use_stop_sequences and len(self._stop_sequences) > 0
+                and Prompt.__llm_type(model) not in Prompt._unsignalled_stop):
+            return list(self._stop_sequences)
+        return None
+
+    def __before_call(self, model: BaseChatModel) -> list[str] | None:
+        # a call left behind by call_before_deadline would otherwise keep retrying after its run has given up
+        if deadline_exceeded():
+            raise DeadlineExceededException()
+        return self.__stop(model)
+
+    def __finish(self, model: BaseChatModel, resp: str, stop: list[str] | None, message: BaseMessage | None) -> str:
+        # drop anything after the terminal marker, and put it back if a stop sequence cut it off
+        for marker in self._stop_sequences:
+            if marker in resp:
+                return resp[:resp.find(marker) + len(marker)]
+        if stop is None:
+            return resp
+        if Prompt.__stopped_by_sequence(message, stop):
+            return resp + stop[0]
+        if Prompt.__finish_reason(message) in AMBIGUOUS_STOP_REASONS:
+            # a natural end without the marker can not be told apart, so the marker is left to the model from now on
+            log.debug(f'Prompt: stop sequences are not sent to "{Prompt.__llm_type(model)}" from now on.')
+            Prompt._unsignalled_stop.add(Prompt.__llm_type(model))
+        # left incomplete, the prompt retries
+        return resp
+
+    @staticmethod
+    def __llm_type(model: BaseChatModel) -> str:
+        return getattr(model, '_llm_type', type(model).__name__)
+
+    @staticmethod
+    def __stopped_by_sequence(message: BaseMessage | None, stop: list[str]) -> bool:
+        # only an explicit signal counts, e.g. stop_reason 'stop_sequence' and the sequence itself from Anthropic
+        metadata = getattr(message, 'response_metadata', None) or dict()
+        if metadata.get('stop_sequence', None) in stop:
+            return True
+        return 'stop_sequence' in (metadata.get('stop_reason', None), metadata.get('finish_reason', None))
+
+    @staticmethod
+    def __finish_reason(message: BaseMessage | None) -> str | None:
+        metadata = getattr(message, 'response_metadata', None) or dict()
+        for key in ('finish_reason', 'stop_reason', 'done_reason'):
+            reason = metadata.get(key, None)
+            if reason is not None:
+                return str(reason)
+        return None
+
+    def _complete(self, model: BaseChatModel, prompt: str, retry: int = 0,
+                  on_chunk: Callable[[str], any] | None = None) -> str:
+        if on_chunk is not None or (Prompt._incremental_parse and len(self._stop_sequences) > 0):
+            return self._stream_model(model, prompt, on_chunk=on_chunk, retry=retry)
+        return self._invoke_model(model, prompt, retry=retry)
+
+    async def _acomplete(self, model: BaseChatModel, prompt: str, retry: int = 0,
+                         on_chunk: Callable[[str], any] | None = None) -> str:
+        if on_chunk is not None or (Prompt._incremental_parse and len(self._stop_sequences) > 0):
+            return await self._astream_model(model, prompt, on_chunk=on_chunk, retry=retry)
+        return await self._ainvoke_model(model, prompt, retry=retry)
+
+    def _invoke_model(self, model: BaseChatModel, prompt: str, retry: int = 0) -> str:
+        __start_time = time.perf_counter()
+        cache = Prompt._cache
+        if cache is not None:
+            cached = cache.lookup(model, prompt)
+            if cached is not None:
+                log.debug(f'PromptCacheHit: {prompt[:64]}...')
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return cached
+        stop = self.__before_call(model)
+        message = model.invoke(prompt, stop=stop)
+        resp = message.content
+        if len(self._stop_sequences) > 0:
+            resp = self.__finish(model, resp, stop, message)
+        if cache is not None:
+            cache.update(model, prompt, resp)
+        self.__record(prompt, resp, retry, __start_time, message=message)
+        return resp
+
+    async def _ainvoke_model(self, model: BaseChatModel, prompt: str, retry: int = 0) -> str:
+        __start_time = time.perf_counter()
+        cache = Prompt._cache
+        if cache is not None:
+            cached = cache.lookup(model, prompt)
+            if cached is not None:
+                log.debug(f'PromptCacheHit: {prompt[:64]}...')
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return cached
+        stop = self.__before_call(model)
+        message = await model.ainvoke(prompt, stop=stop)
+        resp = message.content
+        if len(self._stop_sequences) > 0:
+            resp = self.__finish(model, resp, stop, message)
+        if cache is not None:
+            cache.update(model, prompt, resp)
+        self.__record(prompt, resp, retry, __start_time, message=message)
+        return resp
+
+    @staticmethod
+    def _batch_model(model: BaseChatModel, prompts: list['Prompt'], max_concurrency: int | None = None) -> list[str]:
+        # prompts of a batch are of one class, and share its stop sequences
+        __start_time = time.perf_counter()
+        responses, missed = Prompt.__lookup_batch(model, prompts, __start_time)
+        if len(missed) > 0:
+            stop = prompts[missed[0]].__before_call(model)
+            messages = model.batch([prompts[i].prompt for i in missed],
+                                   config={'max_concurrency': max_concurrency}, stop=stop)
+            Prompt.__update_batch(model, prompts, responses, missed, messages, stop, __start_time)
+        return responses
+
+    @staticmethod
+    async def _abatch_model(model: BaseChatModel, prompts: list['Prompt'],
+                            max_concurrency: int | None = None) -> list[str]:
+        __start_time = time.perf_counter()
+        responses, missed = Prompt.__lookup_batch(model, prompts, __start_time)
+        if len(missed) > 0:
+            stop = prompts[missed[0]].__before_call(model)
+            messages = await model.abatch([prompts[i].prompt for i in missed],
+                                          config={'max_concurrency': max_concurrency}, stop=stop)
+            Prompt.__update_batch(model, prompts, responses, missed, messages, stop, __start_time)
+        return responses
+
+    @staticmethod
+    def __lookup_batch(model: BaseChatModel, prompts: list['Prompt'], start_time: float) -> tuple[list, list[int]]:
+        responses, missed = [None] * len(prompts), list()
+        cache = Prompt._cache
+        for i, prompt in enumerate(prompts):
+            cached = cache.lookup(model, prompt.prompt) if cache is not None else None
+            if cached is not None:
+                responses[i] = cached
+                prompt.__record(prompt.prompt, cached, 0, start_time, cached=True)
+            else:
+                missed.append(i)
+        return responses, missed
+
+    @staticmethod
+    def __update_batch(model: BaseChatModel, prompts: list['Prompt'], responses: list, missed: list[int],
+                       messages: list[BaseMessage], stop: list[str] | None, start_time: float):
+        cache = Prompt._cache
+        for i, message in zip(missed, messages):
+            prompt, resp = prompts[i], message.content
+            if len(prompt._stop_sequences) > 0:
+                resp = prompt.__finish(model, resp, stop, message)
+            responses[i] = resp
+            if cache is not None:
+                cache.update(model, prompt.prompt, resp)
+            prompt.__record(prompt.prompt, resp, 0, start_time, message=message)
+
+    def _invoke_tools(self, model: BaseChatModel, prompt: str, tools: list[dict], retry: int = 0) -> list[dict]:
+        __start_time = time.perf_counter()
+        cache, tools_hash = Prompt._cache, Prompt.__tools_hash(tools)
+        if cache is not None:
+            cached = cache.lookup(model, prompt, tools=tools_hash)
+            if cached is not None:
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return json.loads(cached)
+        self.__before_call(model)
+        message = Prompt.__bind_tools(model, tools).invoke(prompt)
+        tool_calls = [{'name': call['name'], 'args': call['args']} for call in message.tool_calls]
+        resp = json.dumps(tool_calls, ensure_ascii=False)
+        if cache is not None:
+            cache.update(model, prompt, resp, tools=tools_hash)
+        self.__record(prompt, resp, retry, __start_time, message=message)
+        return tool_calls
+
+    async def _ainvoke_tools(self, model: BaseChatModel, prompt: str,
+                             tools: list[dict], retry: int = 0) -> list[dict]:
+        __start_time = time.perf_counter()
+        cache, tools_hash = Prompt._cache, Prompt.__tools_hash(tools)
+        if cache is not None:
+            cached = cache.lookup(model, prompt, tools=tools_hash)
+            if cached is not None:
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return json.loads(cached)
+        self.__before_call(model)
+        message = await Prompt.__bind_tools(model, tools).ainvoke(prompt)
+        tool_calls = [{'name': call['name'], 'args': call['args']} for call in message.tool_calls]
+        resp = json.dumps(tool_calls, ensure_ascii=False)
+        if cache is not None:
+            cache.update(model, prompt, resp, tools=tools_hash)
+        self.__record(prompt, resp, retry, __start_time, message=message)
+        return tool_calls
+
+    @staticmethod
+    def __bind_tools(model: BaseChatModel, tools: list[dict]):
+        # raises NotImplementedError for models without native tool calling
+        try:
+            return model.bind_tools(tools, tool_choice='any')
+        except (TypeError, ValueError):
+            # the provider can not force a tool call, the prompt asks for one anyway
+            return model.bind_tools(tools)
+
+    @staticmethod
+    def __tools_hash(tools: list[dict]) -> str:
+        return hashlib.md5(json.dumps(tools, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _stream_model(self, model: BaseChatModel, prompt: str,
+                      on_chunk: Callable[[str], any] | None = None, retry: int = 0) -> str:
+        __start_time = time.perf_counter()
+        cache = Prompt._cache
+        if cache is not None:
+            cached = cache.lookup(model, prompt)
+            if cached is not None:
+                if on_chunk is not None:
+                    on_chunk(cached)
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return cached
+        stop, message, status = self.__before_call(model), None, PARTIAL_OK
+        stream = model.stream(prompt, stop=stop)
+        try:
+            for chunk in stream:
+                message = chunk if message is None else message + chunk
+                status = self.__on_chunk(chunk, message, on_chunk)
+                if status != PARTIAL_OK:
+                    break
+        finally:
+            # closing the generator aborts the request when the response is ended early
+            stream.close()
+        return self.__streamed(model, prompt, message, status, stop, retry, __start_time)
+
+    async def _astream_model(self, model: BaseChatModel, prompt: str,
+                             on_chunk: Callable[[str], any] | None = None, retry: int = 0) -> str:
+        __start_time = time.perf_counter()
+        cache = Prompt._cache
+        if cache is not None:
+            cached = cache.lookup(model, prompt)
+            if cached is not None:
+                if on_chunk is not None:
+                    on_chunk(cached)
+                self.__record(prompt, cached, retry, __start_time, cached=True)
+                return cached
+        stop, message, status = self.__before_call(model), None, PARTIAL_OK
+        stream = model.astream(prompt, stop=stop)
+        try:
+            async for chunk in stream:
+                message = chunk if message is None else message + chunk
+                status = self.__on_chunk(chunk, message, on_chunk)
+                if status != PARTIAL_OK:
+                    break
+        finally:
+            await stream.aclose()
+        return self.__streamed(model, prompt, message, status, stop, retry, __start_time)
+
+    def __on_chunk(self, chunk: BaseMessage, message: BaseMessage, on_chunk: Callable[[str], any] | None) -> int:
+        if not isinstance(chunk.content, str) or len(chunk.content) < 1:
+            return PARTIAL_OK
+        if on_chunk is not None:
+            on_chunk(chunk.content)
+        if Prompt._incremental_parse:
+            return self._check_partial(message.content)
+        return PARTIAL_OK
+
+    def __streamed(self, model: BaseChatModel, prompt: str, message: BaseMessage | None, status: int,
+                   stop: list[str] | None, retry: int, start_time: float) -> str:
+        resp = message.content if message is not None else str()
+        if status == PARTIAL_MALFORMED:
+            log.debug(f'{self.__class__.__name__}: malformed response aborted early.')
+        elif len(self._stop_sequences) > 0:
+            resp = self.__finish(model, resp, stop, message)
+        if Prompt._cache is not None and status != PARTIAL_MALFORMED:
+            Prompt._cache.update(model, prompt, resp)
+        self.__record(prompt, resp, retry, start_time, message=message)
+        return resp
+
+    def __record(self, prompt: str, resp: str, retry: int, start_time: float,
+                 message: BaseMessage | None = None, cached: bool = False):
+        profile = current_profile()
+        if profile is not None:
+            profile.record_llm_call(
+                prompt_class=self.__class__.__name__,
+                retry=retry,
+                prompt=prompt,
+                response=resp,
+                time_used=time.perf_counter() - start_time,
+                message=message,
+                cached=cached
+            )
+
     @staticmethod
     def construct_prompt(prompt: str, ext_context: str) -> str:
-        __now = datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f')
-        __hash = hashlib.md5(f'{prompt}{__now}{random.uniform(0, 10 ** 3)}'.encode('utf-8')).hexdigest()
-        __misc = {
-            "__current_timestamp": __now,
-            "__prompt_id": __hash,
-        }
+        if Prompt._deterministic:
+            __misc = {
+                "__prompt_id": hashlib.md5(f'{prompt}{ext_context}'.encode('utf-8')).hexdigest()
+            }
+        else:
+            __now = datetime.datetime.now().strftime('%m/%d/%Y %H:%M:%S.%f')
+            __hash = hashlib.md5(f'{prompt}{__now}{random.uniform(0, 10 ** 3)}'.encode('utf-8')).hexdigest()
+            __misc = {
+                "__current_timestamp": __now,
+                "__prompt_id": __hash,
+            }
         prompt_json_part = prompt[prompt.find('{'):prompt.rfind('}') + 1]
+        # static content first and per-call fields last, so consecutive prompts share a byte-identical
+        # prefix that provider-side prompt caches and local KV caches can reuse
         __prompt_dict = {
-            '__misc': __misc,
             'prompt': json.loads(prompt_json_part)
         }
+        if len(ext_context) > 0:
+            __prompt_dict['__ext_context'] = ext_context
         prompt_addition = prompt[prompt.rfind('}') + 1:]
         if len(prompt_addition) > 0:
             __prompt_dict['additional_prompt'] = prompt_addition
-        if len(ext_context) > 0:
-            __prompt_dict['__ext_context'] = ext_context
+        __prompt_dict['__misc'] = __misc
         return json.dumps(__prompt_dict, ensure_ascii=False)
@@ -12,7 +12,6 @@ class RequestResolverPrompt(Prompt):
     def __init__(self, request: str, ext_context: str = ''):
         prompt = json.dumps({
             "precondition": 'There is a user request shown below at <user_request>',
-            "user_request": request,
             "task": "What you need to do is to tell user's intention based on <user_request>.",
             "additional_important": "For any details mentioned in <user_request>, you should preserve them in full, "
                                     "especially specific information with accuracy requirements "
@@ -34,7 +33,8 @@ class RequestResolverPrompt(Prompt):
                 "step_2": "(After: door opened) Go into the room",
                 "step_3": "(After: walked in the room) Find the toys in the room",
                 "step_...": "(After: found toys)..."
-            }
+            },
+            "user_request": request
         }, ensure_ascii=False)
         self.__request = request
         super().__init__(prompt, ext_context)
@@ -44,6 +44,14 @@ class RequestResolverPrompt(Prompt):
         _dont_do_anything = "Don't do anything."
         if self.__request == '':
             return _dont_do_anything, _dont_do_anything
-        user_request_by_step = model.invoke(self.prompt).content
+        user_request_by_step = self._invoke_model(model, self.prompt)
+        log.debug(f'RequestResolverResponse: {user_request_by_step}')
+        return self.__request, user_request_by_step
+
+    async def ainvoke(self, model: BaseChatModel) -> tuple[str, str]:
+        _dont_do_anything = "Don't do anything."
+        if self.__request == '':
+            return _dont_do_anything, _dont_do_anything
+        user_request_by_step = await self._ainvoke_model(model, self.prompt)
         log.debug(f'RequestResolverResponse: {user_request_by_step}')
         return self.__request, user_request_by_step
@@ -2,9 +2,10 @@ import json
 import logging
 
 from langchain_core.language_models import BaseChatModel
+from typing_extensions import override
 
 from ceo.ability.ability import Ability
-from ceo.prompt.prompt import Prompt
+from ceo.prompt.prompt import Prompt, PARTIAL_OK, PARTIAL_DONE
 
 log = logging.getLogger('ceo.prompt')
 
@@ -12,6 +13,8 @@ END = '--END--'
 
 
 class SchedulerPrompt(Prompt):
+    _stop_sequences = (END,)
+
     def __init__(self, request: str, abilities: list[Ability], ext_context: str = ''):
         self.abilities = abilities
         prompt = dict()
@@ -36,14 +39,12 @@ class SchedulerPrompt(Prompt):
             "precondition": "In <abilities> are the abilities you have. "
                             f'And there is a <user_request>.',
             "limitation": "You can only use abilities in <abilities>.",
-            "user_request": request,
             "task": "What you need to do is to plan your workflow based on the <abilities> and <user_request>.",
             "description": "<user_request> might contains many steps, "
                            "think carefully about every step and plan your workflow "
                            "based on your abilities in <abilities>.",
             "hint_for_ability_choosing": "Some of the abilities may be irrelevant to <user_request>. "
                                          "Make sure to choose abilities properly and wisely.",
-            "abilities": prompt,
             "output_format": "{thinking_process}\n"
                              "schedule:{schedule_as_a_list_of_ability_names}\n"
                              f"{END}",
@@ -66,13 +67,24 @@ class SchedulerPrompt(Prompt):
             "limitation_for_end_pattern": f'The "{END}" pattern marks the end of your whole response, '
                                           f'no more words are allowed after "{END}" pattern. '
                                           f'The "{END}" pattern is absolutely important, do not forget to place it '
-                                          'in the end of your response.'
+                                          'in the end of your response.',
+            "abilities": prompt,
+            "user_request": request
         }, ensure_ascii=False)
         super().__init__(prompt, ext_context)
         log.debug(f'SchedulerPrompt: {self.prompt}')
 
     def invoke(self, model: BaseChatModel) -> list[Ability]:
-        results = model.invoke(self.prompt).content
+        return self.__parse(self._complete(model, self.prompt))
+
+    async def ainvoke(self, model: BaseChatModel) -> list[Ability]:
+        return self.__parse(await self._acomplete(model, self.prompt))
+
+    @override
+    def _check_partial(self, partial: str) -> int:
+        return PARTIAL_DONE if END in partial else PARTIAL_OK
+
+    def __parse(self, results: str) -> list[Ability]:
         log.debug(f'SchedulerResponse: {results}')
         results = results[results.rfind('['):results.rfind(']') + 1][1:-1].split(',')
         results = [result
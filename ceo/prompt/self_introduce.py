@@ -1,6 +1,6 @@
 import json
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterator, AsyncIterator
 
 from langchain_core.language_models import BaseChatModel
 
@@ -37,6 +37,13 @@ class SelfIntroducePrompt(Prompt):
     def invoke(self, model: BaseChatModel, stream: bool = False) -> str | Iterator:
         if stream:
             return model.stream(self.prompt)
-        resp = model.invoke(self.prompt).content
+        resp = self._invoke_model(model, self.prompt)
+        log.debug(f'SelfIntroduceResponse: {resp}')
+        return resp
+
+    async def ainvoke(self, model: BaseChatModel, stream: bool = False) -> str | AsyncIterator:
+        if stream:
+            return model.astream(self.prompt)
+        resp = await self._ainvoke_model(model, self.prompt)
         log.debug(f'SelfIntroduceResponse: {resp}')
         return resp
@@ -0,0 +1,86 @@
+import heapq
+import math
+import re
+from collections.abc import Container, Hashable, Iterable, Mapping
+
+# words, camelCase parts and numbers; every CJK character is a token of its own
+TOKEN_PATTERN = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+|[぀-ヿ㐀-鿿]')
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is', 'it', 'its',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with'
+))
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in (match.lower() for match in TOKEN_PATTERN.findall(text))
+            if token not in STOP_WORDS]
+
+
+def flatten_text(value: any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, Mapping):
+        return ' '.join(f'{key} {flatten_text(v)}' for key, v in value.items())
+    if isinstance(value, Iterable):
+        return ' '.join(flatten_text(v) for v in value)
+    return str(value)
+
+
+class BM25Index:
+    def __init__(self, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self._k1 = k1
+        self._b = b
+        self._postings: dict[str, dict[Hashable, int]] = dict()
+        self._lengths: dict[Hashable, int] = dict()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: Hashable, text: str):
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        for token in tokens:
+            postings = self._postings.setdefault(token, dict())
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+        return self
+
+    def remove(self, doc_id: Hashable):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return self
+        self._total_length -= length
+        for token in list(self._postings.keys()):
+            postings = self._postings[token]
+            if postings.pop(doc_id, None) is not None and len(postings) < 1:
+                del self._postings[token]
+        return self
+
+    def scores(self, query: str, candidates: Container | None = None) -> dict[Hashable, float]:
+        doc_count = len(self._lengths)
+        if doc_count < 1:
+            return dict()
+        avg_length = max(self._total_length / doc_count, 1.0)
+        scores: dict[Hashable, float] = dict()
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token, None)
+            if postings is None:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                norm = self._k1 * (1 - self._b + self._b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self._k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int, candidates: Container | None = None) -> list[tuple[Hashable, float]]:
+        return heapq.nlargest(k, self.scores(query, candidates=candidates).items(), key=lambda item: item[1])
@@ -1,2 +1,2 @@
 from .agentic import agentic
-from .ability import ability
+from .ability import ability, warmup, awarmup
@@ -1,37 +1,64 @@
 import inspect
-import json
 import logging
 import os
+import threading
 from typing import Callable
 
 from langchain_core.language_models import BaseChatModel
 
 from ceo.brain.lm import get_openai_model
+from ceo.ability.ability import EXECUTION_POLICY_ATTR, MEMOIZE_ATTR, PENDING_DOCSTRING_ATTR, TIMEOUT_ATTR
+from ceo.brain.lm.openai import DEFAULT_GPT
+from ceo.cache.docstring_cache import CACHE_ENV, CACHE_FILENAME, DocstringCache, get_docstring_cache, make_docstring_key
+from ceo.enum.ExecutionPolicy import ExecutionPolicy
 from ceo.prompt import DocstringPrompt
 from ceo.exception.class_method_exception import ClassMethodException
 
+DEFAULT_WARMUP_CONCURRENCY = 8
 log = logging.getLogger('ceo.ability')
 
+# functions declared with @ability(lazy=True) whose docstrings are still to be generated,
+# mapped to (brain or None for the default model, callback storing the generated docstring)
+__pending: dict[Callable, tuple[BaseChatModel | None, Callable[[Callable, str], any]]] = dict()
+# functions whose docstrings are being generated, mapped to an event set once they are done or put back
+__generating: dict[Callable, threading.Event] = dict()
+__pending_lock = threading.RLock()
 
-def ability(brain: BaseChatModel, cache: bool = True, cache_dir: str = ''):
+
+def ability(brain: BaseChatModel, cache: bool = True, cache_dir: str = '', lazy: bool = False,
+            execution: ExecutionPolicy | None = None, timeout: float | None = None,
+            memoize: bool = False, ttl: float | None = None, maxsize: int | None = None):
     # noinspection PyShadowingNames
     def docstring_generator(func: Callable, brain: BaseChatModel, cache: bool, cache_dir: str) -> Callable:
-        func.__doc__ = DocstringPrompt(func).invoke(brain)
+        return docstring_setter(func, DocstringPrompt(func).invoke(brain), brain, cache, cache_dir)
+
+    # noinspection PyShadowingNames
+    def docstring_setter(func: Callable, docstring: str, brain: BaseChatModel | str,
+                         cache: bool, cache_dir: str) -> Callable:
+        func.__doc__ = docstring
         log.debug(f'Docstring generated for {func.__name__}. Docstring: "{func.__doc__}"')
         if cache:
-            cache_function(func, cache_dir)
+            cache_function(func, brain, cache_dir)
+        return func
+
+    # noinspection PyShadowingNames
+    def defer(func: Callable, brain: BaseChatModel | None, cache: bool, cache_dir: str) -> Callable:
+        def finish(_func: Callable, docstring: str):
+            docstring_setter(_func, docstring, brain if brain is not None else DEFAULT_GPT, cache, cache_dir)
+
+        with __pending_lock:
+            __pending[func] = (brain, finish)
+        setattr(func, PENDING_DOCSTRING_ATTR, lambda: generate_pending(func))
+        log.debug(f'Docstring generation deferred for {func.__name__}.')
         return func
 
     # noinspection PyShadowingNames
-    def make_cache_filename(func: Callable, cache_dir: str, create_path: bool = False) -> str:
-        func_source_file_long = inspect.getfile(func)
-        func_source_file_short = os.path.basename(func_source_file_long)
-        func_source_file_short = func_source_file_short[:func_source_file_short.rfind('.py')]
-        func_source_path = os.path.dirname(func_source_file_long)
-        cache_path = os.path.join(func_source_path, cache_dir)
-        if create_path and not os.path.exists(cache_path):
-            os.mkdir(cache_path)
-        return os.path.join(cache_path, f'{func_source_file_short}.{func.__name__}.cache')
+    def get_cache(func: Callable, cache_dir: str) -> DocstringCache:
+        # one store per cache dir, unless a global location is configured
+        if os.getenv(CACHE_ENV, None) not in ('', None):
+            return get_docstring_cache()
+        func_source_path = os.path.dirname(inspect.getfile(func))
+        return get_docstring_cache(os.path.join(func_source_path, cache_dir, CACHE_FILENAME))
 
     def get_source(func: Callable) -> str:
         source_lines = inspect.getsourcelines(func)[0]
@@ -42,59 +69,154 @@ def ability(brain: BaseChatModel, cache: bool = True, cache_dir: str = ''):
         return str().join(source_lines)
 
     # noinspection PyShadowingNames
-    def cache_function(func: Callable, cache_dir: str) -> Callable:
-        cache_file = make_cache_filename(func, cache_dir, create_path=True)
-        func_doc = inspect.getdoc(func)
-        try:
-            func_doc = json.loads(func_doc)
-        except json.decoder.JSONDecodeError:
-            pass
-        cache_data: dict = {
-            'src': get_source(func),
-            'doc': func_doc
-        }
-        with open(cache_file, 'wb') as f:
-            cache_data_str = json.dumps(cache_data, ensure_ascii=False)
-            cache_data_bytes = cache_data_str.encode('utf-8')
-            f.write(cache_data_bytes)
+    def cache_function(func: Callable, brain: BaseChatModel | str, cache_dir: str) -> Callable:
+        get_cache(func, cache_dir).set(make_docstring_key(get_source(func), brain), func.__doc__)
         return func
 
     # noinspection PyShadowingNames
-    def read_cache(func: Callable, cache_dir: str) -> dict:
-        cache_file = make_cache_filename(func, cache_dir)
-        cache_data: dict = dict()
-        if not os.path.exists(cache_file):
-            return cache_data
-        with open(cache_file, 'rb') as f:
-            cache_data_bytes = f.read()
-            cache_data = json.loads(cache_data_bytes)
-        return cache_data
+    def read_cache(func: Callable, brain: BaseChatModel | str, cache_dir: str) -> str | None:
+        return get_cache(func, cache_dir).get(make_docstring_key(get_source(func), brain))
 
     def check_if_function_is_method(func: Callable) -> Callable:
         if '.' in func.__qualname__:
             raise ClassMethodException(func)
         return func
 
+    def set_execution_options(func: Callable) -> Callable:
+        if execution is not None:
+            setattr(func, EXECUTION_POLICY_ATTR, execution)
+        if timeout is not None:
+            setattr(func, TIMEOUT_ATTR, timeout)
+        if memoize:
+            setattr(func, MEMOIZE_ATTR, (ttl, maxsize))
+        return func
+
     if cache_dir in ('', None):
         cache_dir = '.cache'
 
     if callable(brain) and not isinstance(brain, BaseChatModel):
         # noinspection DuplicatedCode
         def decorator(func):
-            func = check_if_function_is_method(func)
-            cache_func = read_cache(func, cache_dir)
-            if cache and cache_func.get('src', None) == get_source(func):
-                func.__doc__ = json.dumps(cache_func.get('doc'), ensure_ascii=False)
+            func = set_execution_options(check_if_function_is_method(func))
+            cached_doc = read_cache(func, DEFAULT_GPT, cache_dir) if cache else None
+            if cached_doc is not None:
+                func.__doc__ = cached_doc
                 return func
+            if lazy:
+                return defer(func, None, cache, cache_dir)
             return docstring_generator(func, get_openai_model(), cache, cache_dir)
         return decorator(brain)
 
     # noinspection DuplicatedCode
     def decorator(func):
-        func = check_if_function_is_method(func)
-        cache_func = read_cache(func, cache_dir)
-        if cache and cache_func.get('src', None) == get_source(func):
-            func.__doc__ = json.dumps(cache_func.get('doc'), ensure_ascii=False)
+        func = set_execution_options(check_if_function_is_method(func))
+        cached_doc = read_cache(func, brain, cache_dir) if cache else None
+        if cached_doc is not None:
+            func.__doc__ = cached_doc
             return func
+        if lazy:
+            return defer(func, brain, cache, cache_dir)
         return docstring_generator(func, brain, cache, cache_dir)
     return decorator
+
+
+def pending_abilities() -> list[Callable]:
+    with __pending_lock:
+        return list(__pending.keys())
+
+
+def generate_pending(func: Callable) -> Callable:
+    while True:
+        with __pending_lock:
+            pending = __pending.pop(func, None)
+            if pending is not None:
+                __generating[func] = threading.Event()
+                break
+            generating = __generating.get(func, None)
+            if generating is None:
+                return func
+        # being generated by another caller, which puts it back if it fails
+        generating.wait()
+    brain, finish = pending
+    try:
+        finish(func, DocstringPrompt(func).invoke(brain if brain is not None else get_openai_model()))
+        delattr(func, PENDING_DOCSTRING_ATTR)
+    except BaseException:
+        __restore_pending(brain, [(func, finish)])
+        raise
+    finally:
+        __release([(func, finish)])
+    return func
+
+
+def __take_pending() -> list[tuple[BaseChatModel | None, list[tuple[Callable, Callable]]]]:
+    groups = dict()
+    with __pending_lock:
+        for func, (brain, finish) in __pending.items():
+            groups.setdefault(id(brain), (brain, list()))[1].append((func, finish))
+            __generating[func] = threading.Event()
+        __pending.clear()
+    return list(groups.values())
+
+
+def __restore_pending(brain: BaseChatModel | None, group: list[tuple[Callable, Callable]]):
+    with __pending_lock:
+        for func, finish in group:
+            __pending.setdefault(func, (brain, finish))
+
+
+def __release(group: list[tuple[Callable, Callable]]):
+    with __pending_lock:
+        for func, _ in group:
+            generating = __generating.pop(func, None)
+            if generating is not None:
+                generating.set()
+
+
+def __finish_group(group: list[tuple[Callable, Callable]], docstrings: list[str]):
+    for (func, finish), docstring in zip(group, docstrings):
+        finish(func, docstring)
+        delattr(func, PENDING_DOCSTRING_ATTR)
+
+
+def warmup(max_concurrency: int = DEFAULT_WARMUP_CONCURRENCY) -> int:
+    count = 0
+    # the model is called without the lock held, an ability built meanwhile waits for its own docstring only
+    groups = __take_pending()
+    try:
+        while len(groups) > 0:
+            brain, group = groups[0]
+            prompts = [DocstringPrompt(func) for func, _ in group]
+            docstrings = DocstringPrompt.batch(prompts, brain if brain is not None else get_openai_model(),
+                                               max_concurrency=max_concurrency)
+            __finish_group(group, docstrings)
+            groups.pop(0)
+            __release(group)
+            count += len(group)
+    finally:
+        for brain, group in groups:
+            __restore_pending(brain, group)
+            __release(group)
+    log.debug(f'Docstrings warmed up: {count};')
+    return count
+
+
+async def awarmup(max_concurrency: int = DEFAULT_WARMUP_CONCURRENCY) -> int:
+    count = 0
+    groups = __take_pending()
+    try:
+        while len(groups) > 0:
+            brain, group = groups[0]
+            prompts = [DocstringPrompt(func) for func, _ in group]
+            docstrings = await DocstringPrompt.abatch(prompts, brain if brain is not None else get_openai_model(),
+                                                      max_concurrency=max_concurrency)
+            __finish_group(group, docstrings)
+            groups.pop(0)
+            __release(group)
+            count += len(group)
+    finally:
+        for brain, group in groups:
+            __restore_pending(brain, group)
+            __release(group)
+    log.debug(f'Docstrings warmed up: {count};')
+    return count
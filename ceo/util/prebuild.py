@@ -0,0 +1,37 @@
+import argparse
+import importlib
+import logging
+import os
+import sys
+
+from ceo.cache.docstring_cache import CACHE_ENV, compact_docstring_caches
+
+log = logging.getLogger('ceo.ability')
+
+
+def prebuild(modules: list[str], cache_path: str | None = None):
+    # importing a module runs its @ability decorators, which fill the cache on a miss
+    if cache_path is not None:
+        os.environ[CACHE_ENV] = os.path.abspath(cache_path)
+    for module in modules:
+        importlib.import_module(module)
+        log.debug(f'Docstrings prebuilt for module "{module}".')
+    compact_docstring_caches()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m ceo.util.prebuild',
+        description='Generate and store the docstrings of every @ability in the given modules, '
+                    'e.g. while building a container image.'
+    )
+    parser.add_argument('modules', nargs='+', help='Modules declaring abilities, e.g. "app.abilities".')
+    parser.add_argument('--cache', default=None,
+                        help=f'Path of the cache database, defaults to ${CACHE_ENV} or a store per cache dir.')
+    args = parser.parse_args(argv)
+    sys.path.insert(0, os.getcwd())
+    prebuild(args.modules, cache_path=args.cache)
+
+
+if __name__ == '__main__':
+    main()
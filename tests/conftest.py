@@ -0,0 +1,16 @@
+import pytest
+
+from ceo.prompt import Prompt
+
+
+@pytest.fixture(autouse=True)
+def prompt_settings():
+    # Prompt settings are process wide, each test starts from the defaults
+    settings = (Prompt.deterministic(), Prompt.cache(), Prompt.stop_sequences(), Prompt.incremental_parse())
+    yield
+    deterministic, cache, stop_sequences, incremental_parse = settings
+    Prompt.set_deterministic(deterministic)
+    Prompt.set_cache(cache)
+    Prompt.set_stop_sequences(stop_sequences)
+    Prompt.set_incremental_parse(incremental_parse)
+    Prompt._unsignalled_stop.clear()
@@ -0,0 +1,137 @@
+import contextvars
+import inspect
+import json
+import threading
+from collections.abc import Callable
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from ceo.prompt import Prompt
+from ceo.prompt.next_move_prompt import SEPARATOR, END, MISSION_COMPLETE
+
+TOKENS_PER_CALL = 100
+COMPLETE = f'done\n{SEPARATOR}\nargs:{{}}\nability:[{MISSION_COMPLETE}]\n{END}'
+CONCLUSION = '--THOUGHT-PROCESS--\n(Start) [work]: ok (--SUCCESS--)\n--CONCLUSION--\nAll done.\n--END--'
+# set by ScriptedModel.ainvoke, langchain runs the generation itself in a task of its own
+_answering: contextvars.ContextVar[type | None] = contextvars.ContextVar('scripted_answering', default=None)
+
+
+def move(*actions: tuple[str, dict]) -> str:
+    # a NextMovePrompt reply taking one or more (ability name, args) actions
+    body = '\n'.join(f'args:{json.dumps(args)}\nability:[{name}]' for name, args in actions)
+    return f'next\n{SEPARATOR}\n{body}\n{END}'
+
+
+def plan(*names: str) -> str:
+    return f'schedule:[{", ".join(names)}]\n{END}'
+
+
+def prompt_class() -> type | None:
+    # the class of the prompt being answered, the text of a prompt also carries what other prompts wrote
+    frame = inspect.currentframe()
+    while frame is not None:
+        owner = frame.f_locals.get('self', None)
+        if isinstance(owner, Prompt):
+            return type(owner)
+        frame = frame.f_back
+    return None
+
+
+def actions_in(prompt: str) -> int:
+    # the actions in the history shown to a NextMovePrompt
+    history = json.loads(prompt)['prompt'].get('history', None)
+    if not isinstance(history, dict):
+        return 0
+    return sum(1 for entry in history.values()
+               if isinstance(entry, dict) and any(key.startswith('action_taken_by_') for key in entry))
+
+
+class ScriptedModel(BaseChatModel):
+    # replies by prompt class name, a reply is a string or a function of the prompt text,
+    # NextMovePrompt replies default to `moves`, by the number of actions already in the history
+    replies: dict = dict()
+    moves: list = list()
+    honor_stop: bool = True
+    # reports stop sequences as Anthropic does, otherwise as OpenAI does, with 'stop' for a natural end as well
+    explicit_stop: bool = True
+    chunk_size: int = 8
+    calls: list = list()
+    stops: list = list()
+    lock: object = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls, self.stops = list(), list()
+        self.lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted'
+
+    def count(self, kind: str) -> int:
+        with self.lock:
+            return sum(1 for name, _ in self.calls if name == kind)
+
+    def respond(self, prompt: str) -> str:
+        kind = prompt_class() or _answering.get()
+        name = kind.__name__ if kind is not None else None
+        with self.lock:
+            self.calls.append((name, prompt))
+        reply = self.replies.get(name, None)
+        if reply is not None:
+            return reply(prompt) if isinstance(reply, Callable) else reply
+        if name == 'NextMovePrompt':
+            step = actions_in(prompt)
+            return self.moves[step] if step < len(self.moves) else COMPLETE
+        return {
+            'SelfIntroducePrompt': 'I am a scripted agent.',
+            'SchedulerPrompt': plan(*(f'step_{i}' for i in range(len(self.moves)))),
+            'IntrospectionPrompt': CONCLUSION,
+            'ExecutorPrompt': json.dumps({'ability': 'ability', 'choice': 'choice', 'returns': 'returns',
+                                          'summarization': 'I did it.'}),
+            'RequestResolverPrompt': 'step_1: (Start) do it',
+            'MemorySummaryPrompt': 'Earlier steps were summarized.',
+            'DocstringPrompt': json.dumps({'description': {'brief_description': 'Does something.'}})
+        }.get(name, 'unknown')
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        token = _answering.set(prompt_class())
+        try:
+            return await super().ainvoke(input, config, **kwargs)
+        finally:
+            _answering.reset(token)
+
+    def __message(self, content: str, stop: list[str] | None) -> tuple[str, dict]:
+        with self.lock:
+            self.stops.append(stop)
+        metadata = {'stop_reason': 'end_turn'} if self.explicit_stop else {'finish_reason': 'stop'}
+        if self.honor_stop and stop is not None:
+            for sequence in stop:
+                if sequence in content:
+                    content = content[:content.find(sequence)]
+                    if self.explicit_stop:
+                        metadata = {'stop_reason': 'stop_sequence', 'stop_sequence': sequence}
+                    break
+        return content, metadata
+
+    @staticmethod
+    def __usage() -> dict:
+        return {'input_tokens': TOKENS_PER_CALL, 'output_tokens': 0, 'total_tokens': TOKENS_PER_CALL}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, metadata = self.__message(self.respond(messages[-1].content), stop)
+        message = AIMessage(content=content, response_metadata=metadata, usage_metadata=self.__usage())
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, metadata = self.__message(self.respond(messages[-1].content), stop)
+        for i in range(0, len(content), self.chunk_size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + self.chunk_size]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content='', response_metadata=metadata,
+                                                         usage_metadata=self.__usage()))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            yield chunk
@@ -0,0 +1,72 @@
+import asyncio
+
+from ceo import Ability, Agent
+from ceo.ability.ability_registry import AbilityRegistry
+from scripted_model import ScriptedModel
+
+
+def add(a: int, b: int) -> int:
+    """
+    Adds two numbers.
+    :param a: The first number.
+    :param b: The second number.
+    :return: The sum.
+    """
+    return a + b
+
+
+def subtract(a: int, b: int) -> int:
+    """
+    Subtracts a number from another.
+    :param a: The number to subtract from.
+    :param b: The number to subtract.
+    :return: The difference.
+    """
+    return a - b
+
+
+def test_abilities_are_keyed_by_their_source():
+    registry = AbilityRegistry([add, subtract])
+    assert len(registry) == 2
+    assert registry.add(add) is None
+    assert registry.add(Ability(add)) is None
+    assert add in registry and Ability(subtract) in registry
+    assert [ability.name for ability in registry] == ['add', 'subtract']
+
+
+def test_version_changes_only_with_the_abilities():
+    registry = AbilityRegistry([add])
+    version, snapshot = registry.version, registry.to_list()
+    registry.add(add)
+    assert registry.version == version and registry.to_list() is snapshot
+    registry.add(subtract)
+    assert registry.version == version + 1 and registry.to_list() is not snapshot
+    assert registry.remove(add).name == 'add'
+    assert registry.remove(add) is None
+    assert registry.version == version + 2
+
+
+def test_introduction_is_generated_once_on_first_read():
+    model = ScriptedModel()
+    agent = Agent(abilities=[add], brain=model, name='Calculator')
+    assert agent.grant_ability(subtract)
+    assert not agent.grant_ability(subtract)
+    assert model.count('SelfIntroducePrompt') == 0
+    assert agent.introduction == agent.introduction == 'I am a scripted agent.'
+    assert model.count('SelfIntroducePrompt') == 1
+    assert agent.deprive_ability(subtract)
+    assert not agent.deprive_ability(subtract)
+    assert agent.introduction
+    assert model.count('SelfIntroducePrompt') == 2
+
+
+def test_sessions_introduce_the_agent_once():
+    model = ScriptedModel()
+    agent = Agent(abilities=[add], brain=model, name='Calculator')
+
+    async def __sessions():
+        return await asyncio.gather(*[agent.asession() for _ in range(4)])
+
+    sessions = asyncio.run(__sessions())
+    assert all(session.introduction == 'I am a scripted agent.' for session in sessions)
+    assert model.count('SelfIntroducePrompt') == 1
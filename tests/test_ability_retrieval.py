@@ -0,0 +1,88 @@
+import json
+
+from ceo import Agent, ability
+from ceo.ability.ability_index import AbilityIndex
+from ceo.ability import Ability
+from scripted_model import ScriptedModel, move, plan
+
+
+def get_weather(city: str) -> str:
+    """
+    Gets the weather forecast of a city.
+    :param city: The city.
+    :return: The forecast.
+    """
+    return f'sunny in {city}'
+
+
+def get_stock_price(ticker: str) -> str:
+    """
+    Gets the latest stock price of a company.
+    :param ticker: The stock ticker.
+    :return: The price.
+    """
+    return f'{ticker}: 100'
+
+
+def send_email(to: str, body: str) -> str:
+    """
+    Sends an email.
+    :param to: The recipient.
+    :param body: The message.
+    :return: Whether it was sent.
+    """
+    return 'sent'
+
+
+def translate_text(text: str, language: str) -> str:
+    """
+    Translates text into another language.
+    :param text: The text.
+    :param language: The target language.
+    :return: The translation.
+    """
+    return text
+
+
+def book_meeting(time: str) -> str:
+    """
+    Books a meeting in the calendar.
+    :param time: When.
+    :return: The booking.
+    """
+    return f'booked at {time}'
+
+
+ABILITIES = [get_weather, get_stock_price, send_email, translate_text, book_meeting]
+
+
+def shown_abilities(prompt: str) -> list[str]:
+    return list(json.loads(prompt)['prompt']['abilities'].keys())
+
+
+def test_index_ranks_abilities_by_relevance():
+    index = AbilityIndex([Ability(func) for func in ABILITIES])
+    assert [found.name for found in index.search('what is the weather forecast in Paris', 1)] == ['get_weather']
+    assert {found.name for found in index.search('email the stock price', 2)} == {'send_email', 'get_stock_price'}
+
+
+def test_pending_abilities_are_indexed_without_their_docstrings():
+    model = ScriptedModel()
+    lazy = ability(model, cache=False, lazy=True)(get_weather)
+    index = AbilityIndex([Ability(lazy)])
+    assert [found.name for found in index.search('weather forecast', 1)] == ['get_weather']
+    assert model.count('DocstringPrompt') == 0
+
+
+def test_agent_is_shown_the_top_k_and_can_ask_for_more():
+    model = ScriptedModel(moves=[move(('__SystemAbility__list_more_abilities', {'query': 'book a meeting'})),
+                                 move(('book_meeting', {'time': 'noon'}))],
+                          replies={'SchedulerPrompt': plan('get_weather')})
+    agent = Agent(abilities=ABILITIES, brain=model, name='Assistant', summarize_actions=False, ability_top_k=1)
+    agent.assign('what is the weather forecast in Paris')
+    assert agent.just_do_it()['misc']['step_count'] == 2
+    moves = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt']
+    first, last = shown_abilities(moves[0]), shown_abilities(moves[-1])
+    assert 'get_weather' in first and 'book_meeting' not in first
+    assert 'send_email' not in first and '__SystemAbility__list_more_abilities' in first
+    assert 'book_meeting' in last
@@ -0,0 +1,57 @@
+import asyncio
+
+from ceo import Agent
+from scripted_model import ScriptedModel, move, plan
+
+_arrived: dict[str, asyncio.Event] = dict()
+
+
+async def meet(name: str, other: str) -> str:
+    """
+    Waits for another agent at the meeting point.
+    :param name: Who arrives.
+    :param other: Who to wait for.
+    :return: Who was met.
+    """
+    _arrived[name].set()
+    await asyncio.wait_for(_arrived[other].wait(), timeout=5)
+    return f'{name} met {other}'
+
+
+def new_agent(name: str, other: str) -> Agent:
+    model = ScriptedModel(moves=[move(('meet', {'name': name, 'other': other}))],
+                          replies={'SchedulerPrompt': plan('meet')})
+    return Agent(abilities=[meet], brain=model, name=name, summarize_actions=False)
+
+
+async def arun(agent: Agent) -> dict:
+    await agent.aassign('meet the other agent')
+    return await agent.ajust_do_it()
+
+
+def test_async_runs_share_the_event_loop():
+    async def __main():
+        _arrived.update(left=asyncio.Event(), right=asyncio.Event())
+        # each run only finishes once the other one has reached its ability, a blocked loop would time out
+        return await asyncio.gather(arun(new_agent('left', 'right')), arun(new_agent('right', 'left')))
+
+    results = asyncio.run(__main())
+    assert [result['misc']['step_count'] for result in results] == [1, 1]
+    assert all(result['success'] for result in results)
+
+
+def test_async_run_matches_the_sync_run():
+    def __new_agent() -> Agent:
+        model = ScriptedModel(moves=[move(('meet', {'name': 'left', 'other': 'left'}))] * 2,
+                              replies={'SchedulerPrompt': plan('meet', 'meet')})
+        return Agent(abilities=[meet], brain=model, name='left', summarize_actions=False)
+
+    _arrived.update(left=asyncio.Event())
+    agent = __new_agent()
+    agent.assign('meet yourself')
+    expected = agent.just_do_it()
+    _arrived.update(left=asyncio.Event())
+    result = asyncio.run(arun(__new_agent()))
+    assert result['misc']['step_count'] == expected['misc']['step_count'] == 2
+    assert result['conclusion'] == expected['conclusion']
+    assert result['misc']['profile']['llm_call_count'] == expected['misc']['profile']['llm_call_count']
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from ceo import Ability, Agent, ability
+from ceo.deadline import run_deadline, time_left, bound_timeout
+from ceo.exception.ability_timeout_exception import AbilityTimeoutException
+from ceo.exception.deadline_exceeded_exception import DeadlineExceededException
+from ceo.prompt import SchedulerPrompt
+from scripted_model import ScriptedModel, move, plan
+
+_brain = ScriptedModel()
+_hang = threading.Event()
+
+
+@ability(_brain, cache=False, timeout=0.2)
+def stuck(seconds: float) -> str:
+    _hang.wait(seconds)
+    return 'finished'
+
+
+@ability(_brain, cache=False, timeout=0.2)
+async def astuck(seconds: float) -> str:
+    await asyncio.sleep(seconds)
+    return 'finished'
+
+
+def slow(seconds: float) -> str:
+    """
+    Works for a while.
+    :param seconds: How long to work.
+    :return: What was done.
+    """
+    time.sleep(seconds)
+    return 'worked'
+
+
+def test_abilities_past_their_timeout_are_abandoned():
+    with pytest.raises(AbilityTimeoutException):
+        Ability(stuck)(seconds=5)
+    assert Ability(stuck)(seconds=0) == 'finished'
+    with pytest.raises(AbilityTimeoutException):
+        asyncio.run(Ability(astuck).acall(seconds=5))
+    _hang.set()
+
+
+def test_a_timed_out_ability_is_reported_to_the_agent():
+    _hang.clear()
+    model = ScriptedModel(moves=[move(('stuck', {'seconds': 5}))], replies={'SchedulerPrompt': plan('stuck')})
+    agent = Agent(abilities=[stuck], brain=model, name='Waiter', summarize_actions=False)
+    agent.assign('wait for it')
+    result = agent.just_do_it()
+    _hang.set()
+    assert result['misc']['step_count'] == 1 and not result['misc']['out_of_time']
+    last_move = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][-1]
+    returns = list(json.loads(last_move)['prompt']['history'].values())[-1]['action_taken_by_Waiter']['returns']
+    assert returns != 'finished' and '0.2' in returns
+
+
+def test_nested_deadlines_only_shorten():
+    assert time_left() is None and bound_timeout(3) == 3
+    with run_deadline(10):
+        with run_deadline(60):
+            assert time_left() <= 10
+        assert bound_timeout(1) == 1 and bound_timeout(None) <= 10
+
+
+def test_prompts_are_not_sent_past_the_deadline():
+    model = ScriptedModel()
+    with run_deadline(0):
+        with pytest.raises(DeadlineExceededException):
+            SchedulerPrompt(request='anything', abilities=[]).invoke(model)
+    assert model.count('SchedulerPrompt') == 0
+
+
+def test_run_out_of_time_concludes_from_what_was_done():
+    model = ScriptedModel(moves=[move(('slow', {'seconds': 0.3}))] * 20, replies={'SchedulerPrompt': plan('slow')})
+    agent = Agent(abilities=[slow], brain=model, name='Worker', summarize_actions=False, time_limit=0.5)
+    agent.assign('work until done')
+    start = time.monotonic()
+    result = agent.just_do_it()
+    assert time.monotonic() - start < 2
+    assert result['misc']['out_of_time']
+    assert 1 <= result['misc']['step_count'] < 20
+    assert result['conclusion'].startswith('Ran out of time')
+    assert model.count('IntrospectionPrompt') == 0
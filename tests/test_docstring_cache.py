@@ -0,0 +1,38 @@
+import sqlite3
+
+from ceo.cache import docstring_cache
+from ceo.cache.docstring_cache import DocstringCache
+
+
+class FailingConnection:
+    # connects, then fails on the first statement, as a read-only file fails on the WAL pragma
+    closed = list()
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def execute(self, *args, **kwargs):
+        raise sqlite3.OperationalError('attempt to write a readonly database')
+
+    def close(self):
+        FailingConnection.closed.append(self)
+        self._connection.close()
+
+
+def test_partly_opened_connection_is_closed_before_falling_back(tmp_path, monkeypatch):
+    path = str(tmp_path / 'docstrings.db')
+    with sqlite3.connect(path) as seed:
+        seed.execute(f'CREATE TABLE {docstring_cache.DEFAULT_TABLE} (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        seed.execute(f'INSERT INTO {docstring_cache.DEFAULT_TABLE} VALUES (?, ?)', ('k', 'v'))
+    connect = sqlite3.connect
+
+    def __connect(database, *args, **kwargs):
+        if kwargs.get('uri', False):
+            return connect(database, *args, **kwargs)
+        return FailingConnection(connect(database, *args, **kwargs))
+
+    monkeypatch.setattr(docstring_cache.sqlite3, 'connect', __connect)
+    cache = DocstringCache(path)
+    assert cache.read_only
+    assert len(FailingConnection.closed) == 1
+    assert cache.get('k') == 'v'
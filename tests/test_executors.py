@@ -0,0 +1,54 @@
+import os
+import threading
+
+import pytest
+
+from ceo import Ability, Agent, ExecutionPolicy, ability
+from ceo.ability.executors import set_executor_limits
+from scripted_model import ScriptedModel, move, plan
+
+_brain = ScriptedModel()
+
+
+@ability(_brain, cache=False, execution=ExecutionPolicy.PROCESS)
+def where_in_a_process(payload: object = None) -> tuple[int, str]:
+    return os.getpid(), threading.current_thread().name
+
+
+@ability(_brain, cache=False, execution=ExecutionPolicy.THREAD)
+def where_in_a_thread() -> tuple[int, str]:
+    return os.getpid(), threading.current_thread().name
+
+
+@ability(_brain, cache=False, execution=ExecutionPolicy.INLINE)
+def where_inline() -> tuple[int, str]:
+    return os.getpid(), threading.current_thread().name
+
+
+def test_process_abilities_run_in_a_worker_process():
+    pid, _ = Ability(where_in_a_process)()
+    assert pid != os.getpid()
+
+
+def test_arguments_that_can_not_be_pickled_keep_the_call_in_process():
+    pid, thread = Ability(where_in_a_process)(payload=lambda: None)
+    assert pid == os.getpid()
+    assert thread.startswith('ceo-ability')
+
+
+def test_thread_and_inline_abilities():
+    assert Ability(where_in_a_thread)()[1].startswith('ceo-ability')
+    assert Ability(where_inline)() == (os.getpid(), threading.current_thread().name)
+
+
+def test_an_agent_runs_process_abilities():
+    model = ScriptedModel(moves=[move(('where_in_a_process', {}))], replies={'SchedulerPrompt': plan('where_in_a_process')})
+    agent = Agent(abilities=[where_in_a_process], brain=model, name='Worker', summarize_actions=False)
+    agent.assign('find out where you run')
+    assert agent.just_do_it()['misc']['step_count'] == 1
+    assert str(os.getpid()) not in [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][-1]
+
+
+def test_executors_need_a_worker():
+    with pytest.raises(ValueError):
+        set_executor_limits(thread_workers=0)
@@ -0,0 +1,69 @@
+import inspect
+
+import pytest
+
+from ceo import Ability, ability
+from ceo.cache import AbilityCache, get_ability_cache, set_ability_cache
+from ceo.cache.ability_cache import make_args_key
+from scripted_model import ScriptedModel
+
+_brain = ScriptedModel()
+_calls = list()
+
+
+@ability(_brain, cache=False, memoize=True, maxsize=2)
+def lookup_rate(currency: str, options: dict | None = None) -> float:
+    _calls.append(currency)
+    return 1.5
+
+
+@ability(_brain, cache=False, memoize=True, ttl=60)
+def lookup_rates(currencies: list) -> dict:
+    _calls.append(tuple(currencies))
+    return {currency: 1.5 for currency in currencies}
+
+
+@pytest.fixture(autouse=True)
+def ability_cache():
+    # the ability cache is process wide, each test starts from an empty one
+    previous = get_ability_cache()
+    set_ability_cache(AbilityCache())
+    _calls.clear()
+    yield
+    set_ability_cache(previous)
+
+
+def test_equal_calls_are_served_from_the_cache():
+    assert Ability(lookup_rate)('EUR', options={'a': 1, 'b': 2}) == 1.5
+    # equal arguments, passed another way
+    assert Ability(lookup_rate)(currency='EUR', options={'b': 2, 'a': 1}) == 1.5
+    assert _calls == ['EUR']
+    assert get_ability_cache().stats('lookup_rate') == {'hits': 1, 'disk_hits': 0, 'misses': 1}
+
+
+def test_results_are_shared_across_ability_instances_and_evicted_past_maxsize():
+    for currency in ('EUR', 'USD', 'GBP', 'EUR'):
+        Ability(lookup_rate)(currency)
+    assert _calls == ['EUR', 'USD', 'GBP', 'EUR']
+    Ability(lookup_rate)('EUR')
+    assert _calls == ['EUR', 'USD', 'GBP', 'EUR']
+
+
+def test_arguments_that_can_not_be_keyed_are_not_memoized():
+    class Opaque:
+        pass
+
+    assert make_args_key('key', inspect.signature(lookup_rate), ('EUR',), {'options': Opaque()}) is None
+    Ability(lookup_rate)('EUR', options=Opaque())
+    Ability(lookup_rate)('EUR', options=Opaque())
+    assert _calls == ['EUR', 'EUR']
+
+
+def test_results_outlive_the_process_on_disk(tmp_path):
+    path = str(tmp_path / 'abilities.db')
+    set_ability_cache(AbilityCache(path))
+    Ability(lookup_rates)(['EUR', 'USD'])
+    set_ability_cache(AbilityCache(path))
+    assert Ability(lookup_rates)(['EUR', 'USD']) == {'EUR': 1.5, 'USD': 1.5}
+    assert _calls == [('EUR', 'USD')]
+    assert get_ability_cache().stats('lookup_rates')['disk_hits'] == 1
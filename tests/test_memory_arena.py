@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from ceo import Agent, AgenticAbility
+from ceo.memory import MemoryStore, OverlayMemoryStore
+from scripted_model import ScriptedModel, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def history_of(prompt: str) -> list[str]:
+    history = json.loads(prompt)['prompt'].get('history', None)
+    return list(history.keys()) if isinstance(history, dict) else list()
+
+
+def test_overlay_reads_the_base_in_place_and_keeps_its_own_delta():
+    base = MemoryStore({'a': {'n': 1}, 'b': {'n': 2}})
+    overlay = OverlayMemoryStore(base.view())
+    overlay.put('c', {'n': 3}).put('a', {'n': 1})
+    assert list(overlay.view()) == ['a', 'b', 'c']
+    assert list(overlay.delta()) == ['c']
+    assert overlay.view()['b'] is base.view()['b']
+    assert overlay.view().key_at(2) == 'c' and overlay.view().latest() == {'n': 3}
+    with pytest.raises(TypeError):
+        overlay.put('a', {'n': 9})
+
+
+def test_nested_overlays_chain_their_segments():
+    first = OverlayMemoryStore(MemoryStore({'a': {'n': 1}}).view())
+    first.put('b', {'n': 2})
+    second = OverlayMemoryStore(first.view())
+    second.put('c', {'n': 3})
+    assert list(second.view()) == ['a', 'b', 'c']
+    assert list(second.base) == ['a', 'b']
+    assert [key for key, _ in second.view().items_between(1, 3)] == ['b', 'c']
+    assert list(second.delta()) == ['c']
+
+
+def test_delegation_merges_back_only_what_the_sub_agent_added():
+    worker = Agent(abilities=[probe], brain=ScriptedModel(moves=[move(('probe', {'depth': 1}))],
+                                                          replies={'SchedulerPrompt': plan('probe')}),
+                   name='Worker', summarize_actions=False)
+    talk_to_worker = AgenticAbility(worker)
+    model = ScriptedModel(moves=[move((talk_to_worker.name, {}))], replies={'SchedulerPrompt': plan(talk_to_worker.name)})
+    director = Agent(abilities=[talk_to_worker], brain=model, name='Director', summarize_actions=False)
+    earlier = {f'note-{i}': {'message': f'note {i}'} for i in range(3)}
+    director.assign_with_memory('get it probed', earlier)
+    director.just_do_it()
+    # the worker read the director's memory as it was when the work was delegated
+    worker_moves = [prompt for kind, prompt in worker.brain.calls if kind == 'NextMovePrompt']
+    assert history_of(worker_moves[0]) == list(earlier)
+    # and the director got back the worker's step only, followed by its own
+    director_moves = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt']
+    history = history_of(director_moves[-1])
+    assert history[:3] == list(earlier)
+    assert len(history) == 5
+    assert history[3].startswith('agent:[Worker]') and history[4].startswith('agent:[Director]')
@@ -0,0 +1,49 @@
+import json
+
+from ceo import Agent, MemoryPolicy, EvictionStrategy
+from ceo.retrieval.bm25 import BM25Index
+from scripted_model import ScriptedModel, move, plan
+
+
+def inspect_boiler(part: str) -> str:
+    """
+    Inspects a part of the boiler.
+    :param part: The part to inspect.
+    :return: What was found.
+    """
+    return f'the {part} looks fine'
+
+
+def history_of(prompt: str) -> list[str]:
+    history = json.loads(prompt)['prompt'].get('history', None)
+    return list(history.keys()) if isinstance(history, dict) else list()
+
+
+def test_bm25_ranks_by_term_relevance():
+    index = BM25Index()
+    index.add('a', 'the boiler pressure is too high')
+    index.add('b', 'the garden needs watering')
+    index.add('c', 'pressure in the tyres is fine')
+    assert [doc_id for doc_id, _ in index.search('boiler pressure', 2)] == ['a', 'c']
+    index.remove('a')
+    assert [doc_id for doc_id, _ in index.search('boiler pressure', 2)] == ['c']
+
+
+def test_prompts_recall_the_memory_relevant_to_the_request():
+    model = ScriptedModel(moves=[move(('inspect_boiler', {'part': 'valve'}))],
+                          replies={'SchedulerPrompt': plan('inspect_boiler')})
+    agent = Agent(abilities=[inspect_boiler], brain=model, name='Engineer', summarize_actions=False,
+                  memory_policy=MemoryPolicy(keep_first=0, keep_last=1, eviction=EvictionStrategy.RELEVANCE,
+                                             top_k=1))
+    agent.assign_with_memory('why is the boiler pressure too high', {
+        'note-0': {'message': 'the garden needs watering'},
+        'note-1': {'message': 'the boiler pressure gauge reads 3 bar'},
+        'note-2': {'message': 'lunch is at noon'},
+        'note-3': {'message': 'the car is parked outside'}
+    })
+    agent.just_do_it()
+    first_move = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][0]
+    assert history_of(first_move) == ['note-1', 'note-3']
+    conclusion = [prompt for kind, prompt in model.calls if kind == 'IntrospectionPrompt'][-1]
+    assert 'note-1' in history_of(conclusion)
+    assert 'note-0' not in history_of(conclusion) and 'note-2' not in history_of(conclusion)
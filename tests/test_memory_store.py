@@ -0,0 +1,46 @@
+import copy
+import json
+from collections import OrderedDict
+
+import pytest
+
+from ceo import Agent
+from ceo.memory import MemoryStore, FrozenDict
+from scripted_model import ScriptedModel
+
+
+def test_views_are_copy_on_write():
+    store = MemoryStore({'a': {'n': 1}})
+    before = store.view()
+    store.put('a', {'n': 2}).put('b', {'n': 3})
+    assert dict(before) == {'a': {'n': 1}}
+    assert dict(store.view()) == {'a': {'n': 2}, 'b': {'n': 3}}
+
+
+def test_entries_are_read_only_and_shared():
+    store = MemoryStore({'a': {'tags': ['x', 'y']}})
+    entry = store.view()['a']
+    assert isinstance(entry, FrozenDict)
+    assert entry['tags'] == ('x', 'y')
+    with pytest.raises(TypeError):
+        entry['n'] = 1
+    assert copy.deepcopy(store.view())['a'] is entry
+
+
+def test_agent_memory_is_a_json_serializable_copy():
+    agent = Agent(abilities=[], brain=ScriptedModel(), name='Memo',
+                  memory=OrderedDict(a={'tags': ['x', 'y'], 'nested': {'n': 1}}))
+    memory = agent.memory
+    assert isinstance(memory, OrderedDict)
+    assert json.loads(json.dumps(memory)) == {'a': {'tags': ['x', 'y'], 'nested': {'n': 1}}}
+    memory['b'] = {'n': 2}
+    memory['a']['tags'].append('z')
+    assert list(agent.memory_view) == ['a']
+    assert agent.memory['a']['tags'] == ['x', 'y']
+
+
+def test_bring_in_memory_extends_memory():
+    agent = Agent(abilities=[], brain=ScriptedModel(), name='Memo')
+    agent.assign_with_memory('Do it.', {'a': {'n': 1}}).bring_in_memory(OrderedDict(b={'n': 2}))
+    assert list(agent.memory.keys()) == ['a', 'b']
+    assert agent.memory_view.latest() == {'n': 2}
@@ -0,0 +1,53 @@
+import threading
+
+from ceo import Agent, SoftBudgetPolicy
+from scripted_model import ScriptedModel, move, plan, actions_in
+
+_together = threading.Barrier(2, timeout=5)
+
+
+def fetch_prices(region: str) -> str:
+    """
+    Fetches the price list of a region.
+    :param region: The region.
+    :return: The price list.
+    """
+    _together.wait()
+    return f'prices of {region}'
+
+
+def fetch_stock(region: str) -> str:
+    """
+    Fetches the stock levels of a region.
+    :param region: The region.
+    :return: The stock levels.
+    """
+    _together.wait()
+    return f'stock of {region}'
+
+
+def new_agent(model: ScriptedModel, **kwargs) -> Agent:
+    return Agent(abilities=[fetch_prices, fetch_stock], brain=model, name='Buyer', summarize_actions=False,
+                 multi_action=True, **kwargs)
+
+
+def test_independent_moves_of_a_step_run_concurrently():
+    # both abilities wait for each other, run one after the other they would time out
+    model = ScriptedModel(moves=[move(('fetch_prices', {'region': 'eu'}), ('fetch_stock', {'region': 'eu'}))],
+                          replies={'SchedulerPrompt': plan('fetch_prices', 'fetch_stock')})
+    agent = new_agent(model)
+    agent.assign('compare prices and stock')
+    result = agent.just_do_it()
+    assert result['misc']['step_count'] == 2
+    assert model.count('NextMovePrompt') == 2
+    last_move = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][-1]
+    assert actions_in(last_move) == 2
+
+
+def test_a_turn_is_trimmed_to_the_steps_left():
+    _together.reset()
+    model = ScriptedModel(moves=[move(*[('fetch_prices', {'region': str(i)}) for i in range(4)])] * 10,
+                          replies={'SchedulerPrompt': plan('fetch_prices', 'fetch_prices')})
+    agent = new_agent(model, termination_policy=SoftBudgetPolicy(slack=10.0, grace=10, max_steps=2))
+    agent.assign('fetch every price list')
+    assert agent.just_do_it()['misc']['step_count'] == 2
@@ -0,0 +1,44 @@
+from ceo import Agent
+from ceo.profile import RunProfile
+from scripted_model import ScriptedModel, TOKENS_PER_CALL, COMPLETE, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def test_run_profile_counts_calls_tokens_and_abilities():
+    profiles = list()
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1})), move(('probe', {'depth': 2}))],
+                          replies={'SchedulerPrompt': plan('probe', 'probe')})
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False,
+                  profile_callback=profiles.append)
+    agent.assign('find the root cause')
+    calls = len(model.calls)
+    profile = agent.just_do_it()['misc']['profile']
+    assert profile['agent'] == 'Prober'
+    assert profile['llm_call_count'] == len(model.calls) - calls
+    assert profile['tokens']['total_tokens'] == TOKENS_PER_CALL * profile['llm_call_count']
+    assert profile['retry_count'] == 0
+    assert set(profile['llm_time_by_prompt']) >= {'SchedulerPrompt', 'NextMovePrompt', 'IntrospectionPrompt'}
+    abilities = [record for record in profile['records'] if record['type'] == 'ability']
+    assert [record['ability'] for record in abilities] == ['probe', 'probe']
+    assert all(record['success'] for record in abilities)
+    assert len(profiles) == 1 and isinstance(profiles[0], RunProfile)
+    assert profiles[0].total_tokens() == profile['tokens']['total_tokens']
+
+
+def test_retries_are_counted():
+    replies = iter(['no move here', move(('probe', {'depth': 1})), COMPLETE])
+    model = ScriptedModel(replies={'SchedulerPrompt': plan('probe'), 'NextMovePrompt': lambda _: next(replies)})
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False)
+    agent.assign('find the root cause')
+    profile = agent.just_do_it()['misc']['profile']
+    assert profile['retry_count'] == 1
+    assert [record['retry'] for record in profile['records']
+            if record['type'] == 'llm' and record['prompt_class'] == 'NextMovePrompt'] == [0, 1, 0]
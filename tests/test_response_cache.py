@@ -0,0 +1,76 @@
+from ceo import Agent, LRUCache, SqliteCache
+from ceo.cache import lru_cache
+from ceo.prompt import Prompt
+from scripted_model import ScriptedModel, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+class OtherModel(ScriptedModel):
+    @property
+    def _llm_type(self) -> str:
+        return 'scripted-other'
+
+
+def run(model: ScriptedModel) -> dict:
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False)
+    agent.assign('find the root cause')
+    return agent.just_do_it()
+
+
+def test_deterministic_prompts_render_identically():
+    assert Prompt.construct_prompt('{"a": 1}', '') != Prompt.construct_prompt('{"a": 1}', '')
+    Prompt.set_deterministic()
+    assert Prompt.construct_prompt('{"a": 1}', '') == Prompt.construct_prompt('{"a": 1}', '')
+    assert Prompt.construct_prompt('{"a": 1}', '') != Prompt.construct_prompt('{"a": 2}', '')
+
+
+def test_repeated_run_is_served_from_the_cache():
+    Prompt.set_deterministic()
+    Prompt.set_cache(LRUCache())
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')})
+    first = run(model)
+    calls = len(model.calls)
+    second = run(model)
+    assert second['conclusion'] == first['conclusion']
+    # the prompts before the first step do not depend on the run, they are never sent twice
+    assert model.count('SchedulerPrompt') == 1
+    assert len(model.calls) - calls < calls
+    records = second['misc']['profile']['records']
+    assert any(record['cached'] for record in records if record['type'] == 'llm')
+
+
+def test_cache_is_not_used_for_other_models():
+    Prompt.set_deterministic()
+    Prompt.set_cache(LRUCache())
+    run(ScriptedModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')}))
+    model = OtherModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')})
+    run(model)
+    assert model.count('SchedulerPrompt') == 1
+
+
+def test_lru_cache_evicts_the_least_recent_and_expires(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(lru_cache.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set('a', '1').set('b', '2')
+    assert cache.get('a') == '1'
+    cache.set('c', '3')
+    assert cache.get('b') is None
+    assert cache.get('a') == '1'
+    now[0] = 11.0
+    assert cache.get('c') is None
+
+
+def test_sqlite_cache_outlives_the_process(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    SqliteCache(path).set('key', 'value')
+    assert SqliteCache(path).get('key') == 'value'
+    assert SqliteCache(path).clear().get('key') is None
@@ -0,0 +1,66 @@
+import threading
+
+from ceo import Agent
+from ceo.memory import SqliteMemoryStore
+from scripted_model import ScriptedModel, move, plan, actions_in
+
+_both_working = threading.Barrier(2, timeout=10)
+
+
+def work(step: int) -> str:
+    """
+    Does one step of the work, in step with the other session.
+    :param step: The step to do.
+    :return: What was done.
+    """
+    _both_working.wait()
+    return f'step {step} done'
+
+
+def actions_of(memory) -> int:
+    return sum(1 for entry in memory.values() if any(key.startswith('action_taken_by_') for key in entry))
+
+
+def new_agent(path: str) -> Agent:
+    model = ScriptedModel(moves=[move(('work', {'step': 1})), move(('work', {'step': 2}))],
+                          replies={'SchedulerPrompt': plan('work', 'work')})
+    return Agent(abilities=[work], brain=model, name='Worker', summarize_actions=False,
+                 memory=SqliteMemoryStore(path))
+
+
+def run_in_parallel(sessions: list) -> list:
+    results = [None] * len(sessions)
+
+    def __run(i: int):
+        sessions[i].assign(f'request {i}')
+        results[i] = sessions[i].just_do_it()
+
+    threads = [threading.Thread(target=__run, args=(i,)) for i in range(len(sessions))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return results
+
+
+def test_concurrent_sessions_keep_their_histories_apart(tmp_path):
+    agent = new_agent(str(tmp_path / 'memory.db'))
+    agent.bring_in_memory({'earlier': {'note': 'from a previous run'}})
+    results = run_in_parallel([agent.session(), agent.session()])
+    assert [result['misc']['step_count'] for result in results] == [2, 2]
+    # while running, a session sees the history from before it started and its own actions only
+    seen = [actions_in(prompt) for kind, prompt in agent.brain.calls if kind == 'NextMovePrompt']
+    assert sorted(seen) == [0, 0, 1, 1, 2, 2]
+    assert all('from a previous run' in prompt for kind, prompt in agent.brain.calls if kind == 'NextMovePrompt')
+    # and what it added is merged into the durable store once its run ends
+    durable = SqliteMemoryStore(str(tmp_path / 'memory.db'))
+    assert actions_of(durable.view()) == 4
+    assert actions_of(agent.memory) == 4
+
+
+def test_a_later_session_reads_what_earlier_ones_merged(tmp_path):
+    agent = new_agent(str(tmp_path / 'memory.db'))
+    run_in_parallel([agent.session(), agent.session()])
+    later = agent.session()
+    later.assign('request 2')
+    assert actions_of(later.memory) == 4
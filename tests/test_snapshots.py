@@ -0,0 +1,58 @@
+import pytest
+
+from ceo import Agent, SqliteCache
+from ceo.brain.base_agent import BaseAgent
+from scripted_model import ScriptedModel, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def new_agent(model: ScriptedModel) -> Agent:
+    return Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False)
+
+
+def test_restored_agent_starts_without_the_model(tmp_path):
+    model = ScriptedModel()
+    agent = new_agent(model)
+    path = str(tmp_path / 'agents' / 'prober.snapshot')
+    data = agent.snapshot(path)
+    assert model.count('SelfIntroducePrompt') == 1
+    brain = ScriptedModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')})
+    for snapshot in (path, data):
+        restored = Agent.load(snapshot, brain=brain)
+        assert restored.name == 'Prober'
+        assert restored.introduction == agent.introduction
+        assert [ability.name for ability in restored.abilities] == [ability.name for ability in agent.abilities]
+        assert restored.brain is brain
+    assert brain.count('SelfIntroducePrompt') == 0
+    restored.assign('find the root cause')
+    assert restored.just_do_it()['misc']['step_count'] == 1
+
+
+def test_load_checks_the_class(tmp_path):
+    data = new_agent(ScriptedModel()).snapshot()
+
+    class Other(Agent):
+        pass
+
+    with pytest.raises(TypeError):
+        Other.load(data, brain=ScriptedModel())
+
+
+def test_introductions_are_cached_on_disk(tmp_path):
+    previous = BaseAgent._introduction_cache
+    BaseAgent.set_introduction_cache(SqliteCache(str(tmp_path / 'ceo.db'), table='introductions'))
+    try:
+        first, second = ScriptedModel(), ScriptedModel()
+        assert new_agent(first).introduction == new_agent(second).introduction
+        assert first.count('SelfIntroducePrompt') == 1
+        assert second.count('SelfIntroducePrompt') == 0
+    finally:
+        BaseAgent.set_introduction_cache(previous)
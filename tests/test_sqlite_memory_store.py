@@ -0,0 +1,89 @@
+import pickle
+
+import pytest
+
+from ceo import Agent
+from ceo.memory import SqliteMemoryStore
+from ceo.memory.sqlite_memory_store import encode_entry, decode_entry
+from scripted_model import ScriptedModel, actions_in, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def test_entries_outlive_the_store(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    store = SqliteMemoryStore(path)
+    store.update({'a': {'n': 1}, 'b': {'message': 'x' * 200, 'tags': ['y']}})
+    store.close()
+    reopened = SqliteMemoryStore(path)
+    assert reopened.durable
+    assert list(reopened.view()) == ['a', 'b']
+    assert reopened.view()['b'] == {'message': 'x' * 200, 'tags': ('y',)}
+    assert reopened.view().latest() == reopened.view()['b']
+
+
+def test_entries_round_trip_compressed_or_not():
+    for entry in ({'n': 1}, {'message': 'I used the probe ability ' * 10}):
+        assert decode_entry(encode_entry(entry)) == entry
+    assert encode_entry({'n': 1}).startswith(b'j')
+    assert encode_entry({'message': 'I used the probe ability ' * 10}).startswith(b'z')
+
+
+def test_store_is_append_only(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / 'memory.db'))
+    store.put('a', {'n': 1}).put('a', {'n': 1})
+    assert len(store) == 1
+    with pytest.raises(TypeError):
+        store.put('a', {'n': 2})
+    assert store.view()['a'] == {'n': 1}
+
+
+def test_a_failed_update_writes_nothing(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / 'memory.db'))
+    store.put('a', {'n': 1})
+    with pytest.raises(TypeError):
+        store.update({'b': {'n': 2}, 'a': {'n': 3}})
+    assert list(store.view()) == ['a']
+    assert 'b' not in store
+
+
+def test_views_are_snapshots(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / 'memory.db'))
+    store.put('a', {'n': 1})
+    before = store.view()
+    store.put('b', {'n': 2})
+    assert list(before) == ['a'] and list(store.view()) == ['a', 'b']
+
+
+def test_store_is_reopened_when_unpickled(tmp_path):
+    store = SqliteMemoryStore(str(tmp_path / 'memory.db'), table='history')
+    store.put('a', {'n': 1})
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored.path == store.path
+    assert restored.view()['a'] == {'n': 1}
+
+
+def test_agent_keeps_a_durable_memory_across_runs(tmp_path):
+    path = str(tmp_path / 'memory.db')
+
+    def __run(moves: int) -> ScriptedModel:
+        # moves are scripted by the number of actions in the history, earlier runs included
+        model = ScriptedModel(moves=[move(('probe', {'depth': 1}))] * moves, replies={'SchedulerPrompt': plan('probe')})
+        agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False,
+                      memory=SqliteMemoryStore(path))
+        agent.assign('find the root cause')
+        agent.just_do_it()
+        return model
+
+    __run(1)
+    model = __run(2)
+    first_move = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][0]
+    assert actions_in(first_move) == 1
+    assert len(SqliteMemoryStore(path)) == 2
@@ -0,0 +1,93 @@
+import pytest
+
+from ceo import Ability, Agent, EventType
+from ceo.exception.too_dumb_exception import TooDumbException
+from ceo.prompt import Prompt, NextMovePrompt
+from ceo.prompt.next_move_prompt import END
+from scripted_model import ScriptedModel, move, CONCLUSION
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def next_move(model: ScriptedModel) -> tuple:
+    return NextMovePrompt(request={'raw_request': 'probe', 'request_by_step': 'probe'},
+                          abilities=[Ability(probe)], history=dict()).invoke(model)
+
+
+def test_marker_is_restored_after_an_explicit_stop_sequence():
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1})) + '\nsome chatter'])
+    ability, args = next_move(model)
+    assert (ability.name, args) == ('probe', {'depth': 1})
+    assert model.stops == [[END]]
+    assert model.count('NextMovePrompt') == 1
+
+
+def test_ambiguous_stop_is_retried_without_stop_sequences():
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1}))], explicit_stop=False)
+    ability, args = next_move(model)
+    assert (ability.name, args) == ('probe', {'depth': 1})
+    # the first answer lost its marker to the stop sequence, the model is not sent one again
+    assert model.stops == [[END], None]
+    next_move(model)
+    assert model.stops[-1] is None
+    assert model.count('NextMovePrompt') == 3
+
+
+def test_truncated_answer_is_not_taken_as_complete():
+    class Truncating(ScriptedModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            message = result.generations[0].message
+            message.content = message.content[:message.content.find(END)]
+            message.response_metadata = {'stop_reason': 'max_tokens'}
+            return result
+
+    model = Truncating(moves=[move(('probe', {'depth': 1}))], honor_stop=False)
+    with pytest.raises(TooDumbException):
+        next_move(model)
+    assert all(stop == [END] for stop in model.stops)
+
+
+def test_chatter_after_the_marker_is_dropped_without_stop_sequences():
+    Prompt.set_stop_sequences(False)
+    model = ScriptedModel(moves=[move(('probe', {'depth': 2})) + '\nsome chatter'])
+    ability, args = next_move(model)
+    assert (ability.name, args) == ('probe', {'depth': 2})
+    assert model.stops == [None]
+
+
+def test_incremental_parse_ends_the_stream_at_the_marker():
+    Prompt.set_incremental_parse(True)
+    model = ScriptedModel(moves=[move(('probe', {'depth': 3})) + '\n' + 'chatter ' * 50], honor_stop=False)
+    ability, args = next_move(model)
+    assert (ability.name, args) == ('probe', {'depth': 3})
+
+
+def test_incremental_parse_aborts_a_malformed_answer_early():
+    Prompt.set_incremental_parse(True)
+    answers = iter([f'a\n--SEP--\nb\n--SEP--\n{"x" * 200}', move(('probe', {'depth': 4}))])
+    model = ScriptedModel(replies={'NextMovePrompt': lambda prompt: next(answers)}, honor_stop=False)
+    ability, args = next_move(model)
+    assert (ability.name, args) == ('probe', {'depth': 4})
+    assert model.count('NextMovePrompt') == 2
+
+
+def test_streamed_conclusion_is_reset_before_a_retry():
+    answers = iter(['malformed conclusion', CONCLUSION])
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1}))],
+                          replies={'IntrospectionPrompt': lambda prompt: next(answers)})
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False)
+    agent.assign('probe once')
+    events = [event for event in agent.stream()
+              if event.type in (EventType.CONCLUSION_CHUNK, EventType.CONCLUSION_RESET)]
+    reset = [i for i, event in enumerate(events) if event.type == EventType.CONCLUSION_RESET]
+    assert len(reset) == 1
+    assert ''.join(event.data['text'] for event in events[:reset[0]]) == 'malformed conclusion'
+    assert 'All done.' in ''.join(event.data['text'] for event in events[reset[0] + 1:])
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ceo import Agent, EventType
+from ceo.exception.too_dumb_exception import TooDumbException
+from scripted_model import ScriptedModel, move, plan
+
+_probed = list()
+_release = threading.Event()
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    _probed.append(depth)
+    _release.wait(timeout=5)
+    return f'nothing conclusive at depth {depth}'
+
+
+def new_agent() -> tuple[ScriptedModel, Agent]:
+    _probed.clear()
+    _release.set()
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1})), move(('probe', {'depth': 2}))],
+                          replies={'SchedulerPrompt': plan('probe', 'probe')})
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False)
+    agent.assign('find the root cause')
+    return model, agent
+
+
+STEP = [EventType.STEP_START, EventType.NEXT_MOVE, EventType.ABILITY_START, EventType.ABILITY_END,
+        EventType.MEMORY_APPEND]
+LAST_STEP = [EventType.STEP_START, EventType.NEXT_MOVE]
+
+
+def check(events: list):
+    types = [event.type for event in events if event.type != EventType.CONCLUSION_CHUNK]
+    assert types == STEP + STEP + LAST_STEP + [EventType.RESULT]
+    assert [event.data['ability'] for event in events if event.type == EventType.ABILITY_START] == ['probe'] * 2
+    assert events[-1].data['conclusion'] == 'All done.'
+    assert all(event.agent_name == 'Prober' for event in events)
+
+
+def test_stream_yields_the_run_as_events():
+    _, agent = new_agent()
+    check(list(agent.stream()))
+
+
+def test_astream_yields_the_same_events():
+    _, agent = new_agent()
+
+    async def __collect() -> list:
+        return [event async for event in agent.astream()]
+
+    check(asyncio.run(__collect()))
+
+
+def test_closing_the_stream_cancels_the_run():
+    model, agent = new_agent()
+    _release.clear()
+    events = agent.stream()
+    for event in events:
+        if event.type == EventType.ABILITY_START:
+            break
+    events.close()
+    _release.set()
+    deadline = time.monotonic() + 5
+    while agent._stream_sink is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _probed == [1]
+    assert model.count('NextMovePrompt') == 1
+
+
+def test_errors_of_the_run_are_raised_by_the_stream():
+    model, agent = new_agent()
+    model.replies['NextMovePrompt'] = lambda _: 'no move here'
+    with pytest.raises(TooDumbException):
+        list(agent.stream())
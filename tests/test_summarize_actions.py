@@ -0,0 +1,33 @@
+from ceo import Agent
+from scripted_model import ScriptedModel, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def run(summarize_actions: bool) -> tuple[ScriptedModel, Agent]:
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1})), move(('probe', {'depth': 2}))],
+                          replies={'SchedulerPrompt': plan('probe', 'probe')})
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=summarize_actions)
+    agent.assign('find the root cause')
+    agent.just_do_it()
+    return model, agent
+
+
+def test_actions_are_summarized_by_the_model_by_default():
+    model, _ = run(summarize_actions=True)
+    assert model.count('ExecutorPrompt') == 2
+
+
+def test_actions_are_recorded_without_the_model():
+    model, agent = run(summarize_actions=False)
+    assert model.count('ExecutorPrompt') == 0
+    # the next move still sees what each action returned
+    last_move = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt'][-1]
+    assert 'nothing conclusive at depth 1' in last_move and 'nothing conclusive at depth 2' in last_move
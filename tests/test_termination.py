@@ -0,0 +1,79 @@
+from ceo import Agent, Personality, TerminationPolicy, SoftBudgetPolicy, MemoryPolicy
+from ceo.memory.working_memory import _summary_executor
+from scripted_model import ScriptedModel, move, plan
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def stubborn(planned_steps: int) -> ScriptedModel:
+    # plans `planned_steps` steps and never decides the mission is complete
+    return ScriptedModel(moves=[move(('probe', {'depth': i})) for i in range(100)],
+                         replies={'SchedulerPrompt': plan(*['probe'] * planned_steps)})
+
+
+def run(model: ScriptedModel, **kwargs) -> dict:
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False, **kwargs)
+    agent.assign('find the root cause')
+    return agent.just_do_it()
+
+
+def test_run_ends_when_the_mission_is_complete():
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1})), move(('probe', {'depth': 2}))],
+                          replies={'SchedulerPrompt': plan('probe', 'probe')})
+    result = run(model)
+    assert result['misc']['step_count'] == 2
+    assert not result['misc']['stopped_by_budget']
+    assert result['conclusion'] == 'All done.'
+
+
+def test_short_plan_finishing_cleanly_takes_no_extra_step():
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')})
+    assert run(model)['misc']['step_count'] == 1
+    assert model.count('NextMovePrompt') == 2
+
+
+def test_prudent_agent_stops_after_its_planned_steps_and_grace():
+    result = run(stubborn(3))
+    assert result['misc']['step_count'] == 3 + 1
+    assert result['misc']['stopped_by_budget']
+
+
+def test_inquisitive_agent_gets_slack_and_more_grace():
+    result = run(stubborn(3), personality=Personality.INQUISITIVE)
+    assert result['misc']['step_count'] == 5 + 3
+
+
+def test_min_steps_only_applies_without_a_plan():
+    assert run(stubborn(0))['misc']['step_count'] == 3 + 1
+    assert run(stubborn(1))['misc']['step_count'] == 1 + 1
+
+
+def test_max_steps_caps_a_soft_budget():
+    policy = SoftBudgetPolicy(slack=10.0, grace=10, max_steps=2)
+    assert run(stubborn(3), termination_policy=policy)['misc']['step_count'] == 2
+
+
+def test_llm_call_budget_is_not_overrun():
+    calls = list()
+    result = run(stubborn(3), termination_policy=TerminationPolicy(max_llm_calls=10),
+                 profile_callback=lambda profile: calls.append(len(profile.llm_calls())))
+    assert result['misc']['stopped_by_budget']
+    assert calls[0] <= 10
+
+
+def test_rolling_summaries_count_against_the_llm_call_budget():
+    profiles = list()
+    model = stubborn(20)
+    policy = MemoryPolicy(keep_first=1, keep_last=1, summarize=True)
+    run(model, memory_policy=policy, termination_policy=TerminationPolicy(max_llm_calls=12),
+        profile_callback=profiles.append)
+    _summary_executor().submit(lambda: None).result()
+    assert any(call['prompt_class'] == 'MemorySummaryPrompt' for call in profiles[0].llm_calls())
+    assert len(profiles[0].llm_calls()) <= 12
@@ -0,0 +1,72 @@
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Agent
+from ceo.prompt.next_move_prompt import MISSION_COMPLETE
+from scripted_model import ScriptedModel, TOKENS_PER_CALL, actions_in, move, plan
+
+
+class ToolModel(ScriptedModel):
+    # answers a NextMovePrompt with native tool calls, `tool_moves` by the number of actions already taken
+    tool_moves: list = list()
+    bound: list = list()
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        self.bound.append((tuple(tool['function']['name'] for tool in tools), tool_choice))
+        return self.bind(tools=tools, tool_choice=tool_choice, **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if 'tools' not in kwargs:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        prompt = messages[-1].content
+        with self.lock:
+            self.calls.append(('NextMovePrompt:tools', prompt))
+        step = actions_in(prompt)
+        calls = self.tool_moves[step] if step < len(self.tool_moves) else [(MISSION_COMPLETE, {})]
+        message = AIMessage(content='', tool_calls=[{'name': name, 'args': args, 'id': f'call_{step}_{i}'}
+                                                    for i, (name, args) in enumerate(calls)],
+                            usage_metadata={'input_tokens': TOKENS_PER_CALL, 'output_tokens': 0,
+                                            'total_tokens': TOKENS_PER_CALL})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def probe(depth: int) -> str:
+    """
+    Probes one level deeper into a problem.
+    :param depth: The depth to probe at.
+    :return: What was found at that depth.
+    """
+    return f'nothing conclusive at depth {depth}'
+
+
+def run(model: ScriptedModel) -> dict:
+    agent = Agent(abilities=[probe], brain=model, name='Prober', summarize_actions=False, tool_calling=True)
+    agent.assign('find the root cause')
+    return agent.just_do_it()
+
+
+def test_next_moves_are_chosen_through_tool_calls():
+    model = ToolModel(tool_moves=[[('probe', {'depth': 1})], [('probe', {'depth': 2})]],
+                      replies={'SchedulerPrompt': plan('probe', 'probe')})
+    result = run(model)
+    assert result['misc']['step_count'] == 2
+    assert result['misc']['profile']['retry_count'] == 0
+    assert model.count('NextMovePrompt:tools') == 3
+    assert model.count('NextMovePrompt') == 0
+    names, tool_choice = model.bound[0]
+    assert 'probe' in names and MISSION_COMPLETE in names
+    assert tool_choice == 'any'
+
+
+def test_arguments_outside_the_signature_are_dropped():
+    model = ToolModel(tool_moves=[[('probe', {'depth': 1, 'verbose': True})]],
+                      replies={'SchedulerPrompt': plan('probe')})
+    assert run(model)['misc']['step_count'] == 1
+    last = [prompt for kind, prompt in model.calls if kind == 'NextMovePrompt:tools'][-1]
+    assert 'verbose' not in last
+
+
+def test_models_without_tool_calling_fall_back_to_text():
+    model = ScriptedModel(moves=[move(('probe', {'depth': 1}))], replies={'SchedulerPrompt': plan('probe')})
+    assert run(model)['misc']['step_count'] == 1
+    assert model.count('NextMovePrompt') == 2
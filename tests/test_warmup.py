@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from ceo import Ability, ability
+from ceo.util import warmup, awarmup
+from ceo.util.ability import pending_abilities
+
+DOCSTRING = {'description': {'brief_description': 'Adds two numbers.'}}
+
+
+class DocstringModel(BaseChatModel):
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'docstring'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=json.dumps(DOCSTRING)))])
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def subtract(a: int, b: int) -> int:
+    return a - b
+
+
+def declare(brain: BaseChatModel) -> list:
+    return [ability(brain, cache=False, lazy=True)(func) for func in (add, subtract)]
+
+
+def test_warmup_generates_pending_docstrings():
+    brain = DocstringModel()
+    functions = declare(brain)
+    assert all(func in pending_abilities() for func in functions)
+    assert warmup(max_concurrency=2) >= len(functions)
+    assert brain.calls == len(functions)
+    for func in functions:
+        assert func not in pending_abilities()
+        assert json.loads(func.__doc__) == DOCSTRING
+        assert Ability(func).description == DOCSTRING['description']
+    assert brain.calls == len(functions)
+
+
+def test_awarmup_generates_pending_docstrings():
+    brain = DocstringModel()
+    functions = declare(brain)
+    assert asyncio.run(awarmup(max_concurrency=2)) >= len(functions)
+    assert brain.calls == len(functions)
+    for func in functions:
+        assert func not in pending_abilities()
+        assert json.loads(func.__doc__) == DOCSTRING
+
+
+class FailingModel(DocstringModel):
+    failing: bool = True
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.failing:
+            raise RuntimeError('model unavailable')
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+class ProbingModel(DocstringModel):
+    # lists the pending abilities from another thread while it answers
+    listed: bool = False
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        probe = threading.Thread(target=pending_abilities)
+        probe.start()
+        probe.join(timeout=5)
+        self.listed = self.listed or not probe.is_alive()
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def test_failed_generation_stays_pending():
+    brain = FailingModel()
+    func = ability(brain, cache=False, lazy=True)(add)
+    with pytest.raises(RuntimeError):
+        _ = Ability(func).description
+    assert func in pending_abilities()
+    with pytest.raises(RuntimeError):
+        warmup()
+    assert func in pending_abilities()
+    brain.failing = False
+    _ = Ability(func).description
+    assert json.loads(func.__doc__) == DOCSTRING
+    assert func not in pending_abilities()
+
+
+def test_model_is_called_without_the_lock_held():
+    brain = ProbingModel()
+    func = ability(brain, cache=False, lazy=True)(add)
+    _ = Ability(func).description
+    assert brain.listed
+    brain = ProbingModel()
+    declare(brain)
+    warmup()
+    assert brain.listed
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from ceo import MemoryPolicy, EvictionStrategy
+from ceo.memory import MemoryStore
+from ceo.memory import working_memory
+from ceo.memory.working_memory import WorkingMemory, SUMMARY_KEY
+
+
+def memory_of(size: int) -> MemoryStore:
+    store = MemoryStore()
+    for i in range(size):
+        store.put(f'event-{i}', {'message': f'looked into item {i}'})
+    return store
+
+
+class Summarizer:
+    # summarizes by counting, `gate` holds a summary back until it is set
+    def __init__(self):
+        self.calls = list()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, previous_summary: str, events: list) -> str:
+        self.calls.append([key for key, _ in events])
+        self.gate.wait(5)
+        return f'{previous_summary}+{len(events)}'
+
+
+def test_oldest_entries_are_evicted_first():
+    rendered = WorkingMemory(MemoryPolicy(keep_last=2)).render(memory_of(5).view())
+    assert list(rendered) == ['event-3', 'event-4']
+
+
+def test_first_entries_can_be_kept():
+    policy = MemoryPolicy(keep_first=1, keep_last=2, eviction=EvictionStrategy.KEEP_FIRST_AND_LAST)
+    rendered = WorkingMemory(policy).render(memory_of(5).view())
+    assert list(rendered) == ['event-0', 'event-3', 'event-4']
+
+
+def test_char_budget_always_keeps_the_latest_entry():
+    rendered = WorkingMemory(MemoryPolicy(max_chars=1)).render(memory_of(3).view())
+    assert list(rendered) == ['event-2']
+
+
+def test_memory_within_budget_is_rendered_as_it_is():
+    memory = memory_of(3).view()
+    assert WorkingMemory(MemoryPolicy(keep_last=3)).render(memory) is memory
+
+
+def test_relevant_evicted_entries_are_recalled_in_order():
+    store = memory_of(6)
+    store.put('event-6', {'message': 'the boiler pressure is too high'})
+    store.put('event-7', {'message': 'looked into item 7'})
+    policy = MemoryPolicy(keep_first=0, keep_last=1, eviction=EvictionStrategy.RELEVANCE, top_k=1)
+    rendered = WorkingMemory(policy).render(store.view(), query='boiler pressure')
+    assert list(rendered) == ['event-6', 'event-7']
+
+
+def test_evicted_entries_are_summarized_in_the_background():
+    summarizer = Summarizer()
+    memory = WorkingMemory(MemoryPolicy(keep_last=1), summarizer=summarizer)
+    store = memory_of(4)
+    memory.render(store.view())
+    memory.wait()
+    rendered = memory.render(store.view())
+    assert rendered[SUMMARY_KEY] == {'summary': '+3', 'events_summarized': 3}
+    assert summarizer.calls == [['event-0', 'event-1', 'event-2']]
+    assert list(rendered)[1:] == ['event-3']
+
+
+def test_caller_is_told_about_events_not_yet_summarized():
+    summarizer = Summarizer()
+    summarizer.gate.clear()
+    memory = WorkingMemory(MemoryPolicy(keep_last=1), summarizer=summarizer)
+    rendered = memory.render(memory_of(3).view())
+    assert rendered[SUMMARY_KEY] == {'summary': '', 'events_summarized': 0, 'events_not_yet_summarized': 2}
+    summarizer.gate.set()
+    memory.wait()
+
+
+def test_render_waits_for_the_fold_in_flight_when_more_is_evicted(monkeypatch):
+    monkeypatch.setattr(working_memory, 'FOLD_WAIT', 5.0)
+    summarizer = Summarizer()
+    summarizer.gate.clear()
+    memory = WorkingMemory(MemoryPolicy(keep_last=1), summarizer=summarizer)
+    store = memory_of(3)
+    memory.render(store.view())
+    store.put('event-3', {'message': 'looked into item 3'})
+    threading.Timer(0.1, summarizer.gate.set).start()
+    memory.render(store.view())
+    memory.wait()
+    rendered = memory.render(store.view())
+    # the entries evicted while the first fold was in flight went into the very next one
+    assert summarizer.calls == [['event-0', 'event-1'], ['event-2']]
+    assert rendered[SUMMARY_KEY] == {'summary': '+2+1', 'events_summarized': 3}
+
+
+def test_failed_summary_is_retried():
+    calls = list()
+
+    def flaky(previous_summary: str, events: list) -> str:
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise RuntimeError('model unavailable')
+        return 'summary'
+
+    memory = WorkingMemory(MemoryPolicy(keep_last=1), summarizer=flaky)
+    store = memory_of(3)
+    memory.render(store.view())
+    memory.wait()
+    memory.render(store.view())
+    memory.wait()
+    assert calls == [2, 2]
+    assert memory.summary == 'summary'
+
+
+@pytest.mark.parametrize('keep_first, keep_last', [(-1, None), (0, 0)])
+def test_invalid_policy_is_rejected(keep_first, keep_last):
+    with pytest.raises(ValueError):
+        MemoryPolicy(keep_first=keep_first, keep_last=keep_last)